@@ -1,3 +1,7 @@
 from .worker import *
 from .worker_pool import *
-from .multi_id import *
\ No newline at end of file
+from .process_worker import *
+from .work_stealing import *
+from .multi_id import *
+from .read_write_lock import *
+from .autoscale import *
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from typing import Optional
+from ...logging_.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class AutoscalePolicy:
+    """Configuration of an autoscaling worker pool.
+
+    The pool adds workers while tasks are queued and every worker is busy, once the backlog
+    persisted for 'scale_up_wait_time' seconds or reached 'scale_up_queue_depth' tasks.
+    A worker which waited 'idle_timeout' seconds without getting a task retires.
+    The gap between the two conditions, together with 'cooldown', keeps the pool from thrashing.
+
+    Attributes:
+        min_workers: workers kept alive even while idle
+        max_workers: upper bound on the amount of workers
+        scale_up_wait_time: seconds a backlog may persist before workers are added
+        scale_up_queue_depth: amount of queued tasks which adds workers immediately, None to disable
+        idle_timeout: seconds a worker may idle before it retires
+        cooldown: minimal seconds between two scale ups, and between a scale up and a retirement
+        check_interval: seconds between two checks of the backlog
+    """
+    min_workers: int = 1
+    max_workers: int = 10
+    scale_up_wait_time: float = 0.1
+    scale_up_queue_depth: Optional[int] = None
+    idle_timeout: float = 30.0
+    cooldown: float = 1.0
+    check_interval: float = 0.05
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.min_workers <= self.max_workers or self.max_workers < 1:
+            raise ValueError("must satisfy 0 <= min_workers <= max_workers and max_workers >= 1")
+        if self.scale_up_queue_depth is not None and self.scale_up_queue_depth < 1:
+            raise ValueError("scale_up_queue_depth must be at least 1")
+        if self.scale_up_wait_time < 0 or self.cooldown < 0:
+            raise ValueError("scale_up_wait_time and cooldown must not be negative")
+        if self.idle_timeout <= 0 or self.check_interval <= 0:
+            raise ValueError("idle_timeout and check_interval must be positive")
+
+    def clamp(self, num_workers: int) -> int:
+        """the amount of workers within the policy's bounds closest to num_workers"""
+        return max(self.min_workers, min(self.max_workers, num_workers))
+
+
+class Autoscaler:
+    """The scaling decisions of a single pool according to an AutoscalePolicy.
+
+    Not thread safe, callers serialize access with their own lock or event loop.
+    """
+
+    def __init__(self, policy: AutoscalePolicy) -> None:
+        self.policy = policy
+        self._backlog_since: Optional[float] = None
+        self._last_scale_up = float("-inf")
+
+    def workers_to_add(self, now: float, num_workers: int, idle_workers: int, queue_depth: int) -> int:
+        """
+        Args:
+            now (float): the current monotonic time
+            num_workers (int): the current amount of workers
+            idle_workers (int): workers waiting for a task
+            queue_depth (int): tasks waiting for a worker
+
+        Returns:
+            int: the amount of workers to start now
+        """
+        policy = self.policy
+        if queue_depth == 0 or idle_workers > 0 or num_workers >= policy.max_workers:
+            # an idle worker next to queued tasks means the tasks are held back by something else
+            self._backlog_since = None
+            return 0
+        if self._backlog_since is None:
+            self._backlog_since = now
+        if now - self._last_scale_up < policy.cooldown:
+            return 0
+        deep = policy.scale_up_queue_depth is not None and queue_depth >= policy.scale_up_queue_depth
+        if not deep and now - self._backlog_since < policy.scale_up_wait_time:
+            return 0
+        self._backlog_since = None
+        self._last_scale_up = now
+        amount = min(policy.max_workers - num_workers, queue_depth)
+        logger.info("Scaling up from %s to %s workers (queue depth %s)", num_workers, num_workers + amount,
+                    queue_depth)
+        return amount
+
+    def may_retire(self, now: float, num_workers: int) -> bool:
+        """whether a worker which idled for policy.idle_timeout seconds should retire"""
+        return num_workers > self.policy.min_workers and now - self._last_scale_up >= self.policy.cooldown
+
+
+__all__ = [
+    "AutoscalePolicy",
+    "Autoscaler",
+]
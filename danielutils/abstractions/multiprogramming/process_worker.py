@@ -0,0 +1,115 @@
+import multiprocessing
+from typing import Any, List, Optional, Type as t_type
+import danielutils  # this is explicitly this way to prevent circular import
+from .worker import Worker
+from ...reflection import get_python_version
+from ...logging_.utils import get_logger
+
+if get_python_version() >= (3, 9):
+    from builtins import type as t_type, list as List  # type:ignore
+
+logger = get_logger(__name__)
+
+
+class _ChildPool:
+    """stands in for the WorkerPool inside a worker process
+
+    only 'global_variables' is available, as a copy made when the process started.
+    """
+
+    def __init__(self, global_variables: dict) -> None:
+        self.global_variables = global_variables
+
+
+def _child_main(conn, worker_class: t_type[Worker], worker_id: int, w_kwargs: dict,
+                global_variables: dict) -> None:
+    """main loop of a worker process, runs worker_class._work on every job of every received batch
+    """
+    worker = worker_class(worker_id, _ChildPool(global_variables), **w_kwargs)  # type:ignore
+    while True:
+        batch = conn.recv()
+        if batch is None:
+            break
+        errors: List[Optional[str]] = []
+        for job in batch:
+            try:
+                worker._work(job)  # pylint: disable=protected-access
+                errors.append(None)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                errors.append(f"{type(e).__name__}: {e}")
+        conn.send(errors)
+    conn.close()
+
+
+class ProcessWorker(Worker):
+    """A thread of the WorkerPool which forwards its jobs, in batches, to a dedicated
+    process running the pool's worker class.
+
+    The worker class, its keyword arguments, the global variables and the jobs must be picklable
+    when the 'spawn' start method is used.
+    """
+
+    def __init__(self, id: int,  # pylint: disable=redefined-builtin
+                 pool: "danielutils.abstractions.multiprogramming.worker_pool.WorkerPool") -> None:
+        super().__init__(id, pool)
+        self._conn = None
+        self._process: Optional[multiprocessing.Process] = None  # type:ignore
+
+    def run(self) -> None:
+        """start the worker process and the thread feeding it"""
+        ctx = multiprocessing.get_context()
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(  # type:ignore
+            target=_child_main, daemon=True,
+            args=(child_conn, self.pool.worker_class, self.id, self.pool.w_kwargs, self.pool.global_variables))
+        self._process.start()  # type:ignore
+        child_conn.close()
+        logger.debug("Worker %s process started with pid %s", self.id, self._process.pid)  # type:ignore
+        super().run()
+
+    def _work(self, obj: Any) -> None:
+        self._run_batch([obj])
+
+    def _run_batch(self, batch: List[Any]) -> None:
+        self._conn.send(batch)  # type:ignore
+        errors = self._conn.recv()  # type:ignore
+        for error in errors:
+            if error is not None:
+                logger.error("Worker %s failed to process a job: %s", self.id, error)
+
+    def _loop(self) -> None:
+        logger.debug("Worker %s main loop started", self.id)
+        try:
+            while True:
+                batch = self.pool._acquire_batch(self.id)  # pylint: disable=protected-access
+                if not batch:
+                    logger.debug("Worker %s received no jobs, exiting loop", self.id)
+                    break
+                try:
+                    self._run_batch(batch)
+                except (EOFError, OSError) as e:
+                    logger.error("Worker %s process died: %s: %s", self.id, type(e).__name__, e)
+                    for _ in batch:
+                        self._notify()
+                    break
+                for _ in batch:
+                    self._notify()
+        finally:
+            self._stop_process()
+        logger.debug("Worker %s main loop ended", self.id)
+
+    def _stop_process(self) -> None:
+        try:
+            self._conn.send(None)  # type:ignore
+        except (OSError, ValueError):
+            pass
+        self._process.join(5)  # type:ignore
+        if self._process.is_alive():  # type:ignore
+            self._process.kill()  # type:ignore
+            self._process.join()  # type:ignore
+        self._conn.close()  # type:ignore
+
+
+__all__ = [
+    "ProcessWorker",
+]
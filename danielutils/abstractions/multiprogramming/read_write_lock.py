@@ -0,0 +1,113 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Generator, Optional
+
+
+class ReadWriteLock:
+    """A reentrant reader/writer lock.
+
+    Any number of threads may hold the lock for reading at the same time,
+    while a writer holds it exclusively. Waiting writers are preferred over new readers
+    so that a steady stream of readers can not starve them.
+
+    A thread holding the write lock may re-acquire it and may also acquire the read lock.
+    A thread holding only the read lock may re-acquire it but can not upgrade to writing.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers: Dict[int, int] = {}
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        """acquire the lock for reading, blocking while another thread writes
+        """
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me or me in self._readers:
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers[me] = 1
+
+    def release_read(self) -> None:
+        """release one level of read ownership held by the current thread
+
+        Raises:
+            RuntimeError: if the current thread does not hold the read lock
+        """
+        me = threading.get_ident()
+        with self._cond:
+            depth = self._readers.get(me)
+            if depth is None:
+                raise RuntimeError("cannot release a read lock which is not held")
+            if depth == 1:
+                del self._readers[me]
+                if not self._readers:
+                    self._cond.notify_all()
+            else:
+                self._readers[me] = depth - 1
+
+    def acquire_write(self) -> None:
+        """acquire the lock exclusively, blocking while other threads read or write
+
+        Raises:
+            RuntimeError: if the current thread holds only the read lock
+        """
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("cannot upgrade a read lock to a write lock")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self) -> None:
+        """release one level of write ownership held by the current thread
+
+        Raises:
+            RuntimeError: if the current thread does not hold the write lock
+        """
+        with self._cond:
+            if self._writer != threading.get_ident():
+                raise RuntimeError("cannot release a write lock which is not held")
+            self._writer_depth -= 1
+            if self._writer_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self) -> Generator[None, None, None]:
+        """context manager holding the lock for reading
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Generator[None, None, None]:
+        """context manager holding the lock for writing
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+__all__ = [
+    "ReadWriteLock"
+]
@@ -0,0 +1,120 @@
+import random
+from collections import deque
+from threading import Condition, Lock
+from typing import Any, Deque, Dict, List, Optional
+from ...logging_.utils import get_logger
+
+logger = get_logger(__name__)
+
+# upper bound on how long an idle worker sleeps before looking for work to steal again
+_IDLE_RECHECK = 0.05
+
+
+class WorkStealingScheduler:
+    """Distributes jobs over per worker deques instead of one shared queue.
+
+    Submitted jobs land in a shared injection deque. A worker serves jobs from its own local deque,
+    refills it with a batch of up to 'batch_size' jobs from the injection deque when it runs dry,
+    and otherwise steals half of the jobs (at most 'batch_size') from the back of another worker's deque.
+    Workers touch the shared lock once per batch instead of once per job.
+
+    Like WorkerPool, once every submitted job was done the workers are released.
+    """
+
+    def __init__(self, batch_size: int = 16) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.batch_size = batch_size
+        self._cond = Condition(Lock())  # guards the injection deque and the counters
+        self._injection: Deque[Any] = deque()
+        self._locals: Dict[int, Deque[Any]] = {}
+        self._local_locks: Dict[int, Lock] = {}
+        self._unfinished = 0
+        self._sleepers = 0
+        self._finished = False
+        self.steals = 0
+
+    def register(self, worker_id: int) -> None:
+        """create the local deque of a worker, must be called before the worker calls get()"""
+        self._local_locks[worker_id] = Lock()
+        self._locals[worker_id] = deque()
+
+    def put(self, job: Any) -> None:
+        with self._cond:
+            self._injection.append(job)
+            self._unfinished += 1
+            self._finished = False
+            if self._sleepers:
+                self._cond.notify()
+
+    def qsize(self) -> int:
+        """amount of jobs which were not handed to a worker yet, approximate while workers run"""
+        return len(self._injection) + sum(len(local) for local in list(self._locals.values()))
+
+    def _refill(self) -> List[Any]:
+        with self._cond:
+            n = min(self.batch_size, len(self._injection))
+            return [self._injection.popleft() for _ in range(n)]
+
+    def _steal(self, thief: int) -> List[Any]:
+        victims = [worker_id for worker_id in self._locals if worker_id != thief]
+        random.shuffle(victims)
+        for victim in victims:
+            with self._local_locks[victim]:
+                local = self._locals[victim]
+                n = min(self.batch_size, (len(local) + 1) // 2)
+                if n:
+                    # take from the back, the owner serves from the front
+                    stolen = [local.pop() for _ in range(n)]
+                    stolen.reverse()
+                    self.steals += 1
+                    logger.debug("Worker %s stole %s jobs from worker %s", thief, n, victim)
+                    return stolen
+        return []
+
+    def get(self, worker_id: int, block: bool = True) -> Optional[Any]:
+        """
+        Args:
+            worker_id (int): the registered worker asking for a job
+            block (bool, optional): whether to wait for a job. Defaults to True.
+
+        Returns:
+            Optional[tuple]: a tuple holding the job, None once every job is done
+                (or when not blocking and no job is available)
+        """
+        own, own_lock = self._locals[worker_id], self._local_locks[worker_id]
+        while True:
+            with own_lock:
+                if own:
+                    return (own.popleft(),)
+            batch = self._refill() or self._steal(worker_id)
+            if batch:
+                if len(batch) > 1:
+                    with own_lock:
+                        own.extend(batch[1:])
+                    with self._cond:
+                        if self._sleepers:
+                            self._cond.notify()  # an idle worker may steal some of them
+                return (batch[0],)
+            if not block:
+                return None
+            with self._cond:
+                if self._finished:
+                    return None
+                if not self._injection:
+                    self._sleepers += 1
+                    self._cond.wait(_IDLE_RECHECK)
+                    self._sleepers -= 1
+
+    def done(self) -> None:
+        """mark one job as done, releasing the workers after the last one"""
+        with self._cond:
+            self._unfinished -= 1
+            if self._unfinished <= 0:
+                self._finished = True
+                self._cond.notify_all()
+
+
+__all__ = [
+    "WorkStealingScheduler",
+]
@@ -81,8 +81,7 @@ class Worker(ABC):
         will call 'notification_function'
         """
         logger.debug("Worker %s notifying pool of job completion", self.id)
-        # TODO
-        self.pool._notify_subscribers()  # type:ignore  # pylint: disable=protected-access
+        self.pool._notify()  # pylint: disable=protected-access
 
     def acquire(self) -> Optional[Tuple[Any]]:
         """acquire a new job object to work on from the pool
@@ -91,7 +90,7 @@ class Worker(ABC):
             Optional[tuple[Any]]: tuple of job object or None
         """
         logger.debug("Worker %s attempting to acquire job from pool", self.id)
-        job = self.pool._acquire()  # pylint: disable=protected-access
+        job = self.pool._acquire(self.id)  # pylint: disable=protected-access
         if job is not None:
             logger.debug("Worker %s acquired job: %s", self.id, type(job[0]).__name__)
         else:
@@ -1,8 +1,12 @@
-from queue import Queue
+from queue import Queue, Empty
 import logging
-from typing import Optional, Any, Type as t_type, Tuple as Tuple, List as List
-from threading import Semaphore
+import time
+from typing import Optional, Any, Type as t_type, Tuple as Tuple, List as List, Literal
+from threading import Semaphore, Lock, Event, Thread
 from .worker import Worker
+from .autoscale import AutoscalePolicy, Autoscaler
+from .process_worker import ProcessWorker
+from .work_stealing import WorkStealingScheduler
 from ...reflection import get_python_version
 from ...logging_.utils import get_logger
 
@@ -13,10 +17,31 @@ logger = get_logger(__name__)
 
 class WorkerPool:
     """A worker pool class
+
+    With an AutoscalePolicy the pool starts 'num_workers' workers (clamped to the policy's bounds),
+    adds workers while tasks wait for a busy pool and retires workers which idled for too long.
+
+    With backend="process" every worker is a thread feeding a dedicated process, which creates its own
+    instance of worker_class and runs its _work() on the jobs. Jobs are sent in batches of up to 'batch_size'.
+    Inside the processes pool.global_variables is a copy, changes to it are not visible to the pool.
+
+    With work_stealing=True jobs are not served from one shared queue but from per worker deques,
+    see WorkStealingScheduler. Workers refill their deque with batches of up to 'batch_size' jobs.
+    Without an explicit 'batch_size' the scheduler's default is used, otherwise it defaults to 1.
     """
 
-    def __init__(self, num_workers: int, worker_class: t_type[Worker], w_kwargs: dict, global_variables: dict) -> None:
+    def __init__(self, num_workers: int, worker_class: t_type[Worker], w_kwargs: dict, global_variables: dict,
+                 autoscale: Optional[AutoscalePolicy] = None, *, backend: Literal["thread", "process"] = "thread",
+                 work_stealing: bool = False, batch_size: Optional[int] = None) -> None:
         logger.info("Initializing WorkerPool with %s workers, worker_class=%s", num_workers, worker_class.__name__)
+        if backend not in ("thread", "process"):
+            raise ValueError("backend must be 'thread' or 'process'")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if work_stealing and autoscale is not None:
+            raise ValueError("autoscale is not supported together with work_stealing")
+        if autoscale is not None:
+            num_workers = autoscale.clamp(num_workers)
         self.num_workers = num_workers
         self.global_variables: dict = global_variables
         self.q: Queue[Tuple[Any]] = Queue()
@@ -24,6 +49,19 @@ class WorkerPool:
         self.workers: List[Worker] = []
         self.sem = Semaphore(0)
         self.w_kwargs = w_kwargs
+        self.autoscale = autoscale
+        self._autoscaler = Autoscaler(autoscale) if autoscale is not None else None
+        self._lock = Lock()
+        self._idle_workers = 0
+        self._next_worker_id = 0
+        self._stop_scaling = Event()
+        self.backend = backend
+        self._scheduler: Optional[WorkStealingScheduler] = None
+        if work_stealing:
+            # a batch of 1 leaves nothing in the local deques to steal
+            self._scheduler = WorkStealingScheduler() if batch_size is None else WorkStealingScheduler(batch_size)
+            batch_size = self._scheduler.batch_size
+        self.batch_size: int = batch_size if batch_size is not None else 1
         logger.debug("WorkerPool initialized: num_workers=%s, global_vars_count=%s, worker_kwargs_count=%s", num_workers, len(global_variables), len(w_kwargs))
 
     def submit(self, job: Any) -> None:
@@ -35,20 +73,31 @@ class WorkerPool:
             job (Any): job object
         """
         logger.debug("Submitting job to pool: job_type=%s", type(job).__name__)
+        if self._scheduler is not None:
+            self._scheduler.put(job)
+            return
         # we create a tuple to signal that it is indeed a job object and we haven't just got None
         # see Worker._loop
         self.q.put((job,))
         self.sem.release()
         logger.debug("Job submitted successfully, queue_size=%s, semaphore_value=%s", self.q.qsize(), self.sem._value)
 
-    def _acquire(self) -> Optional[Tuple[Any]]:
+    def _acquire(self, worker_id: Optional[int] = None) -> Optional[Tuple[Any]]:
         """acquire a new job from the pool
 
+        Args:
+            worker_id (Optional[int]): id of the acquiring worker, required with work stealing
+
         Returns:
             Optional[tuple[Any]]: optional tuple of job object
         """
         logger.debug("Acquiring job from pool")
-        self.sem.acquire()
+        if self._scheduler is not None:
+            return self._scheduler.get(worker_id)  # type:ignore
+        if self._autoscaler is None:
+            self.sem.acquire()
+        elif not self._acquire_or_retire():
+            return None
         if self.q.unfinished_tasks > 0:
             job = self.q.get()
             logger.debug("Job acquired successfully, remaining_tasks=%s", self.q.unfinished_tasks)
@@ -56,27 +105,109 @@ class WorkerPool:
         logger.debug("No jobs available in pool")
         return None
 
+    def _try_acquire(self, worker_id: int) -> Optional[Tuple[Any]]:
+        """acquire a new job from the pool without waiting for one
+        """
+        if self._scheduler is not None:
+            return self._scheduler.get(worker_id, block=False)
+        if not self.sem.acquire(blocking=False):
+            return None
+        try:
+            return self.q.get_nowait()
+        except Empty:
+            self.sem.release()  # the token releases the workers once all jobs are done, give it back
+            return None
+
+    def _acquire_batch(self, worker_id: int) -> List[Any]:
+        """wait for a job and take up to batch_size - 1 more jobs which are available right away
+
+        Returns:
+            list[Any]: the job objects, empty if there are no more jobs
+        """
+        first = self._acquire(worker_id)
+        if first is None:
+            return []
+        batch = [first[0]]
+        while len(batch) < self.batch_size:
+            job = self._try_acquire(worker_id)
+            if job is None:
+                break
+            batch.append(job[0])
+        return batch
+
+    def _acquire_or_retire(self) -> bool:
+        """wait for a job while autoscaling
+
+        Returns:
+            bool: True once a job is available, False if the worker should retire after idling
+        """
+        policy: AutoscalePolicy = self.autoscale  # type:ignore
+        while True:
+            with self._lock:
+                self._idle_workers += 1
+            acquired = self.sem.acquire(timeout=policy.idle_timeout)
+            with self._lock:
+                self._idle_workers -= 1
+                if acquired:
+                    return True
+                if self._autoscaler.may_retire(time.monotonic(), self.num_workers):  # type:ignore
+                    self.num_workers -= 1
+                    logger.info("Worker retired after idling, %s workers left", self.num_workers)
+                    return False
+
+    def _spawn(self) -> None:
+        """create and start a new worker, callers hold self._lock or are the only thread accessing the pool
+        """
+        worker_id = self._next_worker_id
+        self._next_worker_id += 1
+        logger.debug("Creating worker %s", worker_id)
+        if self._scheduler is not None:
+            self._scheduler.register(worker_id)
+        if self.backend == "process":
+            w: Worker = ProcessWorker(worker_id, self)
+        else:
+            w = self.worker_class(worker_id, self, **self.w_kwargs)
+        w.run()
+        self.workers.append(w)
+        logger.debug("Worker %s started successfully", worker_id)
+
+    def _scale(self) -> None:
+        """main loop of the autoscaling thread
+        """
+        policy: AutoscalePolicy = self.autoscale  # type:ignore
+        while not self._stop_scaling.wait(policy.check_interval):
+            with self._lock:
+                amount = self._autoscaler.workers_to_add(  # type:ignore
+                    time.monotonic(), self.num_workers, self._idle_workers, self.q.qsize())
+                self.num_workers += amount
+                for _ in range(amount):
+                    self._spawn()
+
     def start(self) -> None:
         """starts running the pool of workers
         """
         logger.info("Starting worker pool with %s workers", self.num_workers)
-        for i in range(self.num_workers):
-            logger.debug("Creating worker %s/%s", i+1, self.num_workers)
-            w = self.worker_class(i, self, **self.w_kwargs)
-            w.run()
-            self.workers.append(w)
-            logger.debug("Worker %s started successfully", i+1)
+        for _ in range(self.num_workers):
+            self._spawn()
+        if self.autoscale is not None:
+            Thread(target=self._scale, daemon=True).start()
         logger.info("Worker pool started with %s workers", len(self.workers))
 
     def _notify(self) -> None:
         """a function that the worker calls after finishing processing a job object (Any)
         this function is called automatically from Worker.work()
         """
+        if self._scheduler is not None:
+            self._scheduler.done()
+            return
         logger.debug("Worker notification received, unfinished_tasks=%s", self.q.unfinished_tasks)
         self.q.task_done()
         if self.q.unfinished_tasks <= 0:
             logger.debug("All tasks completed, releasing all workers")
-            self.sem.release(self.num_workers)
+            self._stop_scaling.set()
+            with self._lock:
+                if self.num_workers > 0:
+                    self.sem.release(self.num_workers)
         logger.debug("Notification processed, remaining_tasks=%s", self.q.unfinished_tasks)
 
     def join(self) -> None:
@@ -86,10 +217,15 @@ class WorkerPool:
             None
         """
         logger.info("Joining worker pool with %s workers", len(self.workers))
-        for i, w in enumerate(self.workers):
-            logger.debug("Joining worker %s/%s", i+1, len(self.workers))
+        joined = 0
+        # workers may still be added by autoscaling while joining
+        while joined < len(self.workers):
+            w = self.workers[joined]
+            logger.debug("Joining worker %s/%s", joined + 1, len(self.workers))
             w.thread.join()
-            logger.debug("Worker %s joined successfully", i+1)
+            logger.debug("Worker %s joined successfully", joined + 1)
+            joined += 1
+        self._stop_scaling.set()
         logger.info("All workers joined successfully")
 
 
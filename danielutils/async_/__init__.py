@@ -1,7 +1,10 @@
 from .async_cmd import *
 from .async_command import *
+from .async_command_batch import *
 from .async_layered_command import *
+from .async_shell_session import *
 from .async_retry_executor import *
 from .async_worker_pool import *
 from .time_strategy import *
 from .utils import *
+from .worker_pool_metrics import *
@@ -6,24 +6,30 @@ with state tracking, result handling, and CLI/GUI strategy support using async p
 """
 
 import asyncio
+import codecs
 import functools
 import logging
 import os
 import subprocess
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional, Union, Callable, Dict, Literal
+from typing import List, Optional, Union, Callable, Dict, Literal, AsyncIterator, Deque
 from datetime import datetime
 from ..logging_.utils import get_logger
 
 logger = get_logger(__name__)
 
+_READ_CHUNK_SIZE = 64 * 1024
+# an unterminated line longer than this is yielded in pieces instead of being buffered whole
+_MAX_PENDING_LINE = 1024 * 1024
+
 
 async def _to_thread(func: Callable, /, *args, **kwargs):
     if hasattr(asyncio, "to_thread"):
         return await asyncio.to_thread(func, *args, **kwargs)
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
     return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
 
 
@@ -52,6 +58,13 @@ class CommandResponse:
     result: Optional[CommandResult] = None
 
 
+@dataclass
+class CommandOutput:
+    """A line or chunk of output produced by a running command."""
+    stream: Literal["stdout", "stderr"]
+    text: str
+
+
 class CommandState(Enum):
     """Enumeration of possible command states."""
     PENDING = "pending"
@@ -85,6 +98,7 @@ class CommandExecutionResult:
     pid: Optional[int] = None
     command_type: CommandType = CommandType.CLI
     exception: Optional[Exception] = None
+    output_truncated: bool = False  # whether only the tail of stdout / stderr was retained
 
     def __str__(self) -> str:
         """String representation of the result."""
@@ -122,6 +136,8 @@ class AsyncCommand:
             on_start: Optional[Callable[['AsyncCommand'], None]] = None,
             on_complete: Optional[Callable[['AsyncCommand', CommandExecutionResult], None]] = None,
             on_error: Optional[Callable[['AsyncCommand', Exception], None]] = None,
+            output_tail_lines: Optional[int] = None,
+            stream_buffer_size: int = 256,
     ):
         """
         Initialize the AsyncCommand.
@@ -135,6 +151,8 @@ class AsyncCommand:
             on_start: Callback called when command starts
             on_complete: Callback called when command completes
             on_error: Callback called when command fails
+            output_tail_lines: Keep only this many last lines of stdout and stderr in the result (None keeps all)
+            stream_buffer_size: Maximum amount of output pieces buffered while streaming
         """
         logger.debug("Initializing AsyncCommand with args=%s, command_type=%s, timeout=%s", args, command_type, timeout)
         self.args = args
@@ -148,6 +166,10 @@ class AsyncCommand:
         self.on_start = on_start
         self.on_complete = on_complete
         self.on_error = on_error
+        if output_tail_lines is not None and output_tail_lines < 0:
+            raise ValueError("output_tail_lines must not be negative")
+        self.output_tail_lines = output_tail_lines
+        self.stream_buffer_size = stream_buffer_size
 
         # State management
         self._state = CommandState.PENDING
@@ -166,6 +188,11 @@ class AsyncCommand:
         """Check if the command is currently running."""
         return self._state == CommandState.RUNNING
 
+    @property
+    def pid(self) -> Optional[int]:
+        """The process id, None until the process was started."""
+        return self._process.pid if self._process else None
+
     @property
     def is_completed(self) -> bool:
         """Check if the command has completed (successfully or not)."""
@@ -179,6 +206,7 @@ class AsyncCommand:
     async def execute(self, timeout: Optional[float] = None) -> CommandExecutionResult:
         """
         Execute the command asynchronously.
+        Cancelling it kills the process and leaves a KILLED result.
 
         Args:
             timeout: Override the default timeout for this execution
@@ -267,10 +295,98 @@ class AsyncCommand:
 
             return result
 
+    async def stream(self, timeout: Optional[float] = None, *, lines: bool = True) -> AsyncIterator[CommandOutput]:
+        """
+        Execute the command and yield its output as it is produced.
+
+        Output of both stdout and stderr is decoded incrementally and passed through a bounded
+        buffer, so a slow consumer applies backpressure on the process instead of accumulating
+        its output in memory. When the iteration finishes the result is available through
+        `result`, retaining only the last `output_tail_lines` lines if that was set.
+        Breaking out of the iteration or cancelling the iterating task kills the process.
+
+        Args:
+            timeout: Override the default timeout for this execution
+            lines: Whether to yield whole lines (including their line terminator) or decoded chunks as read
+
+        Yields:
+            CommandOutput: a line or a chunk of output and the stream it came from
+
+        Raises:
+            RuntimeError: If command is not in pending state
+            ValueError: If the command is a GUI command, which does not capture output
+        """
+        if self.command_type != CommandType.CLI:
+            raise ValueError("Only CLI commands can stream their output")
+        if self._state != CommandState.PENDING:
+            raise RuntimeError(f"Command is not in pending state: {self._state}")
+        if not self.args:
+            await self.execute(timeout)
+            return
+
+        self._state = CommandState.RUNNING
+        self._start_time = datetime.now()
+        if self.on_start:
+            self.on_start(self)
+        outputs = self._stream_cli(timeout, lines)
+        try:
+            async for output in outputs:
+                yield output
+        finally:
+            # make sure the process is killed when the caller stops iterating early
+            await outputs.aclose()
+
     async def _execute_cli_strategy(self, timeout: Optional[float] = None) -> CommandExecutionResult:
         """Execute using CLI strategy asynchronously."""
+        # line splitting is only needed when keeping the tail of the output
+        async for _ in self._stream_cli(timeout, lines=self.output_tail_lines is not None):
+            pass
+        return self._result  # type:ignore
+
+    async def _read_output(self, reader: asyncio.StreamReader, stream: Literal["stdout", "stderr"],
+                           queue: "asyncio.Queue[Optional[CommandOutput]]", lines: bool) -> None:
+        """Read a pipe until EOF, putting decoded output on the queue followed by None."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        try:
+            while True:
+                data = await reader.read(_READ_CHUNK_SIZE)
+                text = decoder.decode(data, final=not data)
+                if not lines:
+                    if text:
+                        await queue.put(CommandOutput(stream, text))
+                else:
+                    pending += text
+                    end = pending.rfind("\n") + 1
+                    if end:
+                        complete, pending = pending[:end], pending[end:]
+                        for line in complete.split("\n")[:-1]:
+                            await queue.put(CommandOutput(stream, line + "\n"))
+                    if pending and (not data or len(pending) >= _MAX_PENDING_LINE):
+                        # flush an unterminated last line or a line too long to buffer
+                        await queue.put(CommandOutput(stream, pending))
+                        pending = ""
+                if not data:
+                    break
+        except OSError as e:
+            self.logger.debug("Reading %s of %s failed: %s", stream, self.args, e)
+        await queue.put(None)
+
+    async def _stream_cli(self, timeout: Optional[float], lines: bool) -> AsyncIterator[CommandOutput]:
+        """Run the CLI process, yield its output and set the execution result when done."""
         start_time = self._start_time or datetime.now()
         effective_timeout = timeout if timeout is not None else self.timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + effective_timeout if effective_timeout is not None else None
+        retained: Dict[str, Union[List[str], Deque[str]]] = {
+            name: deque(maxlen=self.output_tail_lines) if self.output_tail_lines is not None else []
+            for name in ("stdout", "stderr")
+        }
+        truncated = False
+        timed_out = False
+        abandoned = False
+        returncode = -1
+        readers: List["asyncio.Task"] = []
 
         try:
             # Create subprocess
@@ -280,16 +396,25 @@ class AsyncCommand:
                 env.update(self.env)
 
             # Use asyncio.create_subprocess_exec instead of subprocess.Popen to avoid threading issues
-            # Set encoding to UTF-8 for proper unicode support
-            self._process = await asyncio.create_subprocess_exec(
+            self._process = await asyncio.create_subprocess_exec(  # type:ignore
                 *self.args,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 cwd=str(self.cwd) if self.cwd else None,
                 env=env
             )
-
-            pid = self._process.pid
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            self.logger.error("CLI subprocess execution failed (async)", extra={
+                "data": {
+                    "command": " ".join(self.args),
+                    "error": str(e),
+                    "timeout": effective_timeout
+                }
+            })
+            retained["stderr"].append(f"CLI command failed to start: {str(e)}")
+        else:
+            process = self._process
+            pid = process.pid
             self.logger.debug("CLI subprocess created (async)", extra={
                 "data": {
                     "pid": pid,
@@ -297,40 +422,27 @@ class AsyncCommand:
                     "timeout": effective_timeout
                 }
             })
-
-            # Wait for completion with timeout
+            queue: "asyncio.Queue[Optional[CommandOutput]]" = asyncio.Queue(maxsize=self.stream_buffer_size)
+            readers = [
+                asyncio.ensure_future(self._read_output(process.stdout, "stdout", queue, lines)),  # type:ignore
+                asyncio.ensure_future(self._read_output(process.stderr, "stderr", queue, lines)),  # type:ignore
+            ]
             try:
-                # Use asyncio.wait_for with the process directly instead of asyncio.to_thread
-                stdout, stderr = await asyncio.wait_for(self._process.communicate(),
-                                                        timeout=effective_timeout)
-                returncode = self._process.returncode
-
-                # Decode bytes to strings
-                stdout = stdout.decode('utf8') if stdout else ""
-                stderr = stderr.decode('utf8') if stderr else ""
-
-                if returncode == 0:
-                    self.logger.info("CLI subprocess completed successfully (async)", extra={
-                        "data": {
-                            "pid": pid,
-                            "command": " ".join(self.args),
-                            "returncode": returncode,
-                            "stdout_length": len(stdout),
-                            "stderr_length": len(stderr)
-                        }
-                    })
-                else:
-                    self.logger.warning("CLI subprocess completed with non-zero exit code (async)", extra={
-                        "data": {
-                            "pid": pid,
-                            "command": " ".join(self.args),
-                            "returncode": returncode,
-                            "stderr_length": len(stderr)
-                        }
-                    })
-
+                open_streams = len(readers)
+                while open_streams:
+                    remaining = deadline - loop.time() if deadline is not None else None
+                    output = await asyncio.wait_for(queue.get(), timeout=remaining)
+                    if output is None:
+                        open_streams -= 1
+                        continue
+                    kept = retained[output.stream]
+                    truncated = truncated or (isinstance(kept, deque) and len(kept) == kept.maxlen)
+                    kept.append(output.text)
+                    yield output
+                remaining = deadline - loop.time() if deadline is not None else None
+                returncode = await asyncio.wait_for(process.wait(), timeout=remaining)
             except asyncio.TimeoutError:
-                # Kill the process on timeout
+                timed_out = True
                 self.logger.warning("CLI subprocess timed out, killing process (async)", extra={
                     "data": {
                         "pid": pid,
@@ -338,106 +450,100 @@ class AsyncCommand:
                         "timeout": effective_timeout
                     }
                 })
-
-                try:
-                    self._process.kill()
-                    stdout, stderr = await self._process.communicate()
-                    # Decode bytes to strings
-                    stdout = stdout.decode('utf-8', errors='replace') if stdout else ""
-                    stderr = stderr.decode('utf-8', errors='replace') if stderr else ""
-                except (OSError, subprocess.SubprocessError, BaseException):
-                    stdout, stderr = "", ""
-                returncode = -1
-
-                self.logger.error("CLI subprocess killed due to timeout (async)", extra={
+            except (GeneratorExit, asyncio.CancelledError):
+                # the consumer stopped iterating or the task running the command was cancelled
+                abandoned = True
+                raise
+            finally:
+                if process.returncode is None:
+                    try:
+                        process.kill()
+                    except (OSError, subprocess.SubprocessError):
+                        pass
+                for reader in readers:
+                    reader.cancel()
+                if timed_out or abandoned:
+                    returncode = -1
+                    try:
+                        # reap the killed process even if the cancelled task is cancelled again meanwhile
+                        await asyncio.shield(process.wait())
+                    except (OSError, subprocess.SubprocessError):
+                        pass
+                    finally:
+                        if abandoned:
+                            self._state = CommandState.KILLED
+                            self._finish_cli(start_time, effective_timeout, returncode, retained, truncated, False)
+
+            if returncode == 0:
+                self.logger.info("CLI subprocess completed successfully (async)", extra={
                     "data": {
                         "pid": pid,
                         "command": " ".join(self.args),
-                        "timeout": effective_timeout,
-                        "stderr_length": len(stderr),
-                        "stdout_length": len(stdout)
+                        "returncode": returncode,
                     }
                 })
+            elif not timed_out:
+                self.logger.warning("CLI subprocess completed with non-zero exit code (async)", extra={
+                    "data": {
+                        "pid": pid,
+                        "command": " ".join(self.args),
+                        "returncode": returncode,
+                    }
+                })
+        self._finish_cli(start_time, effective_timeout, returncode, retained, truncated, timed_out)
 
-                # Set timeout state and return early
-                end_time = datetime.now()
-                execution_time = (end_time - start_time).total_seconds()
-
-                result = CommandExecutionResult(
-                    command=self,
-                    success=False,
-                    return_code=returncode,
-                    stdout=stdout or "",
-                    stderr=stderr or "",
-                    execution_time=execution_time,
-                    state=CommandState.TIMEOUT,
-                    timeout_occurred=True,
-                    start_time=start_time,
-                    end_time=end_time,
-                    pid=pid,
-                    command_type=self.command_type
-                )
-
-                self._state = CommandState.TIMEOUT
-                self._result = result
-
-                if self.on_complete:
-                    self.on_complete(self, result)
-
-                return result
-
-        except (OSError, ValueError, subprocess.SubprocessError) as e:
-            returncode = -1
-            stdout = ""
-            stderr = f"CLI command failed to start: {str(e)}"
-
-            self.logger.error("CLI subprocess execution failed (async)", extra={
-                "data": {
-                    "command": " ".join(self.args),
-                    "error": str(e),
-                    "timeout": effective_timeout
-                }
-            })
-
+    def _finish_cli(self, start_time: datetime, effective_timeout: Optional[float], returncode: int,
+                    retained: Dict[str, Union[List[str], Deque[str]]], truncated: bool,
+                    timed_out: bool) -> None:
+        """Build and store the CLI execution result and call the lifecycle callbacks."""
         end_time = datetime.now()
         execution_time = (end_time - start_time).total_seconds()
-        success = returncode == 0
-        state = CommandState.COMPLETED if success else CommandState.FAILED
-
-        # Check if this was a timeout
-        timeout_occurred = False
-        if returncode == -1 and effective_timeout is not None and execution_time >= effective_timeout * 0.9:
+        stdout = "".join(retained["stdout"])
+        stderr = "".join(retained["stderr"])
+        killed = self._state == CommandState.KILLED
+        success = returncode == 0 and not killed
+        if timed_out:
             state = CommandState.TIMEOUT
-            timeout_occurred = True
+        elif killed:
+            state = CommandState.KILLED
+        else:
+            state = CommandState.COMPLETED if success else CommandState.FAILED
+            # Check if this was a timeout
+            if returncode == -1 and effective_timeout is not None and execution_time >= effective_timeout * 0.9:
+                state = CommandState.TIMEOUT
+                timed_out = True
 
         result = CommandExecutionResult(
             command=self,
             success=success,
             return_code=returncode,
-            stdout=stdout or "",
-            stderr=stderr or "",
+            stdout=stdout,
+            stderr=stderr,
             execution_time=execution_time,
             state=state,
-            timeout_occurred=timeout_occurred,
+            killed=killed,
+            timeout_occurred=timed_out,
             start_time=start_time,
             end_time=end_time,
             pid=self._process.pid if self._process else None,
-            command_type=self.command_type
+            command_type=self.command_type,
+            output_truncated=truncated
         )
 
         self._state = state
         self._result = result
 
         # Call appropriate callback based on result
-        if not success and self.on_error:
+        if timed_out:
+            if self.on_complete:
+                self.on_complete(self, result)
+        elif not success and self.on_error:
             # Create a generic exception for non-zero return codes
             error = RuntimeError(f"Command failed with return code {returncode}")
             self.on_error(self, error)
         elif self.on_complete:
             self.on_complete(self, result)
 
-        return result
-
     async def _execute_gui_strategy(self, timeout: Optional[float] = None) -> CommandExecutionResult:
         """Execute using GUI strategy asynchronously."""
         start_time = self._start_time or datetime.now()
@@ -871,6 +977,7 @@ class CommonCommands:
 __all__ = [
     "CommandResult",
     "CommandResponse",
+    "CommandOutput",
     "CommandState",
     "CommandType",
     "CommandExecutionResult",
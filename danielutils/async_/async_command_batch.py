@@ -0,0 +1,183 @@
+"""
+Concurrency limited batch execution of AsyncCommand instances.
+"""
+import asyncio
+import os
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+from .async_command import AsyncCommand, CommandExecutionResult, CommandState
+from ..logging_.utils import get_logger
+
+logger = get_logger(__name__)
+
+# seconds between attempts to kill the running commands of a stopping batch, a command which is still
+# being started can only be killed once its process exists
+_KILL_RETRY_INTERVAL = 0.05
+
+
+class AsyncCommandBatch:
+    """
+    Runs a list of commands with at most `max_concurrency` of them running at the same time.
+
+    Only `max_concurrency` worker tasks are created regardless of the amount of commands,
+    each of them taking the next pending command when the previous one finishes.
+
+    Usage:
+        batch = AsyncCommandBatch(commands, max_concurrency=8, timeout=30, fail_fast=True)
+        async for result in batch.as_completed():
+            ...
+    """
+
+    def __init__(
+            self,
+            commands: Iterable[AsyncCommand],
+            max_concurrency: Optional[int] = None,
+            timeout: Optional[float] = None,
+            fail_fast: bool = False,
+    ) -> None:
+        """
+        Args:
+            commands: The commands to run, all must be in pending state
+            max_concurrency: Maximum amount of commands running at once. Defaults to os.cpu_count()
+            timeout: Per command timeout overriding the commands' own timeout (None keeps theirs)
+            fail_fast: Stop starting new commands and kill the running ones after the first failure
+
+        Raises:
+            ValueError: if a command is not in pending state or a limit is not positive
+        """
+        self._commands: List[AsyncCommand] = list(commands)
+        for command in self._commands:
+            if command.state != CommandState.PENDING:
+                raise ValueError(f"All commands must be in pending state, got {command} in state {command.state}")
+        self._max_concurrency: int = max_concurrency if max_concurrency is not None else (os.cpu_count() or 1)
+        if self._max_concurrency <= 0:
+            raise ValueError("max_concurrency must be strictly positive")
+        if timeout is not None and timeout <= 0.0:
+            raise ValueError("timeout must be strictly positive")
+        self._timeout = timeout
+        self._fail_fast = fail_fast
+        self._failed = False
+        self._started = False
+        # set when the consumer stopped early, no further commands are started
+        self._stopping = False
+        logger.debug("AsyncCommandBatch created with %d commands, max_concurrency=%d, timeout=%s, fail_fast=%s",
+                      len(self._commands), self._max_concurrency, timeout, fail_fast)
+
+    @property
+    def failed(self) -> bool:
+        """Whether any command has failed so far."""
+        return self._failed
+
+    @property
+    def commands(self) -> List[AsyncCommand]:
+        """The commands of this batch, commands skipped after a fail fast stay in pending state."""
+        return list(self._commands)
+
+    async def _worker(self, pending: "asyncio.Queue[Tuple[int, AsyncCommand]]",
+                      done: "asyncio.Queue[Optional[Tuple[int, CommandExecutionResult, asyncio.Event]]]") -> None:
+        try:
+            while not self._stopping and not (self._fail_fast and self._failed):
+                try:
+                    index, command = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                result = await command.execute(self._timeout)
+                # commands killed because the consumer stopped early did not fail
+                if not result.success and not self._failed and not self._stopping:
+                    self._failed = True
+                    if self._fail_fast:
+                        logger.warning("Command %s failed, stopping batch", command)
+                        self._kill_running()
+                consumed = asyncio.Event()
+                await done.put((index, result, consumed))
+                # the next command is only started once the consumer asked for another result, so a consumer
+                # which stopped early never leaves a command behind which is still being started
+                await consumed.wait()
+        finally:
+            await done.put(None)
+
+    def _kill_running(self) -> None:
+        for command in self._commands:
+            if command.state == CommandState.RUNNING and command.pid is not None:
+                command.kill()
+
+    async def as_completed(self) -> AsyncIterator[CommandExecutionResult]:
+        """
+        Run the commands and yield their results in completion order.
+        A worker starts its next command only after its previous result was consumed.
+        Closing the generator early or cancelling the iterating task kills the running commands,
+        waits for their processes to exit and starts no new ones.
+
+        Yields:
+            CommandExecutionResult: the result of each command which was started
+
+        Raises:
+            RuntimeError: if the batch has already been run
+        """
+        inner = self._run()
+        try:
+            async for _, result in inner:
+                yield result
+        finally:
+            await inner.aclose()
+
+    async def run(self) -> List[Optional[CommandExecutionResult]]:
+        """
+        Run the commands and wait for all of them.
+
+        Returns:
+            List[Optional[CommandExecutionResult]]: results in the order of the commands,
+            None for commands which were not started because of fail_fast
+        """
+        results: List[Optional[CommandExecutionResult]] = [None] * len(self._commands)
+        async for index, result in self._run():
+            results[index] = result
+        return results
+
+    async def _run(self) -> AsyncIterator[Tuple[int, CommandExecutionResult]]:
+        if self._started:
+            raise RuntimeError("AsyncCommandBatch can only be run once")
+        self._started = True
+        pending: "asyncio.Queue[Tuple[int, AsyncCommand]]" = asyncio.Queue()
+        for item in enumerate(self._commands):
+            pending.put_nowait(item)
+        done: "asyncio.Queue[Optional[Tuple[int, CommandExecutionResult, asyncio.Event]]]" = asyncio.Queue()
+        num_workers = min(self._max_concurrency, len(self._commands))
+        workers = [asyncio.ensure_future(self._worker(pending, done)) for _ in range(num_workers)]
+        try:
+            running = num_workers
+            while running:
+                item = await done.get()
+                if item is None:
+                    running -= 1
+                    continue
+                index, result, consumed = item
+                try:
+                    yield index, result
+                finally:
+                    consumed.set()
+            for worker in workers:
+                if worker.exception() is not None:
+                    raise worker.exception()  # type:ignore
+        finally:
+            if running:
+                # the caller stopped early or was cancelled. start no new commands and kill the running ones,
+                # the workers then finish on their own once the killed processes exited
+                self._stopping = True
+                while running:
+                    self._kill_running()
+                    try:
+                        item = await asyncio.wait_for(done.get(), timeout=_KILL_RETRY_INTERVAL)
+                    except asyncio.TimeoutError:
+                        continue
+                    if item is None:
+                        running -= 1
+                    else:
+                        item[2].set()
+                # retrieves the exceptions of the workers, the caller is not interested in them anymore
+                await asyncio.gather(*workers, return_exceptions=True)
+
+
+__all__ = [
+    "AsyncCommandBatch",
+]
@@ -3,6 +3,7 @@ import logging
 from typing import Optional, Tuple, List
 
 from .async_cmd import async_cmd
+from .async_shell_session import AsyncShellSession
 from ..logging_.utils import get_logger
 logger = get_logger(__name__)
 
@@ -31,8 +32,17 @@ class AsyncLayeredCommand:
             instance_capture_stdout: Optional[bool] = None,
             instance_capture_stderr: Optional[bool] = None,
             instance_raise_on_fail: Optional[bool] = None,
-            instance_verbose: Optional[bool] = None
+            instance_verbose: Optional[bool] = None,
+            session: bool = False
     ):
+        """
+        Args:
+            command (Optional[str], optional): the layer command prefixed to every executed command
+            prev_instance (Optional[AsyncLayeredCommand], optional): the enclosing layer. Defaults to the last opened one.
+            session (bool, optional): keep one shell process open while the context is entered, requires
+                'async with'. the layers are executed once when entering and commands are sent to the same shell,
+                so shell state persists between them. POSIX only. Defaults to False.
+        """
         logger.debug("Initializing AsyncLayeredCommand with command='%s', prev_instance=%s", command, prev_instance is not None)
         self._command = command if command is not None else ""
         self._instance_capture_stdout = instance_capture_stdout
@@ -43,10 +53,14 @@ class AsyncLayeredCommand:
         self._cur_class_prev_instance = AsyncLayeredCommand._class_prev_instance
         AsyncLayeredCommand._class_prev_instance = self
         self._has_entered: bool = False
+        self._use_session = session
+        self._session: Optional[AsyncShellSession] = None
         logger.debug("AsyncLayeredCommand initialized successfully")
 
     def __enter__(self):
         logger.debug("Entering AsyncLayeredCommand context")
+        if self._use_session:
+            raise RuntimeError("AsyncLayeredCommand with session=True must be used with 'async with'")
         self._open()
         return self
 
@@ -55,10 +69,35 @@ class AsyncLayeredCommand:
         if self.prev is self._cur_class_prev_instance:
             AsyncLayeredCommand._class_prev_instance = self.prev
 
+    async def __aenter__(self):
+        logger.debug("Entering AsyncLayeredCommand async context")
+        self._open()
+        if self._use_session:
+            self._session = AsyncShellSession()
+            await self._session.open()
+            for layer in self._layers():
+                code, _, stderr = await self._session.run(layer)
+                if code != 0:
+                    logger.warning("Layer '%s' failed with exit code %d: %s", layer, code,
+                                   stderr.decode(errors="replace").strip())
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self.__exit__(exc_type, exc_val, exc_tb)
+
     def _open(self) -> None:
         logger.debug("Opening AsyncLayeredCommand")
         self._has_entered = True
 
+    def _layers(self) -> List[str]:
+        layers = self.prev._layers() if self.prev is not None else []
+        if self._command != "":
+            layers.append(self._command)
+        return layers
+
     def _build_command(self, *commands: str) -> str:
         logger.debug("Building command with %d additional commands", len(commands))
         res = ""
@@ -104,6 +143,18 @@ class AsyncLayeredCommand:
         raise_on_fail = self._merge_values(command_raise_on_fail, self._instance_raise_on_fail,
                                            self.class_raise_on_fail)
 
+        if self._session is not None:
+            command = "\n".join(commands)
+            code, stdout, stderr = await self._session.run(command)
+            logger.info("Session command execution completed with return code %d", code)
+            self._error(raise_on_fail and code != 0, command, code, command_verbose)
+            if not capture_stdout:
+                sys.stdout.write(stdout.decode(errors="replace"))
+            if not capture_stderr:
+                sys.stderr.write(stderr.decode(errors="replace"))
+            return (code, stdout.decode(errors="replace").splitlines() if capture_stdout else [],
+                    stderr.decode(errors="replace").splitlines() if capture_stderr else [])
+
         command = self._build_command(*commands)
         logger.debug("Executing command with capture_stdout=%s, capture_stderr=%s", capture_stdout, capture_stderr)
         if not capture_stdout and not capture_stderr:
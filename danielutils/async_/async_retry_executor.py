@@ -1,28 +1,71 @@
 import asyncio
 import functools
 import logging
+import math
+import time
+from collections import deque
 from datetime import datetime
-from typing import Literal, Optional, Any, Mapping, Iterable, Callable, Coroutine
+from typing import Literal, Optional, Any, Mapping, Iterable, Callable, Coroutine, Deque, List
 
 from ..custom_types import Supplier
 from ..decorators import normalize_decorator
 from .time_strategy import LinearTimeStrategy, ConstantTimeStrategy
+from ..retry_executor.circuit_breaker import CircuitBreaker, CircuitOpenError
+from ..retry_executor.retry_budget import RetryBudget
 from ..versioned_imports import ParamSpec
 from ..logging_.utils import get_logger
 
 P = ParamSpec("P")
 logger = get_logger(__name__)
 
+_LATENCY_WINDOW = 100
+_MIN_LATENCY_SAMPLES = 10
+
 
 class AsyncRetryExecutor:
     def __init__(
             self,
             timeout_strategy: Supplier[float] = LinearTimeStrategy(30, 5),
-            delay_strategy: Supplier[float] = ConstantTimeStrategy(0)
+            delay_strategy: Supplier[float] = ConstantTimeStrategy(0),
+            retry_budget: Optional[RetryBudget] = None,
+            circuit_breaker: Optional[CircuitBreaker] = None,
+            *,
+            hedge_delay: Optional[float] = None,
+            hedge_percentile: Optional[float] = None,
+            max_hedges: int = 1,
+            max_outstanding_hedges: int = 10
     ) -> None:
+        """
+        Args:
+            timeout_strategy: supplies the timeout of every attempt in seconds
+            delay_strategy: supplies the delay before every retry in seconds
+            retry_budget: an optional budget, possibly shared with other executors, which every retry draws from
+            circuit_breaker: an optional breaker, possibly shared with other executors, which every attempt must pass.
+                every exception and timeout of an attempt counts as a failure. while it is open execute() raises
+                CircuitOpenError, like it raises for every other reason to give up. RetryExecutor returns None instead
+            hedge_delay: enables hedging. seconds after which an attempt which has not finished yet is raced
+                by another concurrent call, the first success wins and the others are cancelled
+            hedge_percentile: enables hedging after the given percentile (0-100) of the latency of recent successful
+                calls, once enough calls were observed. until then hedge_delay is used if given
+            max_hedges: maximal amount of extra concurrent calls per attempt
+            max_outstanding_hedges: maximal amount of extra calls in flight across all executions of this executor,
+                so that a slow dependency is not hit with a multiple of its load
+        """
         logger.info("Initializing AsyncRetryExecutor with timeout_strategy=%s, delay_strategy=%s", type(timeout_strategy).__name__, type(delay_strategy).__name__)
         self.timeout_strategy = timeout_strategy
         self.delay_strategy = delay_strategy
+        self.retry_budget = retry_budget
+        self.circuit_breaker = circuit_breaker
+        if hedge_percentile is not None and not 0 < hedge_percentile < 100:
+            raise ValueError("hedge_percentile must be between 0 and 100")
+        if max_hedges < 1 or max_outstanding_hedges < 1:
+            raise ValueError("max_hedges and max_outstanding_hedges must be at least 1")
+        self.hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.max_hedges = max_hedges
+        self.max_outstanding_hedges = max_outstanding_hedges
+        self._outstanding_hedges = 0
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
         logger.debug("AsyncRetryExecutor initialized successfully")
 
     def is_transient(self, e: Exception) -> bool:
@@ -36,35 +79,157 @@ class AsyncRetryExecutor:
         """
         return False
 
+    @property
+    def hedging(self) -> bool:
+        """whether attempts may be raced by hedged calls"""
+        return self.hedge_delay is not None or self.hedge_percentile is not None
+
+    def _current_hedge_delay(self) -> Optional[float]:
+        if self.hedge_percentile is not None and len(self._latencies) >= _MIN_LATENCY_SAMPLES:
+            ordered = sorted(self._latencies)
+            return ordered[min(len(ordered) - 1, math.ceil(len(ordered) * self.hedge_percentile / 100) - 1)]
+        return self.hedge_delay
+
+    async def _attempt(self, func: Callable[..., Coroutine], args: list, kwargs: dict, timeout: float) -> Any:
+        if not self.hedging:
+            return await asyncio.wait_for(func(*args, **kwargs), timeout=timeout)
+
+        loop = asyncio.get_running_loop()
+        end = loop.time() + timeout
+        started = {}
+        tasks: List[asyncio.Task] = []
+
+        def launch(hedge: bool) -> None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            started[task] = loop.time()
+            tasks.append(task)
+            if hedge:
+                self._outstanding_hedges += 1
+                task.add_done_callback(self._hedge_done)
+
+        launch(False)
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                now = loop.time()
+                if now >= end:
+                    raise asyncio.TimeoutError()
+                wait = end - now
+                hedge_delay = self._current_hedge_delay()
+                can_hedge = hedge_delay is not None and len(tasks) <= self.max_hedges and \
+                    self._outstanding_hedges < self.max_outstanding_hedges
+                if can_hedge:
+                    wait = min(wait, max(0.0, started[tasks[-1]] + hedge_delay - now))  # type:ignore
+                done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._latencies.append(loop.time() - started[task])
+                        if task is not tasks[0]:
+                            logger.debug("Hedged call %d of %s won", tasks.index(task), func.__name__)
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error  # type:ignore
+                # other executions may have started hedges while waiting
+                if not done and can_hedge and loop.time() >= started[tasks[-1]] + hedge_delay and \
+                        self._outstanding_hedges < self.max_outstanding_hedges:  # type:ignore
+                    logger.debug("Attempt of %s is slow, starting hedged call %d", func.__name__, len(tasks))
+                    launch(True)
+                    pending.add(tasks[-1])
+        finally:
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
+
+    def _hedge_done(self, task: asyncio.Task) -> None:  # pylint: disable=unused-argument
+        self._outstanding_hedges -= 1
+
     async def execute(
             self,
             func: Callable[P, Coroutine],
             *,
             args: Optional[Iterable] = None,
             kwargs: Optional[Mapping] = None,
-            max_tries: int = 5
+            max_tries: int = 5,
+            deadline: Optional[float] = None
     ) -> Optional[Any]:
+        """
+        Await func until it succeeds or raises a non transient exception.
+
+        Args:
+            func: the coroutine function to call
+            args: positional arguments for func
+            kwargs: keyword arguments for func
+            max_tries: maximal amount of attempts
+            deadline: seconds from now across all attempts and delays. attempts are cut short at the deadline
+                and a delay which would end after it is not slept
+
+        Raises:
+            TimeoutError: if the deadline was reached
+            CircuitOpenError: if the circuit breaker is open
+            RuntimeError: if all attempts failed or the retry budget is exhausted
+
+        Returns:
+            the result of func
+        """
         args = list(args) if args else []
         kwargs = dict(kwargs) if kwargs else {}
-        logger.info("Starting async retry execution for %s with max_tries=%d", func.__name__, max_tries)
-        
+        logger.info("Starting async retry execution for %s with max_tries=%d, deadline=%s", func.__name__, max_tries,
+                    deadline)
+        end = time.monotonic() + deadline if deadline is not None else None
+        if self.retry_budget is not None:
+            self.retry_budget.record_attempt()
+
         for i in range(1, max_tries + 1):
             timeout = self.timeout_strategy()
             delay = self.delay_strategy()
+            cut_short = False
+            if end is not None:
+                remaining = end - time.monotonic()
+                cut_short = remaining < timeout
+                timeout = min(timeout, remaining)
+                if timeout <= 0:
+                    raise TimeoutError(f"Deadline of {deadline}s reached after {i - 1} attempts")
             logger.debug("Attempt %d/%d with timeout=%ss, delay=%ss", i, max_tries, timeout, delay)
+            breaker = self.circuit_breaker
+            generation = breaker.try_acquire() if breaker is not None else None
+            if breaker is not None and generation is None:
+                logger.error("Circuit breaker is open, failing %s fast after %d attempts", func.__name__, i - 1)
+                raise CircuitOpenError(f"Circuit breaker is open for {func.__name__}")
             try:
-                result = await asyncio.wait_for(func(*args, **kwargs), timeout=timeout)
+                result = await self._attempt(func, args, kwargs, timeout)
+                if breaker is not None:
+                    breaker.record_success(generation)
                 logger.info("Async retry execution succeeded on attempt %d", i)
                 return result
+            except asyncio.CancelledError:
+                if breaker is not None:
+                    breaker.release(generation)
+                raise
             except Exception as e:
-                if self.is_transient(e):
-                    logger.warning("Failed attempt %d/%d with transient exception: %s: %s", i, max_tries, type(e).__name__, e)
-                    if i < max_tries - 1 and delay > 0:
-                        logger.debug("Waiting %ss before next attempt", delay)
-                        await asyncio.sleep(delay)
-                else:
+                if breaker is not None:
+                    breaker.record_failure(generation)
+                if cut_short and isinstance(e, asyncio.TimeoutError):
+                    # asyncio.TimeoutError is not the builtin TimeoutError before python 3.11
+                    logger.error("Deadline of %ss reached during attempt %d of %s", deadline, i, func.__name__)
+                    raise TimeoutError(f"Deadline of {deadline}s reached after {i} attempts") from e
+                if not self.is_transient(e):
                     logger.error("Non-transient exception on attempt %d: %s: %s", i, type(e).__name__, e)
                     raise e
+                logger.warning("Failed attempt %d/%d with transient exception: %s: %s", i, max_tries, type(e).__name__, e)
+                if i == max_tries:
+                    break
+                if end is not None and time.monotonic() + delay >= end:
+                    raise TimeoutError(f"Deadline of {deadline}s reached after {i} attempts") from e
+                if self.retry_budget is not None and not self.retry_budget.try_acquire_retry():
+                    logger.error("Retry budget exhausted after %d attempts for %s", i, func.__name__)
+                    raise RuntimeError("Retry budget exhausted") from e
+                if delay > 0:
+                    logger.debug("Waiting %ss before next attempt", delay)
+                    await asyncio.sleep(delay)
         logger.error("Failed all %d attempts for %s", max_tries, func.__name__)
         raise RuntimeError(f"Failed all attempts")
 
@@ -0,0 +1,141 @@
+import asyncio
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from ..system.shell_session import _READ_SIZE, _SentinelProtocol, _check_platform, _kill_group
+from ..logging_.utils import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncShellSession:
+    """An asyncio version of ShellSession, a long lived shell process which executes commands sent over its stdin.
+
+    Commands of a single session run one after the other, concurrent calls to run() wait for their turn.
+
+    Usage:
+        async with AsyncShellSession() as session:
+            await session.run("source .venv/bin/activate")
+            code, stdout, stderr = await session.run("python --version")
+    """
+
+    def __init__(self, shell: str = "/bin/sh", *, cwd: Optional[str] = None,
+                 env: Optional[Dict[str, str]] = None) -> None:
+        """
+        Args:
+            shell (str, optional): path of a POSIX compatible shell. Defaults to "/bin/sh".
+            cwd (Optional[str], optional): initial working directory. Defaults to the current one.
+            env (Optional[Dict[str, str]], optional): environment of the shell. Defaults to the current one.
+        """
+        _check_platform()
+        self._shell = shell
+        self._cwd = cwd
+        self._env = env
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._protocol = _SentinelProtocol()
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def is_alive(self) -> bool:
+        """whether the shell process is running"""
+        return self._process is not None and self._process.returncode is None
+
+    async def open(self) -> None:
+        """start the shell process, does nothing if it is already running
+        """
+        if self.is_alive:
+            return
+        logger.info("Starting async shell session with %s", self._shell)
+        self._lock = asyncio.Lock()
+        self._process = await asyncio.create_subprocess_exec(
+            self._shell, "-s", stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE, cwd=self._cwd, env=self._env, start_new_session=True)
+
+    async def close(self) -> None:
+        """terminate the shell process
+        """
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        logger.info("Closing async shell session %s", process.pid)
+        if process.returncode is None:
+            process.stdin.close()  # type:ignore
+            try:
+                await asyncio.wait_for(process.wait(), 1)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+
+    async def __aenter__(self) -> "AsyncShellSession":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def run(self, command: str, timeout: Optional[float] = None) -> Tuple[int, bytes, bytes]:
+        """execute command in the session and wait for it to finish
+
+        Args:
+            command (str): the command to execute
+            timeout (Optional[float], optional): seconds to wait for the command. Defaults to None.
+
+        Raises:
+            RuntimeError: if the session is not open or the shell exited while running the command
+            TimeoutError: if the command did not finish in time, the session is closed in that case
+
+        Returns:
+            Tuple[int, bytes, bytes]: return code, stdout, stderr
+        """
+        if not self.is_alive:
+            raise RuntimeError("shell session is not open")
+        async with self._lock:  # type:ignore
+            process: asyncio.subprocess.Process = self._process  # type:ignore
+            if process is None or process.returncode is not None:
+                raise RuntimeError("shell session is not open")
+            logger.debug("Running in async shell session %s: %s", process.pid, command)
+            process.stdin.write(self._protocol.wrap(command))  # type:ignore
+            try:
+                await process.stdin.drain()  # type:ignore
+                (stdout, code), stderr = await asyncio.wait_for(asyncio.gather(
+                    self._collect(process.stdout, self._protocol.find_stdout),  # type:ignore
+                    self._collect(process.stderr, self._protocol.find_stderr),  # type:ignore
+                ), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Command timed out after %ss in async shell session, closing it: %s", timeout, command)
+                await self._kill()
+                raise TimeoutError(  # pylint: disable=raise-missing-from
+                    f"command '{command}' timed out after {timeout} seconds")
+            except (EOFError, ConnectionResetError, BrokenPipeError):
+                await self._kill()
+                raise RuntimeError(f"shell exited while running '{command}'")  # pylint: disable=raise-missing-from
+            except asyncio.CancelledError:
+                # the shell is in the middle of a command, it can not be reused
+                await self._kill()
+                raise
+        logger.debug("Async shell session command finished with return code %s", code)
+        return code, stdout, stderr
+
+    async def _collect(self, reader: asyncio.StreamReader, find: Callable[[bytearray, int], Optional[T]]) -> T:
+        buffer = bytearray()
+        while True:
+            data = await reader.read(_READ_SIZE)
+            if not data:
+                raise EOFError()
+            # only the new data and a possibly split sentinel need to be searched
+            start = max(0, len(buffer) - self._protocol.max_sentinel_length)
+            buffer += data
+            result = find(buffer, start)
+            if result is not None:
+                return result
+
+    async def _kill(self) -> None:
+        if self._process is not None and self._process.returncode is None:
+            _kill_group(self._process.pid)
+        await self.close()
+
+
+__all__ = [
+    "AsyncShellSession",
+]
@@ -1,8 +1,14 @@
 import asyncio
+import functools
+import heapq
+import inspect
+import itertools
 import json
 import logging
+import time
 from collections import defaultdict
-from typing import Callable, Optional, Coroutine, List, Iterable, Any, Mapping, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Optional, Coroutine, List, Iterable, Any, Mapping, Tuple, Dict, Hashable, Union
 
 try:
     from tqdm import tqdm
@@ -12,6 +18,207 @@ except ImportError:
     tqdm = MockImportObject("'tqdm' is not installed. Please install 'tqdm' to use AsyncWorkerPool feature.")  # type: ignore
 
 from ..logging_.utils import get_logger
+from ..abstractions.multiprogramming.autoscale import AutoscalePolicy, Autoscaler
+from .worker_pool_metrics import LatencyHistogram, WorkerPoolMetrics
+
+# func, args, kwargs, name, key, submission time, cpu bound
+_Job = Tuple[Callable, Iterable[Any], Mapping[Any, Any], Optional[str], Optional[Hashable], float, bool]
+
+# task names beyond this amount are not given their own execution time histogram
+_MAX_TRACKED_NAMES = 256
+
+
+class _TokenBucket:
+    """rate limit of 'rate' tasks per second with bursts of up to 'burst' tasks
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst must be at least 1")
+        self.rate = rate
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.last: Optional[float] = None
+
+    def _refill(self, now: float) -> None:
+        if self.last is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def wait_time(self, now: float) -> float:
+        """seconds until a token is available, 0 if one is available now"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+
+class _KeyState:
+    __slots__ = ("heap", "in_flight", "limit", "bucket", "timer")
+
+    def __init__(self, limit: Optional[int] = None, bucket: Optional[_TokenBucket] = None) -> None:
+        self.heap: List[Tuple[int, int, _Job]] = []
+        self.in_flight = 0
+        self.limit = limit
+        self.bucket = bucket
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class _PriorityScheduler:
+    """hands out jobs by priority (then submission order) while respecting per key concurrency and rate limits.
+
+    every key has its own heap of jobs. a global heap holds the head of every key which may run now,
+    so picking the next job is O(log n) regardless of how many jobs wait on saturated keys.
+    a key which is only blocked by its rate limit is re-armed with a timer when its next token is due.
+    """
+
+    def __init__(self, default_key_limit: Optional[int]) -> None:
+        self._default_key_limit = default_key_limit
+        self._keys: Dict[Optional[Hashable], _KeyState] = {None: _KeyState()}
+        self._ready: List[Tuple[int, int, Optional[Hashable]]] = []
+        self._counter = itertools.count()
+        self._queued = 0
+        self._unfinished = 0
+        self._closed = False
+        self._cond: Optional[asyncio.Condition] = None
+        self._idle: Optional[asyncio.Event] = None
+
+    @property
+    def cond(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    @property
+    def idle(self) -> asyncio.Event:
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            if self._unfinished == 0:
+                self._idle.set()
+        return self._idle
+
+    def qsize(self) -> int:
+        return self._queued
+
+    def configure(self, key: Hashable, limit: Optional[int], bucket: Optional[_TokenBucket]) -> None:
+        state = self._state(key)
+        state.limit = limit
+        state.bucket = bucket
+        if self._arm(key, state):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return  # no worker can be waiting yet
+            asyncio.ensure_future(self._notify())
+
+    def _state(self, key: Optional[Hashable]) -> _KeyState:
+        state = self._keys.get(key)
+        if state is None:
+            state = self._keys[key] = _KeyState(self._default_key_limit)
+        return state
+
+    def _arm(self, key: Optional[Hashable], state: _KeyState) -> bool:
+        """push the head of key to the ready heap if it may run now
+
+        Returns:
+            bool: whether it was pushed
+        """
+        if not state.heap or (state.limit is not None and state.in_flight >= state.limit):
+            return False
+        if state.bucket is not None:
+            loop = asyncio.get_event_loop()
+            wait = state.bucket.wait_time(loop.time())
+            if wait > 0:
+                if state.timer is None:
+                    state.timer = loop.call_later(wait, self._on_timer, key, state)
+                return False
+        priority, seq, _ = state.heap[0]
+        heapq.heappush(self._ready, (priority, seq, key))
+        return True
+
+    def _on_timer(self, key: Optional[Hashable], state: _KeyState) -> None:
+        state.timer = None
+        if self._arm(key, state):
+            asyncio.ensure_future(self._notify())
+
+    async def _notify(self) -> None:
+        async with self.cond:
+            self.cond.notify()
+
+    async def put(self, job: _Job, priority: int) -> None:
+        key = job[4]
+        state = self._state(key)
+        heapq.heappush(state.heap, (-priority, next(self._counter), job))
+        self._queued += 1
+        self._unfinished += 1
+        self.idle.clear()
+        if self._arm(key, state):
+            await self._notify()
+
+    def _pop_ready(self) -> Optional[_Job]:
+        while self._ready:
+            _, seq, key = heapq.heappop(self._ready)
+            state = self._keys[key]
+            if not state.heap or state.heap[0][1] != seq:
+                continue  # stale entry, the job was already handed out
+            if state.limit is not None and state.in_flight >= state.limit:
+                continue
+            if state.bucket is not None:
+                loop = asyncio.get_event_loop()
+                if state.bucket.wait_time(loop.time()) > 0:
+                    self._arm(key, state)
+                    continue
+                state.bucket.take(loop.time())
+            _, _, job = heapq.heappop(state.heap)
+            state.in_flight += 1
+            self._queued -= 1
+            self._arm(key, state)
+            return job
+        return None
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[_Job]:
+        """wait for the next job, None once the scheduler is closed and no job can run
+
+        Raises:
+            asyncio.TimeoutError: if no job could run within timeout seconds
+        """
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        async with self.cond:
+            while True:
+                job = self._pop_ready()
+                if job is not None:
+                    return job
+                if self._closed:
+                    return None
+                if deadline is None:
+                    await self.cond.wait()
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                try:
+                    await asyncio.wait_for(self.cond.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass  # a job may have become ready right before the timeout, checked above
+
+    async def done(self, job: _Job) -> None:
+        key = job[4]
+        state = self._keys[key]
+        state.in_flight -= 1
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self.idle.set()
+        if self._arm(key, state):
+            await self._notify()
+
+    async def close(self) -> None:
+        self._closed = True
+        async with self.cond:
+            self.cond.notify_all()
+
 
 class AsyncWorkerPool:
     DEFAULT_ORDER_IF_KEY_EXISTS = (
@@ -35,15 +242,64 @@ class AsyncWorkerPool:
         """
         AsyncWorkerPool._logger.log(level, message, *args, **kwargs)
 
-    def __init__(self, pool_name: str, num_workers: int = 5, show_pbar: bool = False) -> None:
+    def __init__(self, pool_name: str, num_workers: int = 5, show_pbar: bool = False,
+                 default_key_concurrency: Optional[int] = None, *, log_tasks: bool = False,
+                 metrics_callback: Optional[Callable[[WorkerPoolMetrics], None]] = None,
+                 metrics_interval: float = 10.0, autoscale: Optional[AutoscalePolicy] = None,
+                 executor: Optional[Executor] = None, cpu_executor: Optional[Executor] = None) -> None:
+        """
+        Args:
+            pool_name: name of the pool used in logs
+            num_workers: amount of tasks running concurrently
+            show_pbar: whether to show a tqdm progress bar
+            default_key_concurrency: maximal amount of running tasks per concurrency key
+                for keys which were not configured with set_key_limits(). None for unlimited
+            log_tasks: whether to log the start and end of every task at INFO level
+            metrics_callback: called with a metrics() snapshot every metrics_interval seconds
+                while the pool runs and once more when it joined
+            metrics_interval: seconds between calls of metrics_callback
+            autoscale: adds workers while tasks wait for a busy pool and retires idle workers,
+                num_workers is the initial amount of workers, clamped to the policy's bounds
+            executor: runs tasks whose func is not a coroutine function so that they do not block the event loop.
+                Defaults to the event loop's default executor
+            cpu_executor: runs tasks submitted with cpu_bound=True. Defaults to a ProcessPoolExecutor
+                created on first use and shut down by join()
+        """
+        if metrics_interval <= 0:
+            raise ValueError("metrics_interval must be positive")
         self.log(logging.INFO, "Initializing AsyncWorkerPool '%s' with %d workers, show_pbar=%s", pool_name, num_workers, show_pbar)
+        if autoscale is not None:
+            num_workers = autoscale.clamp(num_workers)
         self._num_workers: int = num_workers
         self._pool_name: str = pool_name
         self._show_pbar: bool = show_pbar
         self._pbar: Optional[tqdm] = None
-        self._queue: asyncio.Queue[
-            Optional[Tuple[Callable, Iterable[Any], Mapping[Any, Any], Optional[str]]]] = asyncio.Queue()
+        self._scheduler = _PriorityScheduler(default_key_concurrency)
         self._workers: List = []
+        self._log_tasks = log_tasks
+        self._metrics_callback = metrics_callback
+        self._metrics_interval = metrics_interval
+        self._reporter: Optional[asyncio.Task] = None
+        self._submitted = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._started_at: Optional[float] = None
+        self._stopped_at: Optional[float] = None
+        self._busy_time = 0.0
+        self._running: Dict[int, float] = {}
+        self._wait_time = LatencyHistogram()
+        self._execution_time = LatencyHistogram()
+        self._execution_time_by_name: Dict[Optional[str], LatencyHistogram] = {}
+        self._autoscale = autoscale
+        self._autoscaler = Autoscaler(autoscale) if autoscale is not None else None
+        self._scaler: Optional[asyncio.Task] = None
+        self._idle_workers = 0
+        self._next_worker_id = 1
+        self._capacity_time = 0.0  # worker-seconds up to _capacity_since
+        self._capacity_since = 0.0
+        self._executor = executor
+        self._cpu_executor = cpu_executor
+        self._owns_cpu_executor = False
         self.log(logging.DEBUG, "AsyncWorkerPool '%s' initialized successfully", pool_name)
 
     async def worker(self, worker_id) -> None:
@@ -51,26 +307,48 @@ class AsyncWorkerPool:
         self.log(logging.DEBUG, "Worker %d starting", worker_id)
         task_index = 0
         tasks = defaultdict(list)
+        idle_timeout = self._autoscale.idle_timeout if self._autoscale is not None else None
         while True:
-            task = await self._queue.get()
-            if task is None:  # Sentinel value to shut down the worker
+            self._idle_workers += 1
+            try:
+                task = await self._scheduler.get(idle_timeout)
+            except asyncio.TimeoutError:
+                if self._autoscaler.may_retire(time.monotonic(), self._num_workers):  # type:ignore
+                    self._resize(-1)
+                    self.log(logging.INFO, "Worker %d retired after idling, %d workers left", worker_id,
+                             self._num_workers)
+                    break
+                continue
+            finally:
+                self._idle_workers -= 1
+            if task is None:  # the pool is joining and no task is left
                 self.log(logging.DEBUG, "Worker %d received shutdown signal", worker_id)
                 break
-            func, args, kwargs, name = task
+            func, args, kwargs, name, _, submitted_at, cpu_bound = task
             task_index += 1
-            self.log(logging.INFO, "Task %d '%s' started on worker %d", task_index, name, worker_id)
+            started_at = time.monotonic()
+            self._wait_time.observe(started_at - submitted_at)
+            self._running[worker_id] = started_at
+            if self._log_tasks:
+                self.log(logging.INFO, "Task %d '%s' started on worker %d", task_index, name, worker_id)
             try:
-                await func(*args, **kwargs)
-                tasks["success"].append(name)
-                self.log(logging.INFO, "Task %d '%s' finished on worker %d", task_index, name, worker_id)
+                await self._call(func, args, kwargs, cpu_bound)
+                self._succeeded += 1
+                if self._log_tasks:
+                    tasks["success"].append(name)
+                    self.log(logging.INFO, "Task %d '%s' finished on worker %d", task_index, name, worker_id)
             except Exception as e:
                 self.log(logging.ERROR, "Task %d '%s' failed on worker %d: %s: %s", task_index, name, worker_id, type(e).__name__, e)
+                self._failed += 1
                 tasks["failure"].append(name)
+            finally:
+                del self._running[worker_id]
+                self._record_execution(name, time.monotonic() - started_at)
 
             if self._pbar:
                 self._pbar.update(1)
-            self._queue.task_done()
-        self.log(logging.INFO, "Worker %d completed %d tasks (success: %d, failure: %d)", worker_id, task_index, len(tasks['success']), len(tasks['failure']))
+            await self._scheduler.done(task)
+        self.log(logging.INFO, "Worker %d completed %d tasks (success: %d, failure: %d)", worker_id, task_index, task_index - len(tasks['failure']), len(tasks['failure']))
         if tasks['success']:
             self.log(logging.INFO, "Worker %d successful tasks: [%s]", worker_id, ', '.join(map(str, tasks['success'])))
         if tasks['failure']:
@@ -80,30 +358,175 @@ class AsyncWorkerPool:
         """Starts the worker pool."""
         self.log(logging.INFO, "Starting worker pool '%s' with %d workers", self._pool_name, self._num_workers)
         if self._show_pbar:
-            self._pbar = tqdm(total=self._queue.qsize(), desc="#Tasks")
-        self._workers = [asyncio.create_task(self.worker(i + 1)) for i in range(self._num_workers)]
+            self._pbar = tqdm(total=self._scheduler.qsize(), desc="#Tasks")
+        self._started_at = self._capacity_since = time.monotonic()
+        self._stopped_at = None
+        self._capacity_time = 0.0
+        num_workers, self._num_workers = self._num_workers, 0
+        for _ in range(num_workers):
+            self._spawn()
+        if self._autoscale is not None:
+            self._scaler = asyncio.create_task(self._scale())
+        if self._metrics_callback is not None:
+            self._reporter = asyncio.create_task(self._report_metrics())
         self.log(logging.INFO, "Worker pool '%s' started successfully", self._pool_name)
 
     async def submit(
             self,
-            func: Callable[..., Coroutine[None, None, None]],
+            func: Union[Callable[..., Coroutine[None, None, None]], Callable[..., Any]],
             args: Optional[Iterable[Any]] = None,
             kwargs: Optional[Mapping[Any, Any]] = None,
-            name: Optional[str] = None
+            name: Optional[str] = None,
+            *,
+            priority: int = 0,
+            key: Optional[Hashable] = None,
+            cpu_bound: bool = False
     ) -> None:
-        """Submit a new task to the queue."""
-        self.log(logging.DEBUG, "Adding new job '%s' to queue", name)
-        await self._queue.put((func, args or (), kwargs or {}, name))
+        """Submit a new task to the queue.
+
+        Coroutine functions run on the event loop, other callables run on the pool's executor.
+
+        Args:
+            func: the coroutine function or synchronous callable to run
+            args: positional arguments for func
+            kwargs: keyword arguments for func
+            name: name of the task used in logs
+            priority: tasks with a higher priority run first, equal priorities run in submission order
+            key: concurrency key (tenant, host, ...) whose limits set by set_key_limits() apply to the task
+            cpu_bound: run the synchronous func on the pool's cpu executor (a process pool by default),
+                func and its arguments must be picklable then
+        """
+        if cpu_bound and inspect.iscoroutinefunction(func):
+            raise ValueError("cpu_bound tasks must be synchronous callables")
+        self.log(logging.DEBUG, "Adding new job '%s' to queue with priority=%d, key=%s", name, priority, key)
+        self._submitted += 1
+        await self._scheduler.put((func, args or (), kwargs or {}, name, key, time.monotonic(), cpu_bound), priority)
+
+    async def _call(self, func: Callable, args: Iterable[Any], kwargs: Mapping[Any, Any], cpu_bound: bool) -> Any:
+        if inspect.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        if cpu_bound:
+            if self._cpu_executor is None:
+                self._cpu_executor = ProcessPoolExecutor()
+                self._owns_cpu_executor = True
+            executor: Optional[Executor] = self._cpu_executor
+        else:
+            executor = self._executor
+        result = await asyncio.get_running_loop().run_in_executor(executor, functools.partial(func, *args, **kwargs))
+        if inspect.isawaitable(result):  # e.g. an object whose __call__ is async
+            result = await result
+        return result
+
+    def set_key_limits(self, key: Hashable, max_concurrency: Optional[int] = None, rate: Optional[float] = None,
+                       burst: Optional[float] = None) -> None:
+        """Limit the tasks submitted with the given concurrency key.
+
+        Tasks of a saturated key wait while tasks of other keys keep running.
+
+        Args:
+            key: the concurrency key
+            max_concurrency: maximal amount of running tasks of this key, None for unlimited
+            rate: maximal amount of tasks of this key started per second, None for unlimited
+            burst: amount of tasks which may start at once after an idle period. Defaults to 1
+        """
+        if key is None:
+            raise ValueError("tasks without a key can not be limited")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        bucket = _TokenBucket(rate, burst if burst is not None else 1) if rate is not None else None
+        self.log(logging.DEBUG, "Setting limits of key %s: max_concurrency=%s, rate=%s, burst=%s", key,
+                 max_concurrency, rate, burst)
+        self._scheduler.configure(key, max_concurrency, bucket)
 
     async def join(self) -> None:
         """Stops the worker pool by waiting for all tasks to complete and shutting down workers."""
         self.log(logging.INFO, "Starting join process for worker pool '%s'", self._pool_name)
-        await self._queue.join()  # Wait until all tasks are processed
-        for _ in range(self._num_workers):
-            await self._queue.put(None)  # Send sentinel values to stop workers
+        await self._scheduler.idle.wait()  # Wait until all tasks are processed
+        if self._scaler is not None:
+            self._scaler.cancel()
+            await asyncio.gather(self._scaler, return_exceptions=True)
+            self._scaler = None
+        await self._scheduler.close()  # Stop the workers
         await asyncio.gather(*self._workers)  # Wait for workers to finish
+        if self._owns_cpu_executor:
+            executor, self._cpu_executor, self._owns_cpu_executor = self._cpu_executor, None, False
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)  # type:ignore
+        self._stopped_at = time.monotonic()
+        if self._reporter is not None:
+            self._reporter.cancel()
+            await asyncio.gather(self._reporter, return_exceptions=True)
+            self._reporter = None
+            self._emit_metrics()
         self.log(logging.INFO, "Join process completed for worker pool '%s'", self._pool_name)
 
+    def _resize(self, delta: int) -> None:
+        now = time.monotonic()
+        self._capacity_time += (now - self._capacity_since) * self._num_workers
+        self._capacity_since = now
+        self._num_workers += delta
+
+    def _spawn(self) -> None:
+        self._resize(1)
+        self._workers = [w for w in self._workers if not w.done()]
+        self._workers.append(asyncio.create_task(self.worker(self._next_worker_id)))
+        self._next_worker_id += 1
+
+    async def _scale(self) -> None:
+        policy: AutoscalePolicy = self._autoscale  # type:ignore
+        while True:
+            await asyncio.sleep(policy.check_interval)
+            amount = self._autoscaler.workers_to_add(  # type:ignore
+                time.monotonic(), self._num_workers, self._idle_workers, self._scheduler.qsize())
+            for _ in range(amount):
+                self._spawn()
+
+    def _record_execution(self, name: Optional[str], duration: float) -> None:
+        self._busy_time += duration
+        self._execution_time.observe(duration)
+        histogram = self._execution_time_by_name.get(name)
+        if histogram is None:
+            if len(self._execution_time_by_name) >= _MAX_TRACKED_NAMES:
+                return
+            histogram = self._execution_time_by_name[name] = LatencyHistogram()
+        histogram.observe(duration)
+
+    def metrics(self) -> WorkerPoolMetrics:
+        """A snapshot of the pool's runtime metrics, cheap enough to call frequently.
+
+        Execution times are also kept per task name, for up to 256 distinct names.
+        """
+        now = time.monotonic() if self._stopped_at is None else self._stopped_at
+        uptime = now - self._started_at if self._started_at is not None else 0.0
+        busy = self._busy_time + sum(now - started_at for started_at in self._running.values())
+        capacity = self._capacity_time + (now - self._capacity_since) * self._num_workers \
+            if self._started_at is not None else 0.0
+        return WorkerPoolMetrics(
+            pool_name=self._pool_name,
+            num_workers=self._num_workers,
+            queue_depth=self._scheduler.qsize(),
+            running=len(self._running),
+            submitted=self._submitted,
+            succeeded=self._succeeded,
+            failed=self._failed,
+            uptime=uptime,
+            utilization=min(1.0, busy / capacity) if capacity > 0 else 0.0,
+            wait_time=self._wait_time.snapshot(),
+            execution_time=self._execution_time.snapshot(),
+            execution_time_by_name={name: h.snapshot() for name, h in self._execution_time_by_name.items()},
+        )
+
+    def _emit_metrics(self) -> None:
+        try:
+            self._metrics_callback(self.metrics())  # type:ignore
+        except Exception as e:
+            self.log(logging.WARNING, "Metrics callback of worker pool '%s' failed: %s: %s", self._pool_name,
+                     type(e).__name__, e)
+
+    async def _report_metrics(self) -> None:
+        while True:
+            await asyncio.sleep(self._metrics_interval)
+            self._emit_metrics()
+
 
 __all__ = [
     "AsyncWorkerPool",
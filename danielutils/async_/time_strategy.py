@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 import logging
+import random
 from ..logging_.utils import get_logger
 logger = get_logger(__name__)
 
@@ -65,9 +66,53 @@ class MultiplicativeTimeStrategy(TimeStrategy):
         self.current_timeout = self.base_timeout
 
 
+class FullJitterTimeStrategy(TimeStrategy):
+    """returns a uniformly random time between 0 and the time of the wrapped strategy
+    """
+
+    def __init__(self, strategy: TimeStrategy):
+        logger.debug("Initializing FullJitterTimeStrategy over %s", type(strategy).__name__)
+        self.strategy = strategy
+
+    def next(self) -> float:
+        timeout = random.uniform(0, self.strategy.next())
+        logger.debug("FullJitterTimeStrategy returning timeout=%s", timeout)
+        return timeout
+
+    def reset(self) -> None:
+        self.strategy.reset()
+
+
+class DecorrelatedJitterTimeStrategy(TimeStrategy):
+    """returns a random time between base_timeout and factor times the previous one, capped at max_timeout
+    """
+
+    def __init__(self, base_timeout: float, max_timeout: float, factor: float = 3.0):
+        logger.debug("Initializing DecorrelatedJitterTimeStrategy with base_timeout=%s, max_timeout=%s, factor=%s",
+                     base_timeout, max_timeout, factor)
+        if not 0 < base_timeout <= max_timeout:
+            raise ValueError("base_timeout must be positive and at most max_timeout")
+        self.base_timeout = base_timeout
+        self.max_timeout = max_timeout
+        self.factor = factor
+        self.current_timeout = base_timeout
+
+    def next(self) -> float:
+        self.current_timeout = min(self.max_timeout,
+                                   random.uniform(self.base_timeout, self.current_timeout * self.factor))
+        logger.debug("DecorrelatedJitterTimeStrategy returning timeout=%s", self.current_timeout)
+        return self.current_timeout
+
+    def reset(self) -> None:
+        logger.debug("DecorrelatedJitterTimeStrategy resetting to base_timeout=%s", self.base_timeout)
+        self.current_timeout = self.base_timeout
+
+
 __all__ = [
     "TimeStrategy",
     "ConstantTimeStrategy",
     "LinearTimeStrategy",
-    "MultiplicativeTimeStrategy"
+    "MultiplicativeTimeStrategy",
+    "FullJitterTimeStrategy",
+    "DecorrelatedJitterTimeStrategy",
 ]
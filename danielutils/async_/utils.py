@@ -1,14 +1,21 @@
 import asyncio
 import logging
+import threading
+import time
 from asyncio import Task
-from typing import List, Coroutine, Any, Tuple, Optional, Set, AsyncIterator, Iterator, TypeVar
+from collections import deque
+from typing import List, Coroutine, Any, Tuple, Optional, Set, AsyncIterator, Iterator, TypeVar, Dict, Deque, \
+    Callable, Awaitable, Union, Iterable, AsyncIterable
 from ..logging_.utils import get_logger
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 async def return_first(coros: List[Coroutine], timeout: Optional[int] = None) -> List[Tuple[int, Any]]:
     logger.debug("return_first called with %d coroutines, timeout=%s", len(coros), timeout)
-    tasks: List[Task] = [asyncio.create_task(coro) for coro in coros]
+    tasks: Dict[Task, int] = {asyncio.create_task(coro): i for i, coro in enumerate(coros)}
     result: Tuple[Set[Task], Set[Task]] = await asyncio.wait(tasks, timeout=timeout,
                                                              return_when=asyncio.FIRST_COMPLETED)
     done: Set[Task] = result[0]
@@ -16,7 +23,7 @@ async def return_first(coros: List[Coroutine], timeout: Optional[int] = None) ->
 
     res = []
     for task in done:
-        res.append((tasks.index(task), task.result()))
+        res.append((tasks[task], task.result()))
 
     logger.debug("return_first completed with %d results", len(res))
     return res
@@ -34,13 +41,217 @@ async def return_all(coros: List[Coroutine], timeout: Optional[int] = None) -> L
     return res
 
 
-async def cast_aiter(itr: Iterator) -> AsyncIterator:
-    logger.debug("cast_aiter called")
-    for x in itr:
-        yield x
+async def cast_aiter(itr: Iterable[T], *, offload: bool = False, buffer_size: int = 64) -> AsyncIterator[T]:
+    """convert a sync iterable to an async iterator
 
+    Args:
+        itr (Iterable[T]): the iterable
+        offload (bool, optional): whether to iterate in a separate thread, so that blocking iterators
+            (files, sockets, database cursors) do not block the event loop. Defaults to False.
+        buffer_size (int, optional): when offloading, the maximal amount of items read ahead
+            before the thread waits for the consumer. Defaults to 64.
+    """
+    logger.debug("cast_aiter called with offload=%s", offload)
+    if not offload:
+        for x in itr:
+            yield x
+        return
+    if buffer_size <= 0:
+        raise ValueError("buffer_size must be positive")
 
-T = TypeVar("T")
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Tuple[bool, Any]]" = asyncio.Queue()
+    slots = threading.Semaphore(buffer_size)
+    stop = threading.Event()
+
+    def post(entry: Tuple[bool, Any]) -> bool:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, entry)
+            return True
+        except RuntimeError:
+            # the event loop was closed while the consumer was gone
+            return False
+
+    def produce() -> None:
+        try:
+            iterator = iter(itr)
+            while True:
+                # a slot is taken before pulling, so at most buffer_size items are read ahead
+                slots.acquire()
+                if stop.is_set():
+                    return
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    post((False, None))
+                    return
+                if not post((True, item)):
+                    return
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            post((False, e))
+
+    threading.Thread(target=produce, name="danielutils-cast_aiter", daemon=True).start()
+    try:
+        while True:
+            ok, value = await queue.get()
+            if not ok:
+                if value is not None:
+                    raise value
+                return
+            slots.release()
+            yield value
+    finally:
+        stop.set()
+        slots.release()
+
+
+def _to_aiter(iterable: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    if hasattr(iterable, "__aiter__"):
+        return iterable.__aiter__()  # type:ignore
+    return cast_aiter(iterable)  # type:ignore
+
+
+async def _aclose(iterator: AsyncIterator) -> None:
+    aclose = getattr(iterator, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+async def _cancel_all(tasks: Iterable[asyncio.Future]) -> None:
+    """cancel the tasks and wait for them. the exceptions of finished tasks are retrieved as well,
+    so that none of them is reported as never retrieved
+    """
+    tasks = list(tasks)
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def amap(func: Callable[[T], Awaitable[R]], iterable: Union[Iterable[T], AsyncIterable[T]], *,
+               concurrency: int = 8, ordered: bool = True) -> AsyncIterator[R]:
+    """apply an async function to every item with at most 'concurrency' calls running at once
+
+    items are pulled from the source only when a slot is free, so a large or endless source is never buffered.
+    if a call raises, the exception is propagated and the other running calls are cancelled.
+    a sync source is iterated on the event loop, wrap a blocking one in cast_aiter(..., offload=True).
+
+    Args:
+        func (Callable[[T], Awaitable[R]]): the async function
+        iterable (Union[Iterable[T], AsyncIterable[T]]): the source items
+        concurrency (int, optional): maximal amount of concurrent calls. Defaults to 8.
+        ordered (bool, optional): whether to yield results in the order of the source,
+            otherwise in completion order. Defaults to True.
+    """
+    if concurrency <= 0:
+        raise ValueError("concurrency must be positive")
+    logger.debug("amap called with concurrency=%d, ordered=%s", concurrency, ordered)
+    source = _to_aiter(iterable)
+    in_flight: Deque[asyncio.Future] = deque()
+    # finished calls of the unordered mode which were not yielded yet
+    ready: Deque[asyncio.Future] = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(in_flight) < concurrency:
+                try:
+                    item = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                in_flight.append(asyncio.ensure_future(func(item)))
+            if not in_flight:
+                return
+            if ordered:
+                yield await in_flight[0]
+                in_flight.popleft()
+            else:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    in_flight.remove(task)
+                ready.extend(done)
+                while ready:
+                    yield ready.popleft().result()
+    finally:
+        await _cancel_all([*in_flight, *ready])
+        await _aclose(source)
+
+
+async def abatch(iterable: Union[Iterable[T], AsyncIterable[T]], size: int,
+                 timeout: Optional[float] = None) -> AsyncIterator[List[T]]:
+    """group items into lists of up to 'size' items.
+    a sync source is iterated on the event loop, wrap a blocking one in cast_aiter(..., offload=True)
+
+    Args:
+        iterable (Union[Iterable[T], AsyncIterable[T]]): the source items
+        size (int): maximal amount of items in a batch
+        timeout (Optional[float], optional): seconds after the first item of a batch arrived
+            after which the batch is yielded even if it is not full. Defaults to None.
+    """
+    if size <= 0:
+        raise ValueError("size must be positive")
+    logger.debug("abatch called with size=%d, timeout=%s", size, timeout)
+    source = _to_aiter(iterable)
+    batch: List[T] = []
+    next_item: Optional[asyncio.Future] = None
+    deadline = 0.0
+    try:
+        while True:
+            if next_item is None:
+                next_item = asyncio.ensure_future(source.__anext__())
+            if batch and timeout is not None:
+                done, _ = await asyncio.wait({next_item}, timeout=max(0.0, deadline - time.monotonic()))
+                if not done:
+                    yield batch
+                    batch = []
+                    continue
+            try:
+                item = await next_item
+            except StopAsyncIteration:
+                next_item = None
+                if batch:
+                    yield batch
+                return
+            next_item = None
+            if not batch:
+                deadline = time.monotonic() + (timeout or 0.0)
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    finally:
+        if next_item is not None:
+            await _cancel_all([next_item])
+        await _aclose(source)
+
+
+async def amerge(*iterables: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    """yield items from several async iterators as soon as any of them produces one.
+    sync sources are iterated on the event loop, wrap blocking ones in cast_aiter(..., offload=True)
+
+    Args:
+        *iterables (Union[Iterable[T], AsyncIterable[T]]): the sources
+    """
+    logger.debug("amerge called with %d sources", len(iterables))
+    sources = [_to_aiter(iterable) for iterable in iterables]
+    pending: Dict[asyncio.Future, AsyncIterator[T]] = {
+        asyncio.ensure_future(source.__anext__()): source for source in sources
+    }
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                source = pending.pop(task)
+                try:
+                    item = task.result()
+                except StopAsyncIteration:
+                    continue
+                pending[asyncio.ensure_future(source.__anext__())] = source
+                yield item
+    finally:
+        await _cancel_all(pending)
+        for source in sources:
+            await _aclose(source)
 
 
 async def async_enumerate(iterable: AsyncIterator[T], start: int = 0) -> AsyncIterator[Tuple[int, T]]:
@@ -53,5 +264,9 @@ async def async_enumerate(iterable: AsyncIterator[T], start: int = 0) -> AsyncIt
 __all__ = [
     "return_first",
     "return_all",
-    'cast_aiter'
+    'cast_aiter',
+    "async_enumerate",
+    "amap",
+    "abatch",
+    "amerge",
 ]
@@ -0,0 +1,100 @@
+import bisect
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# upper bounds in seconds, 1-2.5-5 per decade from 1ms to 5min
+_DEFAULT_BOUNDS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 300.0
+)
+
+
+@dataclass
+class HistogramSnapshot:
+    """A point in time copy of a LatencyHistogram.
+
+    counts[i] is the amount of observations <= bounds[i] (and > bounds[i - 1]),
+    the last count holds the observations above the largest bound.
+    """
+    bounds: Tuple[float, ...]
+    counts: List[int]
+    count: int
+    total: float
+    max: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Args:
+            q (float): percentile between 0 and 100
+
+        Returns:
+            float: the upper bound of the bucket holding the q-th percentile, the maximal
+                observation if it falls in the overflow bucket, 0 without observations
+        """
+        if not 0 <= q <= 100:
+            raise ValueError("q must be between 0 and 100")
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class LatencyHistogram:
+    """Fixed bucket histogram of durations in seconds, O(log buckets) per observation.
+    """
+
+    def __init__(self, bounds: Tuple[float, ...] = _DEFAULT_BOUNDS) -> None:
+        if list(bounds) != sorted(set(bounds)):
+            raise ValueError("bounds must be strictly increasing")
+        self._bounds = tuple(bounds)
+        self._counts = [0] * (len(bounds) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self._count += 1
+        self._total += value
+        if value > self._max:
+            self._max = value
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(self._bounds, list(self._counts), self._count, self._total, self._max)
+
+
+@dataclass
+class WorkerPoolMetrics:
+    """A snapshot of the runtime metrics of an AsyncWorkerPool."""
+    pool_name: str
+    num_workers: int
+    queue_depth: int
+    running: int
+    submitted: int
+    succeeded: int
+    failed: int
+    uptime: float
+    utilization: float  # fraction of worker time spent running tasks since start()
+    wait_time: HistogramSnapshot  # time from submit() until a worker started the task
+    execution_time: HistogramSnapshot
+    execution_time_by_name: Dict[Optional[str], HistogramSnapshot] = field(default_factory=dict)
+
+    @property
+    def completed(self) -> int:
+        return self.succeeded + self.failed
+
+
+__all__ = [
+    "HistogramSnapshot",
+    "LatencyHistogram",
+    "WorkerPoolMetrics",
+]
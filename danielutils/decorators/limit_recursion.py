@@ -1,9 +1,7 @@
+import contextvars
 import functools
-import re
-import traceback
-import logging
-from typing import Any, Callable, TypeVar
-from .validate import validate
+import inspect
+from typing import Any, Callable, Generator, TypeVar
 from ..colors import warning
 from ..versioned_imports import ParamSpec
 from ..logging_.utils import get_logger
@@ -15,10 +13,36 @@ P = ParamSpec("P")
 FuncT = Callable[P, T]  # type:ignore
 
 
-@validate  # type:ignore
+def _drive_generator(gen: Generator, depth: contextvars.ContextVar, current: int) -> Generator:
+    """delegate to gen while holding the recursion depth of the call that created it
+    on every resumption, so nested calls made from inside the generator body are counted
+    """
+    method, arg = gen.send, None
+    while True:
+        token = depth.set(current)
+        try:
+            value = method(arg)
+        except StopIteration as e:
+            return e.value
+        finally:
+            depth.reset(token)
+        try:
+            arg = yield value
+            method = gen.send
+        except GeneratorExit:
+            gen.close()
+            raise
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            method, arg = gen.throw, e
+
+
 def limit_recursion(max_depth: int, return_value: Any = None, quiet: bool = True) -> Callable[[FuncT], FuncT]:
     """decorator to limit recursion of functions
 
+    The depth is tracked with a context variable which is incremented around each call,
+    so it is per thread and per asyncio task and costs O(1) per call.
+    Generator functions are counted while their body runs and coroutine functions while they are awaited.
+
     Args:
         max_depth (int): max recursion depth which is allowed for this function
         return_value (Any, optional): The value to return when the limit is reached. Defaults to None.
@@ -26,34 +50,61 @@ def limit_recursion(max_depth: int, return_value: Any = None, quiet: bool = True
         quiet (bool, optional): whether to print a warning message. Defaults to True.
     """
     logger.debug("Creating limit_recursion decorator with max_depth=%s, quiet=%s", max_depth, quiet)
+    if not isinstance(max_depth, int) or isinstance(max_depth, bool):
+        raise TypeError(f"limit_recursion's max_depth must be an int, got '{max_depth}'")
 
     def deco(func: FuncT) -> FuncT:
         logger.debug("Applying limit_recursion decorator to function %s", func.__name__)
+        depth: contextvars.ContextVar[int] = contextvars.ContextVar(
+            f"limit_recursion_{func.__module__}.{func.__qualname__}", default=0)
+
+        def on_limit(current: int, args: tuple, kwargs: dict) -> Any:
+            logger.warning("Recursion limit reached for %s at depth %s", func.__name__, current)
+            if not quiet:
+                warning(
+                    "limit_recursion has limited the number of calls for "
+                    f"{func.__module__}.{func.__qualname__} to {max_depth}")
+            if return_value:
+                return return_value
+            return args, kwargs
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                current = depth.get() + 1
+                if current >= max_depth:
+                    return on_limit(current, args, kwargs)
+                token = depth.set(current)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    depth.reset(token)
+
+            return async_wrapper  # type:ignore
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                current = depth.get() + 1
+                if current >= max_depth:
+                    return on_limit(current, args, kwargs)
+                return _drive_generator(func(*args, **kwargs), depth, current)
+
+            return generator_wrapper  # type:ignore
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            depth = functools.reduce(
-                lambda count, line:
-                count + 1 if re.search(rf"{func.__name__}\(.*\)$", line)
-                else count,
-                traceback.format_stack(), 0
-            )
-            logger.debug("Function %s called at recursion depth %s/%s", func.__name__, depth, max_depth)
-            if depth >= max_depth:
-                logger.warning("Recursion limit reached for %s at depth %s", func.__name__, depth)
-                if not quiet:
-                    warning(
-                        "limit_recursion has limited the number of calls for "
-                        f"{func.__module__}.{func.__qualname__} to {max_depth}")
-                if return_value:
-                    logger.debug("Returning specified return_value: %s", return_value)
-                    return return_value
-                logger.debug("Returning args and kwargs: %s, %s", args, kwargs)
-                return args, kwargs
-            logger.debug("Recursion depth %s is within limit, calling function", depth)
-            return func(*args, **kwargs)
+            current = depth.get() + 1
+            if current >= max_depth:
+                return on_limit(current, args, kwargs)
+            token = depth.set(current)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                depth.reset(token)
 
         logger.debug("Limit_recursion decorator applied to %s", func.__name__)
-        return wrapper
+        return wrapper  # type:ignore
 
     return deco
 
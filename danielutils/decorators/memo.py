@@ -1,8 +1,13 @@
+import asyncio
 import functools
+import inspect
 import logging
-from typing import Callable, Any, TypeVar, Dict, Generator, List, Set, Optional
+import time
+from collections import OrderedDict
+from typing import Callable, Any, TypeVar, Dict, Generator, List, Set, Optional, Tuple, Coroutine
 from copy import deepcopy
 from .validate import validate
+from .normalize_decorator import normalize_decorator
 from ..versioned_imports import ParamSpec
 from ..logging_.utils import get_logger
 
@@ -17,10 +22,14 @@ FuncT = Callable[P, T]  # type:ignore
 def memo(func: FuncT) -> FuncT:
     """decorator to memorize function calls in order to improve performance by using more memory
 
+    coroutine functions are memorized with an unbounded async_memo, as their coroutine objects can only be awaited once
+
     Args:
         func (Callable): function to memorize
     """
     logger.debug("Creating memo decorator for function %s", func.__name__)
+    if inspect.iscoroutinefunction(func):
+        return async_memo(func, maxsize=None)  # type:ignore
     cache: Dict[tuple, Any] = {}
 
     @functools.wraps(func)
@@ -62,7 +71,79 @@ def memo_generator(func: Callable[P, Generator]) -> Callable[P, Generator]:
     return wrapper
 
 
+@normalize_decorator
+def async_memo(func: Callable[P, Coroutine[Any, Any, T]], maxsize: Optional[int] = 128, ttl: Optional[float] = None,
+               copy: bool = True) -> Callable[P, Coroutine[Any, Any, T]]:
+    """decorator to memorize the results of a coroutine function with LRU and TTL eviction
+
+    concurrent calls with the same arguments share a single in flight computation instead of each starting their own,
+    also when an entry has just expired. the computation runs as a task, so cancelling one awaiter
+    does not cancel it for the others. exceptions are propagated to all awaiters and are not cached.
+
+    Usage:
+        @async_memo(maxsize=256, ttl=60)
+        async def fetch_schema(name: str) -> dict:
+            ...
+
+    Args:
+        func (Callable): coroutine function to memorize
+        maxsize (Optional[int], optional): maximal amount of cached results, None for unbounded. Defaults to 128.
+        ttl (Optional[float], optional): seconds a result stays valid, None for forever. Defaults to None.
+        copy (bool, optional): whether to return a deep copy of cached results, like memo. Defaults to True.
+    """
+    logger.debug("Creating async_memo decorator for function %s with maxsize=%s, ttl=%s", func.__name__, maxsize, ttl)
+    if not inspect.iscoroutinefunction(func):
+        raise TypeError(f"async_memo can only decorate coroutine functions, got '{func.__name__}'")
+    if maxsize is not None and maxsize <= 0:
+        raise ValueError("maxsize must be positive or None")
+    if ttl is not None and ttl <= 0:
+        raise ValueError("ttl must be positive or None")
+    cache: "OrderedDict[tuple, Tuple[Optional[float], Any]]" = OrderedDict()
+    in_flight: Dict[tuple, asyncio.Future] = {}
+
+    def store(cache_key: tuple, task: asyncio.Future) -> None:
+        if in_flight.get(cache_key) is task:
+            del in_flight[cache_key]
+        if task.cancelled() or task.exception() is not None:
+            logger.debug("Computation of %s failed, not caching", func.__name__)
+            return
+        cache[cache_key] = (time.monotonic() + ttl if ttl is not None else None, task.result())
+        cache.move_to_end(cache_key)
+        if maxsize is not None and len(cache) > maxsize:
+            cache.popitem(last=False)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        cache_key = (args, *kwargs.items())
+        entry = cache.get(cache_key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at is None or time.monotonic() < expires_at:
+                logger.debug("Cache hit for %s, returning cached result", func.__name__)
+                cache.move_to_end(cache_key)
+                return deepcopy(value) if copy else value
+            del cache[cache_key]
+        task = in_flight.get(cache_key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            logger.debug("Cache miss for %s, computing result", func.__name__)
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            in_flight[cache_key] = task
+            task.add_done_callback(functools.partial(store, cache_key))
+        else:
+            logger.debug("Joining in flight computation of %s", func.__name__)
+        value = await asyncio.shield(task)
+        return deepcopy(value) if copy else value
+
+    def cache_clear() -> None:
+        cache.clear()
+
+    wrapper.cache_clear = cache_clear  # type:ignore
+    logger.debug("async_memo decorator applied to %s", func.__name__)
+    return wrapper
+
+
 __all__ = [
     "memo",
-    "memo_generator"
+    "memo_generator",
+    "async_memo",
 ]
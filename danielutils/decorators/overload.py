@@ -1,5 +1,6 @@
 import logging
-from typing import Callable, cast, Any, TypeVar, Dict, List
+from abc import ABCMeta
+from typing import Callable, cast, Any, TypeVar, Dict, List, Tuple, Union, get_args, get_origin
 import inspect
 import functools
 from ..reflection import is_function_annotated_properly
@@ -19,6 +20,27 @@ P2 = ParamSpec("P2")
 FuncT2 = Callable[P2, T2]  # type:ignore
 
 __overload_dict: Dict[str, Dict[tuple, Callable]] = {}
+__overload_cache: Dict[str, Dict[Tuple[type, ...], Callable]] = {}
+__overload_cacheable: Dict[str, bool] = {}
+
+_TYPE_ONLY_INSTANCECHECKS = (type.__instancecheck__, ABCMeta.__instancecheck__)
+
+
+def _is_type_only(annotation: Any) -> bool:
+    """whether checking a value against annotation depends only on the value's type,
+    which makes the result safe to cache by type. generic, container, protocol and
+    forward-reference annotations inspect the value itself so they are not
+    """
+    if annotation is Any or annotation is None:
+        return True
+    if get_origin(annotation) is Union:
+        return all(_is_type_only(arg) for arg in get_args(annotation))
+    if isinstance(annotation, (list, tuple)):
+        return all(_is_type_only(arg) for arg in annotation)
+    return isinstance(annotation, type) \
+        and get_origin(annotation) is None \
+        and type(annotation).__instancecheck__ in _TYPE_ONLY_INSTANCECHECKS \
+        and not getattr(annotation, "_is_protocol", False)
 
 
 @deprecate("'explicit_global_overload' is a legacy decorator please use 'overload' instead")
@@ -77,12 +99,25 @@ def explicit_global_overload(*types) -> Callable:
                 f"{name} has duplicate overloading for type(s): {types}")
 
         __overload_dict[name][types] = func
+        __overload_cache[name] = {}
+        __overload_cacheable[name] = __overload_cacheable.get(name, True) and _is_type_only(types)
+        cache = __overload_cache
+        cacheable = __overload_cacheable
 
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
+            key = tuple(map(type, args))
+            resolved = cache[name].get(key)
+            if resolved is None:
+                resolved = resolve(args)
+                if cacheable[name] and not any(isinstance(arg, type) for arg in args):
+                    cache[name][key] = resolved
+            return resolved(*args, **kwargs)
+
+        def resolve(args: tuple) -> Callable:
             default_func = None
             # select correct overload
-            for variable_types, curr_func in __overload_dict[f"{func.__module__}.{func.__qualname__}"].items():
+            for variable_types, curr_func in __overload_dict[name].items():
                 if len(variable_types) == 0:
                     if default_func is None:
                         default_func = curr_func
@@ -102,10 +137,10 @@ def explicit_global_overload(*types) -> Callable:
                             if not isoftype(args[i], variable_type):
                                 break
                 else:
-                    return curr_func(*args, **kwargs)
+                    return curr_func
 
             if default_func is not None:
-                return default_func(*args, **kwargs)
+                return default_func
             # or raise exception if no overload exists for current arguments
             raise OverloadNotFound(
                 f"function {func.__module__}.{func.__qualname__} is not overloaded with {[type(v) for v in args]}")
@@ -127,13 +162,14 @@ class overload:
         self._qualname = func.__qualname__
         self._moudle = func.__module__
         self._functions: Dict[int, List[Callable]] = {}
-        self._functions[overload._get_key(func)] = [func]
+        # signatures are resolved once at registration, as (name, annotation) pairs per function
+        self._parameters: Dict[int, List[List[Tuple[str, Any]]]] = {}
+        # whether resolution for an amount of arguments depends only on the arguments' types
+        self._cacheable: Dict[int, bool] = {}
+        self._dispatch_cache: Dict[Tuple[type, ...], Callable] = {}
+        self._register(func)
         functools.wraps(func)(self)
 
-    @staticmethod
-    def _get_key(func: Callable):
-        return len(inspect.signature(func).parameters)
-
     @staticmethod
     def _validate(func: Callable):
         if not callable(func):
@@ -153,38 +189,54 @@ class overload:
             overload2: returns the overload object
         """
         self._validate(func)
-        k = overload._get_key(func)
+        self._register(func)
+        return self
+
+    def _register(self, func: Callable) -> None:
+        parameters = [(name, param.annotation) for name, param in inspect.signature(func).parameters.items()]
+        k = len(parameters)
         if k not in self._functions:
             self._functions[k] = []
+            self._parameters[k] = []
+            self._cacheable[k] = True
         self._functions[k].append(func)
-        return self
+        self._parameters[k].append(parameters)
+        self._cacheable[k] = self._cacheable[k] and all(
+            _is_type_only(annotation) for name, annotation in parameters if name not in overload.__SKIP_SET)
+        self._dispatch_cache.clear()
 
     def __call__(self, *args, **kwargs):
+        if not kwargs:
+            winner = self._dispatch_cache.get(tuple(map(type, args)))
+            if winner is not None:
+                return winner(*args)
+        return self._resolve(args, kwargs)(*args, **kwargs)
+
+    def _resolve(self, args: tuple, kwargs: dict) -> Callable:
         num_args = len(args) + len(kwargs.keys())
         if num_args not in self._functions:
             raise AttributeError(
                 f"No overload with {num_args} argument found for {self._moudle}.{self._qualname}")
 
         if num_args == 0:
-            return self._functions[num_args][0](*args, **kwargs)
+            return self._functions[num_args][0]
 
         max_score = 0
         winner = self._functions[num_args][0]
         EXACT_MATCH = 1 / num_args
         SUBCLASS = 1 / num_args
-        for func in self._functions[num_args]:
+        for func, parameters in zip(self._functions[num_args], self._parameters[num_args]):
             score = 0
-            signature = inspect.signature(func)
-            for i, tup in enumerate(signature.parameters.items()):
-                param_name, param_type = tup
+            for i, (param_name, annotation) in enumerate(parameters):
                 if param_name in overload.__SKIP_SET:
                     continue
+                arg = args[i] if i < len(args) else kwargs[param_name]
 
-                if type(args[i]) == param_type.annotation:  # pylint :disable=unidiomatic-typecheck
+                if type(arg) == annotation:  # pylint :disable=unidiomatic-typecheck
                     score += EXACT_MATCH  # type:ignore
 
-                elif isoftype(args[i], param_type.annotation):
-                    score += SUBCLASS # type:ignore
+                elif isoftype(arg, annotation):
+                    score += SUBCLASS  # type:ignore
                 else:
                     break
 
@@ -195,7 +247,9 @@ class overload:
                     winner = func
         # raise AttributeError("No overload found")
 
-        return winner(*args, **kwargs)
+        if not kwargs and self._cacheable[num_args] and not any(isinstance(arg, type) for arg in args):
+            self._dispatch_cache[tuple(map(type, args))] = winner
+        return winner
 
 
 __all__ = [
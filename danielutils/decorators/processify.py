@@ -1,58 +1,262 @@
-import inspect
+import atexit
 import functools
+import importlib
 import multiprocessing
-import logging
-from typing import Any, Dict
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union, overload
 
 from ..reflection import get_prev_frame
-from ..abstractions.multiprogramming import process_id
+from ..versioned_imports import ParamSpec
 from ..logging_.utils import get_logger
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+P = ParamSpec("P")
+FuncT = Callable[P, T]  # type:ignore
 
-def processify(func):
-    """Modifies the function so that when calling it, a new process
-    will start to run it with provided arguments. Note that no return
-    value will be given.
+_SHARED_MEMORY_THRESHOLD: int = 1 << 20  # 1 MiB
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_max_workers: Optional[int] = None
+_in_worker: bool = False
+
+
+def _worker_initializer() -> None:
+    global _in_worker  # pylint: disable=global-statement
+    _in_worker = True
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """lazily create the process pool shared by every processified function
+
+    Returns:
+        ProcessPoolExecutor: the shared pool
+    """
+    global _pool  # pylint: disable=global-statement
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                logger.info("Creating shared processify pool with max_workers=%s", _max_workers)
+                multiprocessing.freeze_support()
+                # workers must share our resource tracker so shared memory they attach to is not reported as leaked
+                if sys.platform != "win32":
+                    resource_tracker.ensure_running()
+                _pool = ProcessPoolExecutor(max_workers=_max_workers, initializer=_worker_initializer)
+    return _pool
+
+
+def set_processify_workers(max_workers: Optional[int]) -> None:
+    """set the amount of worker processes used by the shared processify pool.
+    if the pool is already running it will be shut down and recreated lazily on the next call
 
     Args:
-        func (Callable): the function to make a process
+        max_workers (Optional[int]): amount of worker processes, None for os.cpu_count()
+    """
+    global _max_workers  # pylint: disable=global-statement
+    _max_workers = max_workers
+    shutdown_processify_pool(wait=True)
+
+
+def shutdown_processify_pool(wait: bool = True) -> None:
+    """shut down the shared processify pool. a new pool will be created lazily
+    when a processified function is called again
+
+    Args:
+        wait (bool, optional): whether to wait for pending calls to finish. Defaults to True.
+    """
+    global _pool  # pylint: disable=global-statement
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        logger.info("Shutting down shared processify pool")
+        pool.shutdown(wait=wait)
+
+
+atexit.register(shutdown_processify_pool)
+
+
+class _FunctionReference:
+    """a picklable reference to a decorated function which is resolved
+    by import inside a child process
+    """
+
+    def __init__(self, module: str, qualname: str, attribute: str = "__processify_target__") -> None:
+        self.module = module
+        self.qualname = qualname
+        self.attribute = attribute
+
+    def resolve(self) -> Callable:
+        obj: Any = sys.modules.get(self.module)
+        if obj is None:
+            obj = importlib.import_module(self.module)
+        for part in self.qualname.split("."):
+            obj = getattr(obj, part)
+        # the module level name points at the decorator's wrapper, unwrap it to get the original function
+        return getattr(obj, self.attribute, obj)
+
+
+class _SharedArgument:
+    """a picklable descriptor of an argument which was placed in shared memory
+    """
+
+    def __init__(self, name: str, kind: str, size: int, dtype: Optional[str] = None,
+                 shape: Optional[Tuple[int, ...]] = None) -> None:
+        self.name = name
+        self.kind = kind
+        self.size = size
+        self.dtype = dtype
+        self.shape = shape
+
+    def attach(self) -> Tuple[Any, SharedMemory]:
+        shm = SharedMemory(name=self.name)
+        if self.kind == "ndarray":
+            import numpy  # pylint: disable=import-outside-toplevel
+            return numpy.ndarray(self.shape, dtype=numpy.dtype(self.dtype), buffer=shm.buf), shm  # type:ignore
+        if self.kind == "bytes":
+            return bytes(shm.buf[:self.size]), shm
+        return shm.buf[:self.size], shm
+
+
+def _share(value: Any, threshold: int, blocks: List[SharedMemory]) -> Any:
+    """place value in shared memory if it is a large enough bytes-like object or numpy array
+
+    Args:
+        value (Any): the argument
+        threshold (int): minimal size in bytes for a value to be shared
+        blocks (List[SharedMemory]): created blocks are appended here so the caller can release them
+
+    Returns:
+        Any: a _SharedArgument if the value was shared, otherwise the value itself
+    """
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        if value.nbytes < threshold or value.dtype.hasobject:
+            return value
+        shm = SharedMemory(create=True, size=max(value.nbytes, 1))
+        blocks.append(shm)
+        numpy.ndarray(value.shape, dtype=value.dtype, buffer=shm.buf)[...] = value
+        return _SharedArgument(shm.name, "ndarray", value.nbytes, value.dtype.str, value.shape)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        view = memoryview(value).cast("B")
+        if view.nbytes < threshold:
+            return value
+        shm = SharedMemory(create=True, size=max(view.nbytes, 1))
+        blocks.append(shm)
+        shm.buf[:view.nbytes] = view
+        kind = "bytes" if isinstance(value, bytes) else "buffer"
+        return _SharedArgument(shm.name, kind, view.nbytes)
+    return value
+
+
+def _release(blocks: List[SharedMemory]) -> None:
+    for shm in blocks:
+        try:
+            shm.close()
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _run_func(ref: _FunctionReference, args: tuple, kwargs: dict) -> Any:
+    logger.debug("Running function %s.%s in worker process", ref.module, ref.qualname)
+    attached: List[SharedMemory] = []
+
+    def unpack(value: Any) -> Any:
+        if isinstance(value, _SharedArgument):
+            obj, shm = value.attach()
+            attached.append(shm)
+            return obj
+        return value
+
+    try:
+        args = tuple(unpack(v) for v in args)
+        kwargs = {k: unpack(v) for k, v in kwargs.items()}
+        return ref.resolve()(*args, **kwargs)
+    finally:
+        del args, kwargs
+        for shm in attached:
+            try:
+                shm.close()
+            except BufferError:
+                # the result still references the shared buffer, it will be released with the process
+                pass
+
+
+@overload
+def processify(func: FuncT) -> Callable[P, "Future[T]"]: ...  # type:ignore
+
+
+@overload
+def processify(*, shared_memory: bool = False,
+               shared_memory_threshold: int = _SHARED_MEMORY_THRESHOLD) -> Callable[[FuncT], Callable[P, "Future[T]"]]: ...  # type:ignore
+
+
+def processify(func: Optional[FuncT] = None, *, shared_memory: bool = False,  # type:ignore
+               shared_memory_threshold: int = _SHARED_MEMORY_THRESHOLD) -> Union[Callable, Callable[[FuncT], Callable]]:
+    """Modifies the function so that when calling it, it will be submitted
+    to a shared, lazily created, pool of worker processes.
+    The call returns a Future that holds the return value or the raised exception.
+    The decorated function must be importable by its module and qualified name.
+
+    Args:
+        func (Callable): the function to run in a worker process
+        shared_memory (bool, optional): keyword only argument whether to pass large
+            numpy arrays and bytes-like arguments through multiprocessing.shared_memory
+            instead of pickling them. Defaults to False.
+        shared_memory_threshold (int, optional): keyword only argument, minimal size in bytes
+            of an argument to be passed through shared memory. Defaults to 1 MiB.
 
     Returns:
         Callable: the modified function
     """
-    logger.debug("Creating processify decorator for function %s", func.__name__)
-    multiprocessing.freeze_support()
-
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        main_pid = kwargs.get("__main_pid", process_id())
-        current_pid = process_id()
-        logger.debug("Processify wrapper called for %s, main_pid=%s, current_pid=%s", func.__name__, main_pid, current_pid)
-        
-        if current_pid == main_pid:
-            logger.info("Starting new process for function %s", func.__name__)
-            frame = get_prev_frame(2)  # type:ignore
-            dct = {k: v for k, v in frame.f_globals.items() if type(v) != type(inspect)}   # type:ignore
-            logger.debug("Process context prepared with %s global variables", len(dct))
-            p = multiprocessing.Process(target=_run_func, args=(main_pid, dct, func.__name__, args, kwargs))
-            p.start()
-            logger.debug("Process started for %s, PID: %s", func.__name__, p.pid)
-            p.join()  # Optionally wait for the process to finish
-            logger.info("Process completed for %s", func.__name__)
-        else:
-            logger.debug("Executing %s in child process", func.__name__)
-            del kwargs["__main_pid"]
-            return func(*args, **kwargs)
-
-    logger.debug("Processify decorator applied to %s", func.__name__)
-    return wrapper
-
-
-def _run_func(main_pid: int, dct: dict, func_name: str, args, kwargs) -> None:
-    logger.debug("Running function %s in child process", func_name)
-    return dct[func_name](*args, __main_pid=main_pid, **kwargs)
+
+    def deco(f: FuncT) -> Callable[P, "Future[T]"]:  # type:ignore
+        logger.debug("Creating processify decorator for function %s", f.__name__)
+        if "<locals>" in f.__qualname__:
+            raise ValueError("processify can only decorate functions which are importable by their qualified name")
+        ref = _FunctionReference(f.__module__, f.__qualname__)
+
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if _in_worker:
+                # nested call from inside a worker process, run in place instead of nesting pools
+                fut: Future = Future()
+                try:
+                    fut.set_result(f(*args, **kwargs))
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    fut.set_exception(e)
+                return fut
+            blocks: List[SharedMemory] = []  # type:ignore
+            if shared_memory:
+                try:
+                    args = tuple(_share(v, shared_memory_threshold, blocks) for v in args)
+                    kwargs = {k: _share(v, shared_memory_threshold, blocks) for k, v in kwargs.items()}
+                except BaseException:
+                    _release(blocks)
+                    raise
+                logger.debug("Passing %s arguments of %s through shared memory", len(blocks), f.__name__)
+            try:
+                fut = _get_pool().submit(_run_func, ref, args, kwargs)
+            except BaseException:
+                _release(blocks)
+                raise
+            if blocks:
+                fut.add_done_callback(lambda _: _release(blocks))
+            return fut
+
+        wrapper.__processify_target__ = f  # type:ignore
+        logger.debug("Processify decorator applied to %s", f.__name__)
+        return wrapper
+
+    if func is not None:
+        return deco(func)
+    return deco
 
 
 def debug_info(include_builtins: bool = False) -> Dict[str, Any]:
@@ -70,5 +274,7 @@ def debug_info(include_builtins: bool = False) -> Dict[str, Any]:
 
 
 __all__ = [
-    "processify"
+    "processify",
+    "set_processify_workers",
+    "shutdown_processify_pool",
 ]
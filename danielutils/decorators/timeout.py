@@ -1,8 +1,13 @@
-import threading
+import ctypes
 import functools
-import logging
-from typing import Callable, TypeVar, Union
-from .validate import validate
+import heapq
+import itertools
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple, TypeVar, Union
 from ..versioned_imports import ParamSpec
 from ..logging_.utils import get_logger
 
@@ -12,26 +17,248 @@ T = TypeVar("T")
 P = ParamSpec("P")
 FuncT = Callable[P, T]  # type:ignore
 
+_MODES = ("auto", "signal", "watchdog", "process")
+
+
+class _TimeoutInterrupt(BaseException):
+    """raised inside the timed function when its deadline passes.
+    derives from BaseException so that 'except Exception' inside the function does not swallow it
+    """
+
+
+class _Deadline:
+    """a single scheduled deadline in the watchdog heap
+    """
+    __slots__ = ("callback", "lock", "done", "fired")
+
+    def __init__(self, callback: Callable[[], None]) -> None:
+        self.callback = callback
+        self.lock = threading.Lock()
+        self.done = False
+        self.fired = False
+
+    def fire(self) -> None:
+        with self.lock:
+            if self.done:
+                return
+            self.fired = True
+            self.callback()
+
+    def finish(self) -> bool:
+        """mark the deadline as no longer needed
+
+        Returns:
+            bool: whether the deadline has already fired
+        """
+        with self.lock:
+            self.done = True
+            return self.fired
+
+
+class _Watchdog:
+    """a single daemon thread servicing a heap of deadlines for all timed calls
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, _Deadline]] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, delay: float, deadline: _Deadline) -> None:
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="danielutils-timeout-watchdog", daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), deadline))
+            if self._heap[0][2] is deadline:
+                self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][2].done:
+                    if self._heap:
+                        heapq.heappop(self._heap)
+                        continue
+                    self._cond.wait()
+                when, _, deadline = self._heap[0]
+                remaining = when - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                heapq.heappop(self._heap)
+            try:
+                deadline.fire()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Timeout watchdog callback failed: %s: %s", type(e).__name__, e)
+
+
+_watchdog = _Watchdog()
+
 
-@validate  # type:ignore
-def timeout(duration: Union[int, float], silent: bool = False) -> Callable[[FuncT], FuncT]:
+# How the watchdog interrupts a thread, and which CPython behaviour it relies on:
+# PyThreadState_SetAsyncExc stores the exception on the target thread and signals the eval breaker.
+# The thread raises it at its next eval breaker check, which happens on backward jumps, on function
+# entry and after calls, so anywhere in Python code and at most once per scheduled exception.
+# Clearing a pending exception with PyThreadState_SetAsyncExc(id, NULL) does not reset the eval breaker
+# on CPython 3.11, which then stays set and makes a later sys.setprofile callback spin forever.
+# So a deadline which fired is never cleared, its interrupt is received and dropped instead.
+_DELIVERY_TIMEOUT: float = 1.0
+
+
+def _set_async_exc(thread_ident: int, exc_type: type) -> None:
+    """schedule exc_type to be raised in the thread with the given ident
+    """
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_ident), ctypes.py_object(exc_type))
+
+
+def _receive_pending_interrupt() -> None:
+    """spin until the _TimeoutInterrupt scheduled for the calling thread is raised, the loop's backward
+    jump checks the eval breaker. the caller catches it
+    """
+    end = time.monotonic() + _DELIVERY_TIMEOUT
+    while time.monotonic() < end:
+        pass
+    logger.warning("Timeout interrupt was not delivered within %ss", _DELIVERY_TIMEOUT)
+
+
+def _can_use_signal() -> bool:
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+def _call_with_watchdog(func: Callable, args: tuple, kwargs: dict, duration: float) -> Any:
+    thread_ident = threading.get_ident()
+    deadline = _Deadline(lambda: _set_async_exc(thread_ident, _TimeoutInterrupt))
+    outcome: Optional[Tuple[bool, Any]] = None
+    delivered = False
+    # the interrupt may arrive anywhere from scheduling until the deadline is known to be settled,
+    # every statement in between is inside a handler for it
+    try:
+        try:
+            _watchdog.schedule(duration, deadline)
+            outcome = (True, func(*args, **kwargs))
+        except _TimeoutInterrupt:
+            raise
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            outcome = (False, e)
+    except _TimeoutInterrupt:
+        delivered = True
+    while not delivered:
+        try:
+            if not deadline.finish():
+                # it did not fire and now never will
+                break
+            _receive_pending_interrupt()
+            break
+        except _TimeoutInterrupt:
+            delivered = True
+    if outcome is None:
+        raise _TimeoutInterrupt()
+    ok, value = outcome
+    if not ok:
+        raise value
+    # the function finished in time, an interrupt arriving after it returned is dropped
+    return value
+
+
+def _alarm_handler(signum, frame) -> None:  # pylint: disable=unused-argument
+    raise _TimeoutInterrupt()
+
+
+def _call_with_signal(func: Callable, args: tuple, kwargs: dict, duration: float) -> Any:
+    prev_delay, prev_interval = signal.getitimer(signal.ITIMER_REAL)
+    if 0 < prev_delay <= duration:
+        # an enclosing timer expires first, it alone decides the outcome
+        return func(*args, **kwargs)
+    start = time.monotonic()
+    prev_handler = signal.signal(signal.SIGALRM, _alarm_handler)
+    try:
+        signal.setitimer(signal.ITIMER_REAL, duration)
+        return func(*args, **kwargs)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, prev_handler)
+        if prev_delay > 0:
+            signal.setitimer(signal.ITIMER_REAL, max(prev_delay - (time.monotonic() - start), 1e-6), prev_interval)
+
+
+def _process_target(conn, target: Any, args: tuple, kwargs: dict) -> None:
+    try:
+        func = target.resolve() if hasattr(target, "resolve") else target
+        conn.send((True, func(*args, **kwargs)))
+    except BaseException as e:  # pylint: disable=broad-exception-caught
+        conn.send((False, e))
+    finally:
+        conn.close()
+
+
+def _call_with_process(func: Callable, args: tuple, kwargs: dict, duration: float) -> Any:
+    from .processify import _FunctionReference  # pylint: disable=import-outside-toplevel
+
+    ctx = multiprocessing.get_context()
+    # forked children inherit the function, otherwise it must be resolvable by import
+    target: Any = func if ctx.get_start_method() == "fork" else \
+        _FunctionReference(func.__module__, func.__qualname__, "__timeout_target__")
+    receiver, sender = ctx.Pipe(duplex=False)
+    p = ctx.Process(target=_process_target, args=(sender, target, args, kwargs), daemon=True)
+    p.start()
+    sender.close()
+    try:
+        if not receiver.poll(duration):
+            logger.warning("Killing process %s of %s after %ss", p.pid, func.__name__, duration)
+            p.kill()
+            raise _TimeoutInterrupt()
+        try:
+            ok, value = receiver.recv()
+        except EOFError:
+            # the pipe was closed without a result, the child died before it could send one
+            p.join()
+            raise RuntimeError(f"The process running {func.__module__}.{func.__qualname__} exited with code "
+                               f"{p.exitcode} without returning a result") from None
+    finally:
+        receiver.close()
+        p.join()
+    if not ok:
+        raise value
+    return value
+
+
+def timeout(duration: Union[int, float], silent: bool = False, mode: str = "auto") -> Callable[[FuncT], FuncT]:
     """A decorator to limit runtime for a function
 
+    The function runs in the calling thread and its deadline is enforced by one of the following modes:
+        * 'signal' - SIGALRM / setitimer, only on POSIX and from the main thread.
+        interrupts blocking system calls as well.
+        * 'watchdog' - a single shared watchdog thread raises the timeout inside the calling thread.
+        can not interrupt a blocking call into C code until it returns.
+        * 'process' - runs the function in a child process which is killed on timeout.
+        arguments and return value must be picklable.
+        * 'auto' - 'signal' when possible, otherwise 'watchdog'.
+
     Args:
         duration (Union[int, float]): allowed runtime duration
         silent (bool, optional): keyword only argument whether
         to pass the exception up the call stack. Defaults to False.
+        mode (str, optional): how to enforce the deadline. Defaults to 'auto'.
 
     Raises:
-        ValueError: if a function is not provided to be decorated
+        ValueError: if duration is not positive, a function is not provided to be decorated or mode is unknown
+        TimeoutError: if the function did not finish in time and silent is False
+        RuntimeError: in 'process' mode, if the child process died without returning a result
         Exception: any exception from within the function
 
     Returns:
         Callable: the result decorated function
     """
-    logger.debug("Creating timeout decorator with duration=%ss, silent=%s", duration, silent)
+    logger.debug("Creating timeout decorator with duration=%ss, silent=%s, mode=%s", duration, silent, mode)
+    if not isinstance(duration, (int, float)) or isinstance(duration, bool) or duration <= 0:
+        raise ValueError(f"timeout duration must be a positive number, got '{duration}'")
+    if mode not in _MODES:
+        raise ValueError(f"timeout mode must be one of {_MODES}, got '{mode}'")
+    if mode == "signal" and not hasattr(signal, "setitimer"):
+        raise ValueError("timeout mode 'signal' is not supported on this platform")
 
-    # https://stackoverflow.com/a/21861599/6416556
     def timeout_deco(func: FuncT) -> FuncT:
         logger.debug("Applying timeout decorator to function %s", func.__name__)
         if not callable(func):
@@ -40,37 +267,29 @@ def timeout(duration: Union[int, float], silent: bool = False) -> Callable[[Func
 
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            logger.debug("Executing function %s with timeout %ss", func.__name__, duration)
-            res: list = [
-                TimeoutError(f'{func.__module__}.{func.__qualname__} timed out after {duration} seconds!')]
-
-            def timeout_wrapper() -> None:
-                try:
-                    logger.debug("Starting timeout thread for %s", func.__name__)
-                    res[0] = func(*args, **kwargs)
-                    logger.debug("Function %s completed successfully in timeout thread", func.__name__)
-                except Exception as function_error:  # pylint : disable=broad-exception-caught
-                    logger.warning("Function %s raised exception in timeout thread: %s: %s", func.__name__, type(function_error).__name__, function_error)
-                    res[0] = function_error
-
-            t = threading.Thread(target=timeout_wrapper, daemon=True)
+            if mode == "process":
+                caller = _call_with_process
+            elif mode == "signal" or (mode == "auto" and _can_use_signal()):
+                if threading.current_thread() is not threading.main_thread():
+                    raise RuntimeError("timeout mode 'signal' can only be used from the main thread")
+                caller = _call_with_signal
+            else:
+                caller = _call_with_watchdog
             try:
-                logger.debug("Starting timeout thread for %s", func.__name__)
-                t.start()
-                t.join(duration)
-                logger.debug("Timeout thread for %s completed or timed out", func.__name__)
-            except Exception as thread_error:
-                logger.error("Thread error for %s: %s: %s", func.__name__, type(thread_error).__name__, thread_error)
-                raise thread_error
-            if isinstance(res[0], BaseException):
-                if not silent:
-                    logger.warning("Function %s timed out or raised exception: %s", func.__name__, type(res[0]).__name__)
-                    raise res[0]
-                logger.debug("Function %s timed out but silent mode enabled", func.__name__)
-                return None
-            logger.debug("Function %s completed successfully within timeout", func.__name__)
-            return res[0]
+                return caller(func, args, kwargs, duration)
+            except _TimeoutInterrupt:
+                if silent:
+                    logger.debug("Function %s timed out but silent mode enabled", func.__name__)
+                    return None
+                logger.warning("Function %s timed out after %ss", func.__name__, duration)
+                raise TimeoutError(  # pylint: disable=raise-missing-from
+                    f'{func.__module__}.{func.__qualname__} timed out after {duration} seconds!')
+            except Exception:
+                if silent:
+                    return None
+                raise
 
+        wrapper.__timeout_target__ = func  # type:ignore
         logger.debug("Timeout decorator applied to %s", func.__name__)
         return wrapper
 
@@ -1,11 +1,8 @@
-import logging
-import time
-from typing import Generator, Any, Tuple as Tuple
-from threading import Semaphore  # , Condition
-from ..decorators import threadify
-from ..data_structures import AtomicQueue, Queue
-from ..better_builtins import AtomicCounter
-# from ..Print import aprint
+import asyncio
+import queue
+import threading
+from typing import Generator, Any, Tuple as Tuple, Iterable, AsyncIterable, AsyncGenerator, Callable, Union, Optional, \
+    List
 from ..reflection import get_python_version
 from ..logging_.utils import get_logger
 
@@ -14,96 +11,206 @@ logger = get_logger(__name__)
 if get_python_version() >= (3, 9):
     from builtins import tuple as Tuple  # type:ignore
 
+_ITEM, _DONE, _ERROR = range(3)
 
-def join_generators_busy_waiting(*generators) -> Generator[Tuple[int, Any], None, None]:
-    """joins an arbitrary amount of generators to yield objects as soon someone yield an object
 
-    Yields:
-        Generator[tuple[int, Any], None, None]: resulting generator
+class _CachedThreadPool:
+    """a pool of daemon threads which are reused between tasks.
+
+    a task is handed to an idle thread if there is one, otherwise a new thread is started,
+    so long running tasks never starve each other. threads idle for 'keep_alive' seconds exit.
     """
-    logger.info("Starting join_generators_busy_waiting with %s generators", len(generators))
-    q: AtomicQueue[Tuple[int, Any]] = AtomicQueue()
-    threads_status = [False for _ in range(len(generators))]
-
-    @threadify  # type:ignore
-    def yield_from_one(thread_id: int, generator: Generator):
-        nonlocal threads_status
-        items_yielded = 0
-        for v in generator:
-            q.push((thread_id, v))
-            items_yielded += 1
-        logger.debug("Thread %s finished processing, yielded %s items", thread_id, items_yielded)
-        threads_status[thread_id] = True
-
-    for i, gen in enumerate(generators):
-        yield_from_one(i, gen)
-
-    # busy waiting
-    total_yielded = 0
-    while not all(threads_status):
-        while not q.is_empty():
-            item = q.pop()
-            total_yielded += 1
-            yield item
-    if not q.is_empty():
-        remaining_items = 0
-        for item in q:
-            remaining_items += 1
-            yield item
-    
-    logger.info("join_generators_busy_waiting completed, yielded %s items total", total_yielded)
-
-
-def join_generators(*generators) -> Generator[Tuple[int, Any], None, None]:
-    """will join generators to yield from all of them simultaneously 
-    without busy waiting, using semaphores and multithreading 
+
+    def __init__(self, keep_alive: float = 60.0) -> None:
+        self._keep_alive = keep_alive
+        self._tasks: "queue.SimpleQueue[Tuple[Callable, tuple]]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._idle = 0
+
+    def submit(self, func: Callable, *args: Any) -> None:
+        with self._lock:
+            if self._idle > 0:
+                self._idle -= 1
+                self._tasks.put((func, args))
+                return
+        threading.Thread(target=self._run, args=((func, args),), daemon=True).start()
+
+    def _run(self, task: Tuple[Callable, tuple]) -> None:
+        while True:
+            func, args = task
+            try:
+                func(*args)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Pooled thread task failed: %s: %s", type(e).__name__, e)
+            del func, args, task
+            with self._lock:
+                self._idle += 1
+            try:
+                task = self._tasks.get(timeout=self._keep_alive)
+            except queue.Empty:
+                with self._lock:
+                    try:
+                        # a task may have been handed to this thread right as it timed out
+                        task = self._tasks.get_nowait()
+                    except queue.Empty:
+                        self._idle -= 1
+                        return
+
+
+_POOL = _CachedThreadPool()
+
+
+def _produce(index: int, generator: Iterable, put: Callable[[Tuple[int, int, Any]], None],
+             slots: threading.Semaphore, stop: threading.Event) -> None:
+    """pushes the values of one source through put, holding a slot for every value which was not consumed yet"""
+    try:
+        for value in generator:
+            slots.acquire()
+            if stop.is_set():
+                break
+            put((_ITEM, index, value))
+        else:
+            put((_DONE, index, None))
+    except BaseException as e:  # pylint: disable=broad-exception-caught
+        put((_ERROR, index, e))
+    finally:
+        close = getattr(generator, "close", None)
+        if stop.is_set() and close is not None:
+            close()
+
+
+def join_generators(*generators: Iterable, buffer_size: int = 16) -> Generator[Tuple[int, Any], None, None]:
+    """will join generators to yield from all of them simultaneously
+    without busy waiting, every generator is iterated on a thread reused from a shared pool
+
+    Args:
+        *generators (Iterable): the sources
+        buffer_size (int, optional): maximal amount of values a source produces ahead of the consumer. Defaults to 16.
+
+    Raises:
+        Exception: the first exception raised by a source, after the other sources were stopped
 
     Yields:
-        Generator[Any, None, None]: one generator that combines all of the given ones
+        Generator[tuple[int, Any], None, None]: (index of the source, value) as soon as any source yields a value
     """
+    if buffer_size < 1:
+        raise ValueError("buffer_size must be at least 1")
     logger.info("Starting join_generators with %s generators", len(generators))
-    queue: Queue = Queue()
-    edit_queue_semaphore = Semaphore(1)
-    queue_status_semaphore = Semaphore(0)
-    finished_threads_counter = AtomicCounter()
-
-    @threadify  # type:ignore
-    def thread_entry_point(index: int, generator: Generator) -> None:
-        items_processed = 0
-        for value in generator:
-            with edit_queue_semaphore:
-                queue.push((index, value))
-            queue_status_semaphore.release()
-            items_processed += 1
-            time.sleep(0)
-        logger.debug("Thread %s finished processing, processed %s items", index, items_processed)
-        finished_threads_counter.increment()
-
-        if finished_threads_counter.get() == len(generators):
-            # re-release the lock once from the last thread because it
-            # gets stuck in the main loop after the generation has stopped
-            queue_status_semaphore.release()
-
+    out: "queue.SimpleQueue[Tuple[int, int, Any]]" = queue.SimpleQueue()
+    slots = [threading.Semaphore(buffer_size) for _ in generators]
+    stop = threading.Event()
     for i, generator in enumerate(generators):
-        thread_entry_point(i, generator)
+        _POOL.submit(_produce, i, generator, out.put, slots[i], stop)
 
+    remaining = len(generators)
     total_yielded = 0
-    while True:
-        queue_status_semaphore.acquire()
-        with edit_queue_semaphore:
-            while not queue.is_empty():
-                item = queue.pop()
+    try:
+        while remaining:
+            kind, index, value = out.get()
+            if kind == _ITEM:
+                slots[index].release()
                 total_yielded += 1
-                yield item
-        if finished_threads_counter.get() == len(generators):
-            with edit_queue_semaphore:
-                if queue.is_empty():
-                    break
-
+                yield index, value
+            elif kind == _DONE:
+                remaining -= 1
+            else:
+                logger.error("Generator %s raised %s: %s", index, type(value).__name__, value)
+                raise value
+    finally:
+        # stops the sources after an exception or when the consumer stopped early
+        stop.set()
+        for semaphore in slots:
+            semaphore.release()
     logger.info("join_generators completed, yielded %s items total", total_yielded)
 
 
+def join_generators_busy_waiting(*generators) -> Generator[Tuple[int, Any], None, None]:
+    """joins an arbitrary amount of generators to yield objects as soon someone yield an object.
+    kept for backwards compatibility, this is join_generators and no longer busy waits
+
+    Yields:
+        Generator[tuple[int, Any], None, None]: resulting generator
+    """
+    yield from join_generators(*generators)
+
+
+async def _aproduce(index: int, iterable: AsyncIterable, out: asyncio.Queue, slots: asyncio.Semaphore) -> None:
+    try:
+        async for value in iterable:
+            await slots.acquire()
+            await out.put((_ITEM, index, value))
+        await out.put((_DONE, index, None))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        await out.put((_ERROR, index, e))
+
+
+async def ajoin_generators(*generators: Union[AsyncIterable, Iterable], buffer_size: int = 16) \
+        -> AsyncGenerator[Tuple[int, Any], None]:
+    """the asyncio version of join_generators, every async source is iterated by its own task.
+    sync sources are iterated on threads of the pool join_generators uses, so a blocking source
+    does not stall the event loop
+
+    Args:
+        *generators (Union[AsyncIterable, Iterable]): the sources
+        buffer_size (int, optional): maximal amount of values a source produces ahead of the consumer. Defaults to 16.
+
+    Raises:
+        Exception: the first exception raised by a source, after the other sources were cancelled
+
+    Yields:
+        AsyncGenerator[tuple[int, Any], None]: (index of the source, value) as soon as any source yields a value
+    """
+    if buffer_size < 1:
+        raise ValueError("buffer_size must be at least 1")
+    loop = asyncio.get_running_loop()
+    out: asyncio.Queue = asyncio.Queue()
+
+    def put(item: Tuple[int, int, Any]) -> None:
+        try:
+            loop.call_soon_threadsafe(out.put_nowait, item)
+        except RuntimeError:
+            # the event loop was closed while the consumer was gone
+            pass
+
+    stop = threading.Event()
+    slots: List[Union[asyncio.Semaphore, threading.Semaphore]] = []
+    tasks = []
+    for i, generator in enumerate(generators):
+        if isinstance(generator, AsyncIterable):
+            slots.append(asyncio.Semaphore(buffer_size))
+            tasks.append(asyncio.ensure_future(_aproduce(i, generator, out, slots[i])))  # type:ignore
+        else:
+            slots.append(threading.Semaphore(buffer_size))
+            _POOL.submit(_produce, i, generator, put, slots[i], stop)
+    remaining = len(generators)
+    try:
+        while remaining:
+            kind, index, value = await out.get()
+            if kind == _ITEM:
+                slots[index].release()
+                yield index, value
+            elif kind == _DONE:
+                remaining -= 1
+            else:
+                raise value
+    finally:
+        # stopped sync sources are closed by their thread
+        stop.set()
+        for semaphore in slots:
+            semaphore.release()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for generator in generators:
+            aclose: Optional[Callable] = getattr(generator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+
 __all__ = [
     "join_generators_busy_waiting",
-    "join_generators"
+    "join_generators",
+    "ajoin_generators",
 ]
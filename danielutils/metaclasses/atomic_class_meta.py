@@ -1,36 +1,165 @@
-import logging
+import functools
+import inspect
+import threading
+import weakref
+from typing import Any, Callable, Dict, Union
 from ..decorators import atomic
+from ..abstractions.multiprogramming import ReadWriteLock
 from ..logging_.utils import get_logger
 
 logger = get_logger(__name__)
 
+LockT = Union["threading.RLock", ReadWriteLock]  # type:ignore
+
+_LOCK_MODES = ("instance", "rw", "function")
+# implicitly static / class methods which must not be wrapped as instance methods
+_SKIP = {"__new__", "__init_subclass__", "__class_getitem__"}
+_READ_ONLY_ATTRIBUTE = "__atomic_read_only__"
+
+
+def read_only(func: Callable) -> Callable:
+    """marks a method of an AtomicClassMeta class with lock_mode="rw" as read only,
+    so that it takes the shared side of the instance's reader/writer lock
+    and may run concurrently with other read only methods
+
+    Args:
+        func (Callable): the method to mark
+
+    Returns:
+        Callable: the same method
+    """
+    setattr(getattr(func, "__func__", func), _READ_ONLY_ATTRIBUTE, True)
+    return func
+
+
+class _InstanceLocks:
+    """per instance locks, keyed by id and dropped when the instance is garbage collected
+    """
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self._factory = factory
+        self._locks: Dict[int, Any] = {}
+        self._creation_lock = threading.Lock()
+        # used for instances which do not support weak references
+        self._fallback = factory()
+
+    def get(self, instance: Any) -> Any:
+        key = id(instance)
+        lock = self._locks.get(key)
+        if lock is not None:
+            return lock
+        with self._creation_lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                try:
+                    weakref.finalize(instance, self._locks.pop, key, None)
+                except TypeError:
+                    logger.debug("%s does not support weak references, using a class wide lock",
+                                 type(instance).__name__)
+                    return self._fallback
+                lock = self._locks[key] = self._factory()
+        return lock
+
 
 class AtomicClassMeta(type):
     """will make all of the class's function atomic
+
+    The locking strategy is chosen with the 'lock_mode' class keyword:
+        * 'instance' (default) - every instance has its own reentrant lock shared by all of its methods,
+        so methods of the same instance exclude each other and different instances do not.
+        * 'rw' - every instance has its own reader/writer lock, methods marked with @read_only
+        may run concurrently with each other while all other methods run exclusively.
+        * 'function' - legacy behaviour, one lock per method shared by all instances.
+
+    Static and class methods are guarded by a single lock per class.
+
+    Usage:
+        class Account(metaclass=AtomicClassMeta, lock_mode="rw"):
+            @read_only
+            def balance(self) -> int:
+                ...
     """
-    def __new__(mcs, name, bases, namespace):
-        logger.info("Creating atomic class: %s", name)
-        
+
+    def __new__(mcs, name, bases, namespace, lock_mode: str = "instance", **kwargs):
+        logger.info("Creating atomic class: %s with lock_mode=%s", name, lock_mode)
+        if lock_mode not in _LOCK_MODES:
+            raise ValueError(f"lock_mode must be one of {_LOCK_MODES}, got '{lock_mode}'")
+
+        if lock_mode == "function":
+            wrap = mcs._wrap_function_mode
+        else:
+            factory: Callable[[], LockT] = threading.RLock if lock_mode == "instance" else ReadWriteLock
+            wrap = functools.partial(mcs._wrap_shared_mode, _InstanceLocks(factory), factory(), lock_mode == "rw")
+
         # Process class methods
         class_methods_processed = 0
-        for k, v in namespace.items():
-            if callable(v):
-                namespace[k] = atomic(v)  # type:ignore
+        for k, v in list(namespace.items()):
+            wrapped = wrap(k, v)
+            if wrapped is not v:
+                namespace[k] = wrapped
                 class_methods_processed += 1
-        
+
         # Process inherited methods
         inherited_methods_processed = 0
         for base in bases:
             for k, v in base.__dict__.items():
-                if callable(v):
-                    if k not in namespace:
-                        namespace[k] = atomic(v)  # type:ignore
+                if k not in namespace:
+                    wrapped = wrap(k, v)
+                    if wrapped is not v:
+                        namespace[k] = wrapped
                         inherited_methods_processed += 1
-        
-        logger.info("AtomicClassMeta: %s created with %s class methods and %s inherited methods made atomic", name, class_methods_processed, inherited_methods_processed)
-        return super().__new__(mcs, name, bases, namespace)
+
+        logger.info("AtomicClassMeta: %s created with %s class methods and %s inherited methods made atomic", name,
+                    class_methods_processed, inherited_methods_processed)
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+    def __init__(cls, name, bases, namespace, lock_mode: str = "instance", **kwargs):  # pylint: disable=unused-argument
+        super().__init__(name, bases, namespace, **kwargs)
+
+    @staticmethod
+    def _wrap_function_mode(key: str, value: Any) -> Any:
+        if key in _SKIP:
+            return value
+        if isinstance(value, (staticmethod, classmethod)):
+            return type(value)(atomic(value.__func__))  # type:ignore
+        if inspect.isfunction(value):
+            return atomic(value)  # type:ignore
+        return value
+
+    @staticmethod
+    def _wrap_shared_mode(instance_locks: _InstanceLocks, class_lock: LockT, rw: bool, key: str, value: Any) -> Any:
+        if key in _SKIP:
+            return value
+        if isinstance(value, (staticmethod, classmethod)):
+            return type(value)(_guard(value.__func__, lambda args: class_lock, rw))  # type:ignore
+        if inspect.isfunction(value):
+            return _guard(value, lambda args: instance_locks.get(args[0]) if args else class_lock, rw)
+        return value
+
+
+def _guard(func: Callable, get_lock: Callable[[tuple], Any], rw: bool) -> Callable:
+    """wrap func so that it runs while holding the lock returned by get_lock for its arguments
+    """
+    if rw:
+        read = getattr(func, _READ_ONLY_ATTRIBUTE, False)
+
+        @functools.wraps(func)
+        def rw_wrapper(*args, **kwargs):
+            lock: ReadWriteLock = get_lock(args)
+            with (lock.read() if read else lock.write()):
+                return func(*args, **kwargs)
+
+        return rw_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with get_lock(args):
+            return func(*args, **kwargs)
+
+    return wrapper
 
 
 __all__ = [
-    "AtomicClassMeta"
+    "AtomicClassMeta",
+    "read_only",
 ]
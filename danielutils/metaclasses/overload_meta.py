@@ -27,9 +27,11 @@ class OverloadMeta(type):
         logger.info("Creating overload class: %s", name)
         
         def create_wrapper(v: overload):
+            dispatch = v.__call__
+
             @functools.wraps(next(iter(v._functions.values()))[0])  # type:ignore# pylint: disable=protected-access
             def wrapper(*args, **kwargs):
-                return v(*args, **kwargs)
+                return dispatch(*args, **kwargs)
 
             return wrapper
 
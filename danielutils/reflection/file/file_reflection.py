@@ -16,15 +16,11 @@ def get_caller_file_name() -> Optional[str]:
     Returns:
         Optional[str]: name of file
     """
-    logger.debug("Getting caller file name")
     frame = _get_prev_frame_from(_get_prev_frame_from(inspect.currentframe()))
     if frame is None:
-        logger.debug("No caller frame found")
         return None
     frame = cast(FrameType, frame)
-    filename = frame.f_code.co_filename
-    logger.debug("Caller file name: %s", filename)
-    return filename
+    return frame.f_code.co_filename
 
 
 def get_current_file_path() -> Optional[str]:
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional, Set, Union
+
+# the results of the analysis of a Python file which are cached
+FILE_ANALYSIS_FIELDS = (
+    'line_count', 'code_lines', 'comment_lines', 'empty_lines', 'classes', 'functions', 'docstrings', 'imports'
+)
+# the totals of a folder after FolderInfo.compute_statistics()
+FOLDER_TOTAL_FIELDS = (
+    'total_files', 'total_folders', 'python_files', 'total_lines', 'code_lines', 'comment_lines', 'empty_lines',
+    'total_size'
+)
+
+
+def content_hash(path: str) -> str:
+    """BLAKE2b digest of the content of a file."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FolderAnalysisCache:
+    """On disk cache of FolderAnalyzer results, stored as JSON.
+
+    Python file analyses are keyed by absolute path and reused while the file's size and mtime are unchanged.
+    With hash_contents=True a file whose mtime changed (a fresh checkout for example) is still a hit
+    when its content hash is unchanged.
+    Folder statistics are keyed by a digest of the folder's entries and the digests of its subfolders,
+    so after a change only the changed folders and their ancestors are rolled up again.
+    """
+    VERSION = 1
+
+    def __init__(self, path: Union[str, Path], hash_contents: bool = False):
+        """
+        Args:
+            path: the JSON file holding the cache, created by save() if missing
+            hash_contents: whether to compare content hashes when a file's mtime changed
+        """
+        self.path = str(path)
+        self.hash_contents = hash_contents
+        self.hits = 0
+        self.misses = 0
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._folders: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        """Load the cache file, starting empty if it is missing, unreadable or of another version."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('version') != self.VERSION:
+            return
+        self._files = data.get('files', {})
+        self._folders = data.get('folders', {})
+
+    def save(self) -> None:
+        """Atomically write the cache file if anything changed."""
+        if not self._dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.folder_cache_', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'files': self._files, 'folders': self._folders}, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._dirty = False
+
+    def get_file(self, path: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            path: absolute path of the file
+            stat: the file's current stat data
+
+        Returns:
+            the cached analysis of the file if it is still valid
+        """
+        entry = self._files.get(path)
+        if entry is not None and entry['size'] == stat.st_size:
+            if entry['mtime_ns'] == stat.st_mtime_ns:
+                self.hits += 1
+                return entry['analysis']
+            if self.hash_contents and entry.get('hash') is not None:
+                try:
+                    unchanged = content_hash(path) == entry['hash']
+                except OSError:
+                    unchanged = False
+                if unchanged:
+                    entry['mtime_ns'] = stat.st_mtime_ns
+                    self._dirty = True
+                    self.hits += 1
+                    return entry['analysis']
+        self.misses += 1
+        return None
+
+    def put_file(self, path: str, stat: os.stat_result, analysis: Dict[str, Any]) -> None:
+        file_hash = None
+        if self.hash_contents:
+            try:
+                file_hash = content_hash(path)
+            except OSError:
+                pass
+        self._files[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': file_hash,
+                             'analysis': analysis}
+        self._dirty = True
+
+    def get_folder(self, path: str, digest: str) -> Optional[Dict[str, Any]]:
+        """the cached totals of a folder if its digest is unchanged"""
+        entry = self._folders.get(path)
+        if entry is not None and entry['digest'] == digest:
+            return entry
+        return None
+
+    def put_folder(self, path: str, digest: str, totals: Dict[str, Any]) -> None:
+        self._folders[path] = dict(totals, digest=digest)
+        self._dirty = True
+
+    def prune(self, root: str, seen_files: Set[str], seen_folders: Set[str]) -> None:
+        """Forget the files and folders under root which were not seen by the last analysis of root."""
+        prefix = root.rstrip(os.sep) + os.sep
+        for entries, seen in ((self._files, seen_files), (self._folders, seen_folders)):
+            stale = [path for path in entries if (path == root or path.startswith(prefix)) and path not in seen]
+            for path in stale:
+                del entries[path]
+            self._dirty = self._dirty or bool(stale)
+
+
+__all__ = [
+    "FolderAnalysisCache",
+]
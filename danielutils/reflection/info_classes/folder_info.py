@@ -5,13 +5,20 @@ Provides comprehensive information about folders and their contents recursively.
 """
 
 import os
+import re
 import fnmatch
+import hashlib
 from pathlib import Path
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
 import statistics
-from typing import Dict, List, Tuple, Any, Set, Optional, Union
-from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Any, Set, Optional, Union, Iterable, Pattern
+from dataclasses import dataclass, field, InitVar
 from datetime import datetime
+from .folder_cache import FolderAnalysisCache, FILE_ANALYSIS_FIELDS, FOLDER_TOTAL_FIELDS
+
+# below this amount of Python files they are analyzed in the calling process
+_PARALLEL_THRESHOLD = 32
 
 
 @dataclass
@@ -33,11 +40,12 @@ class FileInfo:
     created_time: Optional[datetime] = None
     modified_time: Optional[datetime] = None
     accessed_time: Optional[datetime] = None
+    analyze: InitVar[bool] = True
 
-    def __post_init__(self):
+    def __post_init__(self, analyze: bool = True):
         """Set file type and analyze Python files."""
         self.is_python = self.extension.lower() == '.py'
-        if self.is_python:
+        if self.is_python and analyze:
             self._analyze_python_file()
 
     def _analyze_python_file(self):
@@ -119,6 +127,7 @@ class FolderInfo:
     # Computed properties
     _stats_computed: bool = False
     _file_stats: Dict[str, Any] = field(default_factory=dict)
+    _digest: Optional[str] = None
 
     def __post_init__(self):
         """Initialize computed properties."""
@@ -315,12 +324,100 @@ class FolderInfo:
             subfolder.print_summary(indent + 1)
 
 
-class FolderAnalyzer:
-    """Analyzer for creating FolderInfo instances recursively."""
+def _file_info_from_stat(name: str, path: str, stat: Optional[os.stat_result],
+                         analysis: Optional[Dict[str, Any]] = None) -> FileInfo:
+    """Create a FileInfo from already fetched stat data, None for files which could not be stat-ed.
+    A cached analysis of a Python file is used instead of analyzing the file again."""
+    extension = _suffix(name)
+    if stat is None:
+        return FileInfo(name=name, path=path, size=0, extension=extension)
+    file_info = FileInfo(
+        name=name,
+        path=path,
+        size=stat.st_size,
+        extension=extension,
+        created_time=datetime.fromtimestamp(stat.st_ctime),
+        modified_time=datetime.fromtimestamp(stat.st_mtime),
+        accessed_time=datetime.fromtimestamp(stat.st_atime),
+        analyze=analysis is None
+    )
+    if analysis is not None:
+        for key in FILE_ANALYSIS_FIELDS:
+            setattr(file_info, key, list(analysis[key]) if key == 'imports' else analysis[key])
+    return file_info
+
+
+def _file_infos_from_stats(batch: List[Tuple[str, str, Optional[os.stat_result]]]) -> List[FileInfo]:
+    """Process pool entry point, analyzes a batch of files."""
+    return [_file_info_from_stat(name, path, stat) for name, path, stat in batch]
+
+
+def _absolute(path: str) -> str:
+    """Path(path).absolute() without creating a Path."""
+    return path if os.path.isabs(path) else os.path.join(os.getcwd(), path)
+
+
+def _suffix(name: str) -> str:
+    """Path(name).suffix without creating a Path."""
+    extension = os.path.splitext(name)[1]
+    return '' if extension == '.' else extension
 
-    def __init__(self, blacklist: Optional[Set[str]] = None):
-        """Initialize the analyzer with optional blacklist."""
+
+# a file entry of a folder is either analyzed already or waits for the process pool
+_Entry = Union[FileInfo, Tuple[str, str, Optional[os.stat_result]]]
+
+
+class FolderAnalyzer:
+    """Analyzer for creating FolderInfo instances recursively.
+
+    Folders are walked with os.scandir, reusing the stat data of the directory entries,
+    and Python files are analyzed on a process pool once there are enough of them.
+
+    With a cache, unchanged Python files are not analyzed again and the statistics of unchanged folders
+    are restored instead of rolled up, the returned FolderInfo has its statistics computed already.
+    """
+
+    def __init__(self, blacklist: Optional[Set[str]] = None, max_workers: Optional[int] = None,
+                 cache: Optional[Union[str, Path, FolderAnalysisCache]] = None):
+        """Initialize the analyzer with optional blacklist.
+
+        Args:
+            blacklist: patterns of names and paths to skip, see is_blacklisted()
+            max_workers: processes analyzing Python files, defaults to the amount of CPUs. 1 disables the pool
+            cache: a FolderAnalysisCache, or the path of its file, reused between runs
+        """
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
         self.blacklist = blacklist or self._get_default_blacklist()
+        self.max_workers = max_workers
+        self.cache = FolderAnalysisCache(cache) if isinstance(cache, (str, Path)) else cache
+
+    @property
+    def blacklist(self) -> Set[str]:
+        return self._blacklist
+
+    @blacklist.setter
+    def blacklist(self, patterns: Set[str]) -> None:
+        self._blacklist = patterns
+        self._name_regex, self._path_regex = self._compile_blacklist(patterns)
+
+    @staticmethod
+    def _compile_blacklist(patterns: Iterable[str]) -> Tuple[Optional[Pattern], Optional[Pattern]]:
+        """Compile the blacklist into one regex matched against names and one searched in paths."""
+        flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+        name_parts: List[str] = []
+        path_parts: List[str] = []
+        for pattern in sorted(patterns):
+            if pattern.endswith('/') or pattern.endswith('\\'):
+                path_parts.append(re.escape(pattern.rstrip('/\\')) + r'\Z')
+            elif '*' in pattern or '?' in pattern:
+                name_parts.append(fnmatch.translate(pattern))
+            else:
+                # a name equal to the pattern is contained in the path as well
+                path_parts.append(re.escape(pattern))
+        name_regex = re.compile('|'.join(name_parts), flags) if name_parts else None
+        path_regex = re.compile('|'.join(path_parts)) if path_parts else None
+        return name_regex, path_regex
 
     def _get_default_blacklist(self) -> Set[str]:
         """Get default blacklist patterns."""
@@ -353,27 +450,19 @@ class FolderAnalyzer:
             "*.zip", "*.tar.gz", "*.rar", "*.7z", "*.bak", "*.backup",
         }
 
-    def is_blacklisted(self, path: Path) -> bool:
-        """Check if a path matches any blacklist pattern."""
-        path_str = str(path)
+    def is_blacklisted(self, path: Union[Path, str]) -> bool:
+        """Check if a path matches any blacklist pattern.
 
-        for pattern in self.blacklist:
-            # Handle directory patterns
-            if pattern.endswith('/') or pattern.endswith('\\'):
-                if path_str.endswith(pattern.rstrip('/\\')):
-                    return True
-            # Handle glob patterns
-            elif '*' in pattern or '?' in pattern:
-                if fnmatch.fnmatch(path.name, pattern):
-                    return True
-            # Handle exact matches
-            elif path.name == pattern:
-                return True
-            # Handle path contains
-            elif pattern in path_str:
-                return True
+        Patterns ending with a separator match the end of the path, glob patterns match the name
+        and any other pattern matches if it is contained in the path.
+        """
+        path_str = str(path)
+        return self._is_blacklisted(os.path.basename(path_str), path_str)
 
-        return False
+    def _is_blacklisted(self, name: str, path_str: str) -> bool:
+        if self._name_regex is not None and self._name_regex.match(name):
+            return True
+        return self._path_regex is not None and self._path_regex.search(path_str) is not None
 
     def analyze_folder(self, folder_path: Union[str, Path], max_depth: Optional[int] = None) -> FolderInfo:
         """Analyze a folder and return a FolderInfo instance."""
@@ -383,85 +472,150 @@ class FolderAnalyzer:
             raise ValueError(
                 f"Folder {folder_path} does not exist or is not a directory")
 
-        return self._analyze_folder_recursive(folder, depth=0, max_depth=max_depth)
-
-    def _analyze_folder_recursive(self, folder: Path, depth: int = 0, max_depth: Optional[int] = None) -> FolderInfo:
-        """Recursively analyze a folder."""
+        pending: List[Tuple[FolderInfo, List[_Entry]]] = []
+        root = self._walk(str(folder), folder.name, str(folder.absolute()), None, 0, max_depth, pending)
+        self._resolve(pending)
+        if self.cache is not None:
+            self._roll_up(root, self.cache)
+            self.cache.prune(root.path, {_absolute(f.path) for _, entries in pending for f in entries
+                                         if isinstance(f, FileInfo) and f.is_python},
+                             {folder_info.path for folder_info, _ in pending})
+            self.cache.save()
+        return root
+
+    def _walk(self, path: str, name: str, absolute_path: str, stat: Optional[os.stat_result], depth: int,
+              max_depth: Optional[int], pending: List[Tuple[FolderInfo, List[_Entry]]]) -> FolderInfo:
+        """Walk a folder, creating FolderInfo instances and deferring the analysis of Python files."""
         if max_depth is not None and depth > max_depth:
-            return FolderInfo(
-                name=folder.name,
-                path=str(folder),
-                depth=depth
-            )
-
-        # Create FolderInfo instance
-        folder_info = FolderInfo(
-            name=folder.name,
-            path=str(folder.absolute()),
-            depth=depth
-        )
+            return FolderInfo(name=name, path=path, depth=depth)
+
+        folder_info = FolderInfo(name=name, path=absolute_path, depth=depth)
 
         # Get folder timestamps
         try:
-            stat = folder.stat()
+            stat = stat if stat is not None else os.stat(path)
             folder_info.created_time = datetime.fromtimestamp(stat.st_ctime)
             folder_info.modified_time = datetime.fromtimestamp(stat.st_mtime)
             folder_info.accessed_time = datetime.fromtimestamp(stat.st_atime)
         except OSError:
             pass
 
-        # Analyze files in current folder
-        for file_path in folder.iterdir():
-            if file_path.is_file():
-                if self.is_blacklisted(file_path):
-                    folder_info.excluded_files += 1
+        entries: List[_Entry] = []
+        subfolders: List[Tuple[os.DirEntry, str]] = []
+        with os.scandir(path) as it:
+            for entry in it:
+                # like Path.iterdir, entries of '.' are relative paths without a './' prefix
+                entry_path = entry.path if path != '.' else entry.name
+                try:
+                    is_file = entry.is_file()
+                    is_dir = not is_file and entry.is_dir()
+                except OSError:
                     continue
-
-                # Create FileInfo instance
-                file_info = self._create_file_info(file_path)
-                folder_info.add_file(file_info)
-
-            elif file_path.is_dir():
-                if self.is_blacklisted(file_path):
-                    folder_info.excluded_folders += 1
+                if not is_file and not is_dir:
                     continue
-
-                # Recursively analyze subfolder
-                subfolder_info = self._analyze_folder_recursive(
-                    file_path, depth + 1, max_depth
-                )
-                folder_info.add_subfolder(subfolder_info)
-
+                if self._is_blacklisted(entry.name, entry_path):
+                    if is_file:
+                        folder_info.excluded_files += 1
+                    else:
+                        folder_info.excluded_folders += 1
+                    continue
+                if is_dir:
+                    subfolders.append((entry, entry_path))
+                    continue
+                try:
+                    entry_stat: Optional[os.stat_result] = entry.stat()
+                except OSError:
+                    entry_stat = None
+                if _suffix(entry.name).lower() == '.py':
+                    analysis = self.cache.get_file(_absolute(entry_path), entry_stat) \
+                        if self.cache is not None and entry_stat is not None else None
+                    if analysis is not None:
+                        entries.append(_file_info_from_stat(entry.name, entry_path, entry_stat, analysis))
+                    else:
+                        entries.append((entry.name, entry_path, entry_stat))
+                else:
+                    entries.append(_file_info_from_stat(entry.name, entry_path, entry_stat))
+        pending.append((folder_info, entries))
+
+        for entry, entry_path in subfolders:
+            try:
+                entry_stat = entry.stat()
+            except OSError:
+                entry_stat = None
+            folder_info.add_subfolder(self._walk(
+                entry_path, entry.name, _absolute(entry_path), entry_stat, depth + 1, max_depth, pending))
+        if self.cache is not None:
+            folder_info._digest = self._digest(folder_info, entries)  # pylint: disable=protected-access
         return folder_info
 
-    def _create_file_info(self, file_path: Path) -> FileInfo:
-        """Create a FileInfo instance for a file."""
-        try:
-            stat = file_path.stat()
-            file_info = FileInfo(
-                name=file_path.name,
-                path=str(file_path),
-                size=stat.st_size,
-                extension=file_path.suffix,
-                created_time=datetime.fromtimestamp(stat.st_ctime),
-                modified_time=datetime.fromtimestamp(stat.st_mtime),
-                accessed_time=datetime.fromtimestamp(stat.st_atime)
-            )
-            return file_info
-        except OSError:
-            # Fallback for files we can't stat
-            return FileInfo(
-                name=file_path.name,
-                path=str(file_path),
-                size=0,
-                extension=file_path.suffix
-            )
+    @staticmethod
+    def _digest(folder_info: FolderInfo, entries: List[_Entry]) -> str:
+        """Digest of everything the statistics of a folder depend on."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{folder_info.excluded_files}/{folder_info.excluded_folders}".encode())
+        for entry in entries:
+            if isinstance(entry, FileInfo):
+                name, size, mtime = entry.name, entry.size, entry.modified_time
+            else:
+                name, _, stat = entry
+                size, mtime = (stat.st_size, stat.st_mtime) if stat is not None else (0, None)
+                mtime = datetime.fromtimestamp(mtime) if mtime is not None else None
+            digest.update(f"\0f{name}\0{size}\0{mtime}".encode())
+        for subfolder in folder_info.subfolders:
+            digest.update(f"\0d{subfolder.name}\0{subfolder._digest}".encode())  # pylint: disable=protected-access
+        return digest.hexdigest()
+
+    def _roll_up(self, folder_info: FolderInfo, cache: FolderAnalysisCache) -> None:
+        """Compute the statistics of the changed folders, restore them for the others."""
+        for subfolder in folder_info.subfolders:
+            self._roll_up(subfolder, cache)
+        digest = folder_info._digest  # pylint: disable=protected-access
+        if digest is None:  # beyond max_depth
+            folder_info.compute_statistics()
+            return
+        cached = cache.get_folder(folder_info.path, digest)
+        if cached is not None:
+            for key in FOLDER_TOTAL_FIELDS:
+                setattr(folder_info, key, cached[key])
+            folder_info.file_extensions = Counter(cached['file_extensions'])
+            folder_info._file_stats = dict(cached['statistics'])  # pylint: disable=protected-access
+            folder_info._stats_computed = True  # pylint: disable=protected-access
+            return
+        statistics_ = folder_info.compute_statistics()
+        totals: Dict[str, Any] = {key: getattr(folder_info, key) for key in FOLDER_TOTAL_FIELDS}
+        totals['file_extensions'] = dict(folder_info.file_extensions)
+        totals['statistics'] = statistics_
+        cache.put_folder(folder_info.path, digest, totals)
+
+    def _resolve(self, pending: List[Tuple[FolderInfo, List[_Entry]]]) -> None:
+        """Analyze the deferred Python files and add all files to their folders, in directory order."""
+        python_files = [entry for _, entries in pending for entry in entries if not isinstance(entry, FileInfo)]
+        workers = self.max_workers if self.max_workers is not None else (os.cpu_count() or 1)
+        if workers > 1 and len(python_files) >= _PARALLEL_THRESHOLD:
+            workers = min(workers, len(python_files) // (_PARALLEL_THRESHOLD // 2))
+            size = max(1, min(256, len(python_files) // (workers * 4)))
+            batches = [python_files[i:i + size] for i in range(0, len(python_files), size)]
+            with ProcessPoolExecutor(workers) as executor:
+                analyzed = iter([info for batch in executor.map(_file_infos_from_stats, batches) for info in batch])
+        else:
+            analyzed = iter(_file_infos_from_stats(python_files))  # type:ignore
+
+        for folder_info, entries in pending:
+            for i, entry in enumerate(entries):
+                if not isinstance(entry, FileInfo):
+                    _, path, stat = entry
+                    entry = entries[i] = next(analyzed)
+                    if self.cache is not None and stat is not None:
+                        self.cache.put_file(_absolute(path), stat,
+                                            {key: getattr(entry, key) for key in FILE_ANALYSIS_FIELDS})
+                folder_info.add_file(entry)
 
 
 def analyze_folder(folder_path: Union[str, Path], blacklist: Optional[Set[str]] = None,
-                   max_depth: Optional[int] = None) -> FolderInfo:
+                   max_depth: Optional[int] = None,
+                   cache: Optional[Union[str, Path, FolderAnalysisCache]] = None) -> FolderInfo:
     """Convenience function to analyze a folder."""
-    analyzer = FolderAnalyzer(blacklist)
+    analyzer = FolderAnalyzer(blacklist, cache=cache)
     return analyzer.analyze_folder(folder_path, max_depth)
 
 
@@ -1,6 +1,7 @@
 from .packages import *
 from .python_version import *
 from .tracer import *
+from .sampling_profiler import *
 from .os_ import *
 from .callstack import *
 from .get_traceback import *
@@ -1,10 +1,17 @@
-import logging
-import inspect
-from typing import Optional
+import linecache
+import sys
+import time
+from typing import Optional, Dict as Dict
 from types import FrameType
-from ...logging_.utils import get_logger
+from .python_version import get_python_version
 
-logger = get_logger(__name__)
+if get_python_version() >= (3, 9):
+    from builtins import dict as Dict  # type:ignore
+
+# seconds for which a cached source file is trusted before it is checked for changes on disk again
+SOURCE_CHECK_INTERVAL: float = 1.0
+# filename -> monotonic time of the last check of its linecache entry
+_last_checked: Dict[str, float] = {}
 
 
 def _get_prev_frame_from(frame: Optional[FrameType]) -> Optional[FrameType]:
@@ -13,45 +20,56 @@ def _get_prev_frame_from(frame: Optional[FrameType]) -> Optional[FrameType]:
 
 
 def get_current_frame() -> Optional[FrameType]:
-    logger.debug("Getting current frame")
-    frame = _get_prev_frame_from(inspect.currentframe())
-    logger.debug("Current frame: %s", frame)
-    return frame
+    try:
+        return sys._getframe(1)  # pylint: disable=protected-access
+    except ValueError:
+        return None
 
 
 def get_prev_frame(n_steps: int = 1) -> Optional[FrameType]:
-    logger.debug("Getting previous frame with %s steps", n_steps)
-    if (f := get_current_frame()) is None:
-        logger.debug("No current frame available")
+    try:
+        # n_steps frames back from this function's own frame
+        return sys._getframe(max(n_steps, 0))  # pylint: disable=protected-access
+    except ValueError:
         return None
-    i = 0
-    while i < n_steps:
-        if (f := f.f_back) is None:
-            logger.debug("Reached end of call stack at step %s", i)
-            return None
-        i += 1
-    logger.debug("Found previous frame after %s steps", n_steps)
-    return f
+
+
+def get_source_line(filename: str, lineno: int, module_globals: Optional[dict] = None) -> Optional[str]:
+    """a line of a source file through the shared linecache.
+
+    a file is read once and served from memory afterwards, its size and modification time are
+    compared with the cached ones at most every SOURCE_CHECK_INTERVAL seconds.
+
+    Args:
+        filename (str): the file, as in code.co_filename
+        lineno (int): 1 based line number
+        module_globals (Optional[dict], optional): globals of the module, lets linecache ask the module's
+            loader for sources which are not plain files (zip imports for example). Defaults to None.
+
+    Returns:
+        Optional[str]: the line including its line ending, None if it is not available
+    """
+    now = time.monotonic()
+    last = _last_checked.get(filename)
+    if last is None or now - last >= SOURCE_CHECK_INTERVAL:
+        linecache.checkcache(filename)
+        _last_checked[filename] = now
+    line = linecache.getline(filename, lineno, module_globals)
+    return line or None
 
 
 def get_prev_line_of_code(n_steps: int = 1) -> Optional[str]:
-    logger.debug("Getting previous line of code with %s steps", n_steps)
-    frame = get_prev_frame(n_steps + 1)
-    if frame is None:
-        logger.debug("No frame found for line of code")
+    """the line being executed n_steps frames above the caller of this function, n_steps=0 is the calling line"""
+    try:
+        frame = sys._getframe(max(n_steps + 1, 0))  # pylint: disable=protected-access
+    except ValueError:
         return None
-    file = frame.f_back.f_code.co_filename  # type:ignore
-    line_number = frame.f_back.f_lineno - 1  # type:ignore
-    logger.debug("Reading line %s from file: %s", line_number, file)
-    with open(file, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-    line = lines[line_number]
-    logger.debug("Previous line of code: %s", line.strip())
-    return line
+    return get_source_line(frame.f_code.co_filename, frame.f_lineno, frame.f_globals)
 
 
 __all__ = [
     "get_current_frame",
     "get_prev_frame",
-    "get_prev_line_of_code"
+    "get_prev_line_of_code",
+    "get_source_line",
 ]
@@ -0,0 +1,220 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import CodeType, FrameType
+from typing import Dict, Iterable, List, Optional, Tuple as Tuple, Union
+from .python_version import get_python_version
+from ...logging_.utils import get_logger
+
+if get_python_version() >= (3, 9):
+    from builtins import tuple as Tuple  # type:ignore
+
+logger = get_logger(__name__)
+
+
+def _label(code: CodeType) -> str:
+    """the name of a function in the collapsed stack format"""
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+@dataclass
+class CallTreeNode:
+    """A function in a call tree, reached through the path of its ancestors.
+
+    Attributes:
+        code: the function's code object, None for the root
+        self_count: samples in which this function was running
+        total_count: samples in which this function was on the stack below this path
+        children: the functions called from here, by code object
+    """
+    code: Optional[CodeType] = None
+    self_count: int = 0
+    total_count: int = 0
+    children: Dict[CodeType, "CallTreeNode"] = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        return _label(self.code) if self.code is not None else "<root>"
+
+    def child(self, code: CodeType) -> "CallTreeNode":
+        node = self.children.get(code)
+        if node is None:
+            node = self.children[code] = CallTreeNode(code)
+        return node
+
+
+@dataclass
+class FunctionStats:
+    """The samples of a single function, 'total_count' counts a sample once even for recursive calls"""
+    name: str
+    filename: str
+    line: int
+    self_count: int
+    total_count: int
+
+
+class SamplingProfiler:
+    """A statistical profiler: a background thread captures the stacks of the profiled threads
+    every 'interval' seconds through sys._current_frames().
+
+    Identical stacks are only counted while sampling, the call tree, the collapsed stacks and the
+    hot function summary are built from the counts on request.
+    Unlike Tracer the profiled code runs undisturbed between samples, so the overhead is set by the interval.
+    While a profiled thread holds the GIL, samples are taken at most every sys.getswitchinterval() seconds.
+
+    Example:
+        with SamplingProfiler(interval=0.005) as profiler:
+            work()
+        print(profiler.summary(10))
+        with open("out.folded", "w") as f:
+            f.write(profiler.collapsed())  # input for flamegraph.pl / speedscope
+    """
+
+    def __init__(self, interval: float = 0.01, threads: Optional[Iterable[Union[int, threading.Thread]]] = None,
+                 max_depth: Optional[int] = None) -> None:
+        """
+        Args:
+            interval: seconds between two samples
+            threads: the threads, or their idents, to sample. all threads when None
+            max_depth: amount of innermost frames kept per sample, all when None
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if max_depth is not None and max_depth < 1:
+            raise ValueError("max_depth must be at least 1")
+        self.interval = interval
+        self._thread_ids: Optional[set] = {t.ident if isinstance(t, threading.Thread) else t for t in threads} \
+            if threads is not None else None
+        self.max_depth = max_depth
+        # stacks from the outermost to the innermost code object -> amount of samples
+        self._stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("SamplingProfiler is already running")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="danielutils-sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        logger.debug("SamplingProfiler stopped after %s samples", self.samples)
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def reset(self) -> None:
+        """forget the collected samples"""
+        self._stacks = Counter()
+        self.samples = 0
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        interval = self.interval
+        next_sample = time.monotonic() + interval
+        while not self._stop.wait(max(0.0, next_sample - time.monotonic())):
+            self._sample(own_id)
+            # a late sample delays the following ones instead of causing a burst of catch up samples
+            next_sample = max(next_sample + interval, time.monotonic())
+
+    def _sample(self, own_id: int) -> None:
+        thread_ids = self._thread_ids
+        stacks = self._stacks
+        max_depth = self.max_depth
+        for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+            if thread_id == own_id or thread_ids is not None and thread_id not in thread_ids:
+                continue
+            stacks[self._stack_of(frame, max_depth)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _stack_of(frame: Optional[FrameType], max_depth: Optional[int]) -> Tuple[CodeType, ...]:
+        codes: List[CodeType] = []
+        while frame is not None and (max_depth is None or len(codes) < max_depth):
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+        return tuple(codes)
+
+    def call_tree(self) -> CallTreeNode:
+        """
+        Returns:
+            CallTreeNode: the root, its total_count is the amount of samples
+        """
+        root = CallTreeNode()
+        for stack, count in list(self._stacks.items()):
+            root.total_count += count
+            node = root
+            for code in stack:
+                node = node.child(code)
+                node.total_count += count
+            node.self_count += count
+        return root
+
+    def collapsed(self) -> str:
+        """the samples in the collapsed stack format of flame graph tools, one 'outer;...;inner count' per line"""
+        lines = [f"{';'.join(_label(code) for code in stack)} {count}"
+                 for stack, count in sorted(self._stacks.items(), key=lambda item: -item[1]) if stack]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def top(self, n: int = 10, by: str = "self") -> List[FunctionStats]:
+        """
+        Args:
+            n: amount of functions
+            by: "self" or "total"
+
+        Returns:
+            List[FunctionStats]: the n functions with the most samples
+        """
+        if by not in ("self", "total"):
+            raise ValueError("by must be 'self' or 'total'")
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in list(self._stacks.items()):
+            if not stack:
+                continue
+            self_counts[stack[-1]] += count
+            for code in set(stack):
+                total_counts[code] += count
+        ranking = self_counts if by == "self" else total_counts
+        return [
+            FunctionStats(getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno,
+                          self_counts[code], total_counts[code])
+            for code, _ in sorted(ranking.items(), key=lambda item: (-item[1], -total_counts[item[0]]))[:n]
+        ]
+
+    def summary(self, n: int = 10, by: str = "self") -> str:
+        """a table of the n hottest functions, see top()"""
+        samples = max(self.samples, 1)
+        lines = [f"{self.samples} samples every {self.interval * 1000:g}ms",
+                 f"{'self %':>7} {'total %':>7}  function"]
+        for stats in self.top(n, by):
+            lines.append(f"{stats.self_count / samples * 100:>7.1f} {stats.total_count / samples * 100:>7.1f}  "
+                         f"{stats.name} ({stats.filename}:{stats.line})")
+        return "\n".join(lines)
+
+
+__all__ = [
+    "SamplingProfiler",
+    "CallTreeNode",
+    "FunctionStats",
+]
@@ -1,12 +1,43 @@
 import sys
+import threading
 from abc import ABC, abstractmethod
+from collections import Counter
+from operator import itemgetter
 from enum import Enum
-from types import FrameType
-from typing import Any, Callable, Optional, Set as Set, Dict as Dict
+from types import FrameType, CodeType, BuiltinFunctionType, MethodDescriptorType
+from typing import Any, Callable, Optional, Set as Set, Dict as Dict, List as List, Tuple as Tuple, Iterable, \
+    Union, TextIO
 from .python_version import get_python_version
 
 if get_python_version() >= (3, 9):
-    from builtins import set as Set, dict as Dict
+    from builtins import set as Set, dict as Dict, list as List, tuple as Tuple
+
+# sys.monitoring exists from Python 3.12
+HAS_MONITORING: bool = hasattr(sys, "monitoring")
+
+# tried in order, the first one no other tool uses is taken
+_TOOL_IDS = (2, 3, 4, 5)  # sys.monitoring.PROFILER_ID and the ids without a designated use
+_TOOL_NAME = "danielutils.Tracer"
+# callables which cause 'c_call' and 'c_return' events, like sys.setprofile reports them
+_C_FUNCTION_TYPES = (BuiltinFunctionType, MethodDescriptorType)
+
+
+class _BufferedFrame:
+    """stands in for the frame of a buffered event, which is no longer running when the event is handled"""
+    __slots__ = ("f_code",)
+
+    def __init__(self, code: CodeType) -> None:
+        self.f_code = code
+
+
+def _code_of(obj: Union[Callable, CodeType]) -> CodeType:
+    if isinstance(obj, CodeType):
+        return obj
+    obj = getattr(obj, "__func__", obj)
+    code = getattr(obj, "__code__", None)
+    if not isinstance(code, CodeType):
+        raise TypeError(f"{obj!r} is neither a code object nor a Python function")
+    return code
 
 
 # from danielutils import singleton
@@ -14,6 +45,14 @@ if get_python_version() >= (3, 9):
 class Tracer(ABC):
     """
     A class to trace (during runtime) the flow of the currently executing code
+
+    On Python 3.12+ the events are received through sys.monitoring, subscribed to only for the event kinds
+    which are not skipped and, when 'code' is given, only for those code objects.
+    Older versions, or backend="setprofile", use a sys.setprofile callback which receives every event.
+    Only the thread which started tracing is traced.
+
+    With buffer_size > 0 the events are recorded on the hot path and handled in batches of buffer_size
+    (and by flush()/stop_tracing()), the frame passed to parse_event then only has 'f_code'.
     """
     _INSTANCE = None
 
@@ -47,9 +86,24 @@ class Tracer(ABC):
             instance_methods: bool = True,
             static_methods: bool = True,
             class_methods: bool = True,
-            exclude: Optional[Set[str]] = None
+            exclude: Optional[Set[str]] = None,
+            backend: str = "auto",
+            code: Optional[Iterable[Union[Callable, CodeType]]] = None,
+            buffer_size: int = 0
     ) -> None:
-
+        """
+        Args:
+            exclude: qualified names of functions which are skipped, together with everything they call
+            backend: "monitoring", "setprofile" or "auto" for sys.monitoring when it is available
+            code: functions or code objects to trace, all code when None
+            buffer_size: amount of events to record before handling them, 0 handles every event immediately
+        """
+        if backend not in ("auto", "monitoring", "setprofile"):
+            raise ValueError(f"Unknown backend {backend!r}")
+        if backend == "monitoring" and not HAS_MONITORING:
+            raise ValueError("The monitoring backend requires Python 3.12+")
+        if buffer_size < 0:
+            raise ValueError("buffer_size must not be negative")
         self._call_dict: Dict[Tracer.EventType, Callable] = {
             Tracer.EventType.CALL: self.on_call,
             Tracer.EventType.C_CALL: self.on_call_c,
@@ -60,43 +114,75 @@ class Tracer(ABC):
         self._skip_return = skip_return
         self._skip_c_call = skip_c_call
         self._skip_c_return = skip_c_return
+        self._skipped: Set[Tracer.EventType] = {
+            et for et, skip in ((Tracer.EventType.CALL, skip_call), (Tracer.EventType.RETURN, skip_return),
+                                (Tracer.EventType.C_CALL, skip_c_call), (Tracer.EventType.C_RETURN, skip_c_return))
+            if skip
+        }
         self._functions = functions
         self._classes = classes
         self._instance_methods = instance_methods
         self._static_methods = static_methods
         self._class_methods = class_methods
         self._exclude = exclude if exclude is not None else set()
-        from ...data_structures import Stack
-        self._exclude_stack: Stack[str] = Stack()
+        # nesting depth inside an excluded function
+        self._exclude_depth = 0
+        self.backend = "monitoring" if backend == "auto" and HAS_MONITORING else \
+            "setprofile" if backend == "auto" else backend
+        self._codes: Optional[Set[CodeType]] = {_code_of(obj) for obj in code} if code is not None else None
+        self._buffer_size = buffer_size
+        # buffered events hold the event's value, which hashes faster than the EventType
+        self._buffer: Optional[List[Tuple[str, CodeType, Any]]] = [] if buffer_size else None
+        self._tool_id: Optional[int] = None
 
     def _handler(self, stack_frame: FrameType, event_type: str, return_value: Optional[Any]):
-        et = Tracer.EventType.from_value(event_type)
-        if not self._should_skip(et, stack_frame):
-            values = self.parse_event(stack_frame, et, return_value)
-            self._call_dict[et](*values)
+        et = _EVENT_TYPES[event_type]
+        code = stack_frame.f_code
+        if (self._codes is None or code in self._codes) and not self._should_skip(et, code):
+            if self._buffer is not None:
+                self._record(event_type, code, return_value)
+            else:
+                self._dispatch(et, stack_frame, return_value)
         return self._handler
 
-    def _should_skip(self, et: 'Tracer.EventType', frame: FrameType) -> bool:
-        func_name = frame.f_code.co_qualname
-
-        if not self._exclude_stack.is_empty():
-            if et in {Tracer.EventType.CALL, Tracer.EventType.C_CALL}:
-                self._exclude_stack.push(func_name)
+    def _should_skip(self, et: 'Tracer.EventType', code: CodeType) -> bool:
+        if self._exclude_depth:
+            if et is Tracer.EventType.CALL or et is Tracer.EventType.C_CALL:
+                self._exclude_depth += 1
             else:
-                self._exclude_stack.pop()
+                self._exclude_depth -= 1
             return True
-        if func_name in self._exclude:
-            self._exclude_stack.push(func_name)
-            return True
-
-        if et == Tracer.EventType.CALL and self._skip_call or \
-                et == Tracer.EventType.RETURN and self._skip_return or \
-                et == Tracer.EventType.C_CALL and self._skip_c_call or \
-                et == Tracer.EventType.C_RETURN and self._skip_c_return:
+        if self._exclude and code.co_qualname in self._exclude:
+            if et is Tracer.EventType.CALL or et is Tracer.EventType.C_CALL:
+                self._exclude_depth = 1
             return True
 
         # TODO add more cases
-        return False
+        return et in self._skipped
+
+    def _record(self, event: str, code: CodeType, value: Optional[Any]) -> None:
+        buffer = self._buffer
+        buffer.append((event, code, value))  # type:ignore
+        if len(buffer) >= self._buffer_size:  # type:ignore
+            self.flush()
+
+    def _dispatch(self, et: 'Tracer.EventType', frame: Any, value: Optional[Any]) -> None:
+        values = self.parse_event(frame, et, value)
+        self._call_dict[et](*values)
+
+    def _drain(self) -> List[Tuple[str, CodeType, Any]]:
+        buffer = self._buffer
+        if not buffer:
+            return []
+        # emptied in place, the monitoring callbacks hold on to the list
+        events = buffer.copy()
+        buffer.clear()
+        return events
+
+    def flush(self) -> None:
+        """handle the buffered events"""
+        for event, code, value in self._drain():
+            self._dispatch(_EVENT_TYPES[event], _BufferedFrame(code), value)
 
     def __enter__(self):
         if Tracer._INSTANCE is not None:
@@ -110,10 +196,151 @@ class Tracer(ABC):
         self.stop_tracing()
 
     def start_tracing(self) -> None:
-        sys.setprofile(self._handler)
+        self._exclude_depth = 0
+        if self.backend == "monitoring":
+            self._start_monitoring()
+        else:
+            sys.setprofile(self._handler)
 
     def stop_tracing(self) -> None:
-        sys.setprofile(None)
+        if self.backend == "monitoring":
+            self._stop_monitoring()
+        else:
+            sys.setprofile(None)
+        self.flush()
+
+    def _monitoring_callbacks(self) -> Dict[int, Callable]:
+        """the sys.monitoring callbacks of the event kinds which are needed, by event id"""
+        events = sys.monitoring.events  # type:ignore  # pylint: disable=no-member
+        et = Tracer.EventType
+        thread_id = threading.get_ident()
+        get_ident = threading.get_ident
+        get_frame = sys._getframe  # pylint: disable=protected-access
+        codes = self._codes
+        trace_c_call = not self._skip_c_call
+
+        if self._buffer is not None and not self._exclude:
+            # the common case is recorded right in the callbacks, every extra call is felt on the hot path
+            buffer = self._buffer
+            append = buffer.append
+            size = self._buffer_size
+            flush = self.flush
+            call_event, return_event, c_call_event, c_return_event = \
+                et.CALL.value, et.RETURN.value, et.C_CALL.value, et.C_RETURN.value
+
+            def on_start(code, offset):  # pylint: disable=unused-argument
+                if get_ident() == thread_id:
+                    append((call_event, code, None))
+                    if len(buffer) >= size:
+                        flush()
+
+            def on_return(code, offset, value):  # pylint: disable=unused-argument
+                if get_ident() == thread_id:
+                    append((return_event, code, value))
+                    if len(buffer) >= size:
+                        flush()
+
+            def on_c_call(code, offset, callable_, arg0):  # pylint: disable=unused-argument
+                if trace_c_call and get_ident() == thread_id and isinstance(callable_, _C_FUNCTION_TYPES):
+                    append((c_call_event, code, callable_))
+                    if len(buffer) >= size:
+                        flush()
+
+            def on_c_return(code, offset, callable_, arg0):  # pylint: disable=unused-argument
+                if get_ident() == thread_id and isinstance(callable_, _C_FUNCTION_TYPES):
+                    append((c_return_event, code, callable_))
+                    if len(buffer) >= size:
+                        flush()
+        else:
+            should_skip = self._should_skip
+            record = self._record if self._buffer is not None else None
+            dispatch = self._dispatch
+
+            def handle(event_type: Tracer.EventType, code: CodeType, value: Optional[Any]) -> None:
+                if get_ident() != thread_id or should_skip(event_type, code):
+                    return
+                if record is not None:
+                    record(event_type.value, code, value)
+                else:
+                    # frames: 0 is handle, then the callbacks and then the monitored code
+                    frame = get_frame(2)
+                    while frame.f_code is not code:
+                        frame = frame.f_back
+                    dispatch(event_type, frame, value)
+
+            def on_start(code, offset):  # pylint: disable=unused-argument
+                handle(et.CALL, code, None)
+
+            def on_return(code, offset, value):  # pylint: disable=unused-argument
+                handle(et.RETURN, code, value)
+
+            def on_c_call(code, offset, callable_, arg0):  # pylint: disable=unused-argument
+                if isinstance(callable_, _C_FUNCTION_TYPES):
+                    handle(et.C_CALL, code, callable_)
+
+            def on_c_return(code, offset, callable_, arg0):  # pylint: disable=unused-argument
+                if isinstance(callable_, _C_FUNCTION_TYPES):
+                    handle(et.C_RETURN, code, callable_)
+
+        # PY_THROW and PY_UNWIND can only be monitored globally, so they filter the code objects themselves
+        def on_throw(code, offset, exception):  # pylint: disable=unused-argument
+            if codes is None or code in codes:
+                on_start(code, offset)
+
+        def on_unwind(code, offset, exception):  # pylint: disable=unused-argument
+            if codes is None or code in codes:
+                on_return(code, offset, None)
+
+        # an excluded function is tracked from its call to its return, whatever kinds are skipped
+        need_python = bool(self._exclude)
+        need_c = bool(self._exclude) and not (self._skip_c_call and self._skip_c_return)
+        callbacks: Dict[int, Callable] = {}
+        if need_python or not self._skip_call:
+            callbacks.update({events.PY_START: on_start, events.PY_RESUME: on_start, events.PY_THROW: on_throw})
+        if need_python or not self._skip_return:
+            callbacks.update({events.PY_RETURN: on_return, events.PY_YIELD: on_return, events.PY_UNWIND: on_unwind})
+        if need_c or not self._skip_c_call or not self._skip_c_return:
+            # C_RETURN and C_RAISE are only reported while CALL is monitored
+            callbacks[events.CALL] = on_c_call
+        if need_c or not self._skip_c_return:
+            callbacks.update({events.C_RETURN: on_c_return, events.C_RAISE: on_c_return})
+        return callbacks
+
+    def _start_monitoring(self) -> None:
+        monitoring = sys.monitoring  # type:ignore  # pylint: disable=no-member
+        events = monitoring.events
+        tool_id = next((i for i in _TOOL_IDS if monitoring.get_tool(i) is None), None)
+        if tool_id is None:
+            raise RuntimeError("All sys.monitoring tool ids are in use")
+        monitoring.use_tool_id(tool_id, _TOOL_NAME)
+        self._tool_id = tool_id
+        callbacks = self._monitoring_callbacks()
+        for event, callback in callbacks.items():
+            monitoring.register_callback(tool_id, event, callback)
+        # C_RETURN and C_RAISE can not be set, they come with CALL
+        mask = 0
+        for event in callbacks:
+            if event not in (events.C_RETURN, events.C_RAISE):
+                mask |= event
+        if self._codes is None:
+            monitoring.set_events(tool_id, mask)
+            return
+        global_mask = mask & (events.PY_THROW | events.PY_UNWIND)
+        monitoring.set_events(tool_id, global_mask)
+        for code in self._codes:
+            monitoring.set_local_events(tool_id, code, mask & ~global_mask)
+
+    def _stop_monitoring(self) -> None:
+        if self._tool_id is None:
+            return
+        monitoring = sys.monitoring  # type:ignore  # pylint: disable=no-member
+        tool_id, self._tool_id = self._tool_id, None
+        monitoring.set_events(tool_id, 0)
+        for code in self._codes or ():
+            monitoring.set_local_events(tool_id, code, 0)
+        for event in self._monitoring_callbacks():
+            monitoring.register_callback(tool_id, event, None)
+        monitoring.free_tool_id(tool_id)
 
     @abstractmethod
     def parse_event(self, frame: FrameType, et: EventType, return_value: Optional[Any]) -> tuple:
@@ -144,9 +371,18 @@ class Tracer(ABC):
         """
 
 
+_EVENT_TYPES: Dict[str, Tracer.EventType] = {et.value: et for et in Tracer.EventType}
+_EVENT_AND_CODE = itemgetter(0, 1)
+_C_EVENTS = (Tracer.EventType.C_CALL.value, Tracer.EventType.C_RETURN.value)
+
+
 class ConsoleTracer(Tracer):
-    # def __init__(self, *args, **kwargs) -> None:
-    #     super().__init__(*args, **kwargs)
+    """prints the events, with buffer_size > 0 they are printed in batches instead of one by one"""
+
+    def __init__(self, *, file: Optional[TextIO] = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._file = file
+        self._lines: List[str] = []
 
     def parse_event(self, frame: FrameType, event_type: Tracer.EventType, return_value: Optional[Any]) -> tuple:
         func_name: str = frame.f_code.co_qualname
@@ -156,20 +392,88 @@ class ConsoleTracer(Tracer):
             final = *base, return_value
         return final
 
+    def _print(self, *args, **kwargs) -> None:
+        if self._buffer_size:
+            self._lines.append(" ".join(map(str, args)))
+        else:
+            print(*args, file=self._file, **kwargs)
+
+    def flush(self) -> None:
+        super().flush()
+        if self._lines:
+            lines, self._lines = self._lines, []
+            (self._file or sys.stdout).write("\n".join(lines) + "\n")
+
+    def on_call(self, *args, **kwargs) -> None:
+        self._print(*args, **kwargs)
+
+    def on_call_c(self, *args, **kwargs) -> None:
+        self._print(*args, **kwargs)
+
+    def on_return(self, *args, **kwargs) -> None:
+        self._print(*args, **kwargs)
+
+    def on_return_c(self, *args, **kwargs) -> None:
+        self._print(*args, **kwargs)
+
+
+class AggregatingTracer(Tracer):
+    """Counts the events per function instead of handling them one by one, cheap enough to leave on.
+
+    The events are buffered (buffer_size defaults to 4096) and counted in batches by code object,
+    'counts' maps (Tracer.EventType, qualified name) to the amount of events, C events count the C function.
+    """
+
+    def __init__(self, *, buffer_size: int = 4096, **kwargs) -> None:
+        super().__init__(buffer_size=buffer_size, **kwargs)
+        # (event, code object or C function) -> amount
+        self._raw: Counter = Counter()
+
+    @property
+    def counts(self) -> Counter:
+        """the counted events by (Tracer.EventType, qualified name), without the events not flushed yet"""
+        counts: Counter = Counter()
+        for (event, obj), amount in self._raw.items():
+            name = obj.co_qualname if isinstance(obj, CodeType) else getattr(obj, "__qualname__", None) or repr(obj)
+            counts[(_EVENT_TYPES[event], name)] += amount
+        return counts
+
+    def flush(self) -> None:
+        events = self._drain()
+        if Tracer.EventType.C_CALL in self._skipped and Tracer.EventType.C_RETURN in self._skipped:
+            self._raw.update(map(_EVENT_AND_CODE, events))
+        else:
+            self._raw.update(self._key(event, code, value) for event, code, value in events)
+
+    @staticmethod
+    def _key(event: str, code: CodeType, value: Optional[Any]) -> tuple:
+        if event in _C_EVENTS:
+            # the code is the caller's, the value is the C function
+            return event, value
+        return event, code
+
+    def parse_event(self, frame: FrameType, et: Tracer.EventType, return_value: Optional[Any]) -> tuple:
+        return self._key(et.value, frame.f_code, return_value)
+
+    def _count(self, event: str, obj: Any) -> None:
+        self._raw[(event, obj)] += 1
+
     def on_call(self, *args, **kwargs) -> None:
-        print(*args, **kwargs)
+        self._count(*args)
 
     def on_call_c(self, *args, **kwargs) -> None:
-        print(*args, **kwargs)
+        self._count(*args)
 
     def on_return(self, *args, **kwargs) -> None:
-        print(*args, **kwargs)
+        self._count(*args)
 
     def on_return_c(self, *args, **kwargs) -> None:
-        print(*args, **kwargs)
+        self._count(*args)
 
 
 __all__ = [
     "Tracer",
-    "ConsoleTracer"
+    "ConsoleTracer",
+    "AggregatingTracer",
+    "HAS_MONITORING",
 ]
@@ -1,3 +1,5 @@
 from .backoff_strategies import *
 from .backoff_strategy import *
+from .circuit_breaker import *
+from .retry_budget import *
 from .retry_executor import *
@@ -3,4 +3,5 @@ from .constant_backoff import *
 from .exponential_backoff import *
 from .linear_backoff import *
 from .multiplicative_backoff import *
-from .functional_backoff import *
\ No newline at end of file
+from .functional_backoff import *
+from .jitter_backoff import *
\ No newline at end of file
@@ -0,0 +1,56 @@
+import logging
+import random
+from ..backoff_strategy import BackOffStrategy
+from ...logging_.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class FullJitterBackOffStrategy(BackOffStrategy):
+    """
+    will back off a uniformly random amount of time between 0 and the backoff of the wrapped strategy,
+    so that clients which failed together do not retry together
+
+    :param strategy: the strategy deciding the upper bound of every backoff
+    """
+
+    def __init__(self, strategy: BackOffStrategy) -> None:
+        logger.debug("Initializing FullJitterBackOffStrategy over %s", type(strategy).__name__)
+
+        def inner() -> float:
+            return random.uniform(0, strategy.get_backoff())
+
+        super().__init__(inner)
+
+
+class DecorrelatedJitterBackOffStrategy(BackOffStrategy):
+    """
+    will back off a random amount of time between 'base' and 'multiplier' times the previous backoff,
+    capped at 'cap'. grows roughly exponentially while keeping clients spread apart
+
+    :param base: The minimal amount of milliseconds to sleep
+    :param cap: The maximal amount of milliseconds to sleep
+    :param multiplier: The growth factor of the upper bound
+    """
+
+    def __init__(self, base: float, cap: float, multiplier: float = 3.0) -> None:
+        if not base > 0:
+            logger.error("Invalid base value: %s - must be positive", base)
+            raise ValueError("base must be positive")
+        if not cap >= base:
+            logger.error("Invalid cap value: %s - must be at least base", cap)
+            raise ValueError("cap must be at least base")
+        previous = float(base)
+
+        def inner() -> float:
+            nonlocal previous
+            previous = min(cap, random.uniform(base, previous * multiplier))
+            return previous
+
+        super().__init__(inner)
+
+
+__all__ = [
+    "FullJitterBackOffStrategy",
+    "DecorrelatedJitterBackOffStrategy",
+]
@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Optional
+from ..logging_.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling a dependency while its circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency and periodically probes whether it recovered.
+
+    * closed - calls are allowed, their outcomes are kept in a sliding window of the last 'window_size' calls.
+      once at least 'minimum_calls' were recorded and the failure rate reaches 'failure_rate_threshold'
+      the breaker opens.
+    * open - calls are rejected immediately. after 'open_duration' seconds the breaker becomes half open.
+    * half open - up to 'half_open_max_calls' probe calls are allowed. if all of them succeed the breaker closes,
+      the first failure opens it again.
+
+    A single breaker may be shared by threads and asyncio tasks of many executors.
+    Every state change starts a new generation, a call granted in an earlier generation
+    does not affect the current one when its outcome is recorded late.
+
+    Usage:
+        breaker = CircuitBreaker()
+        generation = breaker.try_acquire()
+        if generation is not None:
+            try:
+                call_dependency()
+            except Exception:
+                breaker.record_failure(generation)
+            else:
+                breaker.record_success(generation)
+
+    :param failure_rate_threshold: fraction of failed calls in the window which opens the breaker
+    :param window_size: amount of most recent calls the failure rate is computed over
+    :param minimum_calls: amount of recorded calls required before the failure rate is considered
+    :param open_duration: seconds the breaker stays open before allowing probe calls
+    :param half_open_max_calls: amount of probe calls allowed while half open
+    """
+
+    def __init__(self, failure_rate_threshold: float = 0.5, window_size: int = 20, minimum_calls: int = 10,
+                 open_duration: float = 30.0, half_open_max_calls: int = 1) -> None:
+        if not 0 < failure_rate_threshold <= 1:
+            logger.error("Invalid failure_rate_threshold value: %s - must be in (0, 1]", failure_rate_threshold)
+            raise ValueError("failure_rate_threshold must be in (0, 1]")
+        if window_size < 1 or not 1 <= minimum_calls <= window_size:
+            logger.error("Invalid window_size=%s, minimum_calls=%s", window_size, minimum_calls)
+            raise ValueError("minimum_calls must be between 1 and window_size")
+        if open_duration < 0:
+            logger.error("Invalid open_duration value: %s - must not be negative", open_duration)
+            raise ValueError("open_duration must not be negative")
+        if half_open_max_calls < 1:
+            logger.error("Invalid half_open_max_calls value: %s - must be at least 1", half_open_max_calls)
+            raise ValueError("half_open_max_calls must be at least 1")
+        self._threshold = failure_rate_threshold
+        self._minimum_calls = minimum_calls
+        self._open_duration = open_duration
+        self._half_open_max_calls = half_open_max_calls
+        self._window: Deque[bool] = deque(maxlen=window_size)
+        self._failures = 0
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._generation = 1
+        self._lock = threading.Lock()
+        logger.debug("CircuitBreaker initialized with failure_rate_threshold=%s, window_size=%s, minimum_calls=%s, "
+                     "open_duration=%s, half_open_max_calls=%s", failure_rate_threshold, window_size, minimum_calls,
+                     open_duration, half_open_max_calls)
+
+    @property
+    def state(self) -> CircuitState:
+        """the current state of the breaker"""
+        with self._lock:
+            self._update()
+            return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        """the fraction of failed calls in the sliding window"""
+        with self._lock:
+            return self._failures / len(self._window) if self._window else 0.0
+
+    def _update(self) -> None:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self._open_duration:
+            logger.info("Circuit breaker half open, allowing %s probe calls", self._half_open_max_calls)
+            self._state = CircuitState.HALF_OPEN
+            self._generation += 1
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+
+    def _transition(self, state: CircuitState) -> None:
+        if state == CircuitState.OPEN:
+            logger.warning("Circuit breaker opened (failure rate %.2f)",
+                           self._failures / len(self._window) if self._window else 1.0)
+            self._opened_at = time.monotonic()
+        else:
+            logger.info("Circuit breaker closed")
+        self._state = state
+        self._generation += 1
+        self._window.clear()
+        self._failures = 0
+
+    def try_acquire(self) -> Optional[int]:
+        """
+        Ask for permission to make a call, every granted call must be followed by
+        record_success(), record_failure() or release() with the returned generation.
+
+        :return: the generation the call was granted in, None if the call is not allowed
+        """
+        with self._lock:
+            self._update()
+            if self._state == CircuitState.CLOSED:
+                return self._generation
+            if self._state == CircuitState.HALF_OPEN and self._probes_in_flight + self._probe_successes \
+                    < self._half_open_max_calls:
+                self._probes_in_flight += 1
+                return self._generation
+            return None
+
+    def _is_stale(self, generation: Optional[int]) -> bool:
+        if generation is None or generation == self._generation:
+            return False
+        logger.debug("Ignoring the outcome of a call granted in generation %s, now in %s", generation,
+                     self._generation)
+        return True
+
+    def _record(self, failed: bool) -> None:
+        if len(self._window) == self._window.maxlen and self._window[0]:
+            self._failures -= 1
+        self._window.append(failed)
+        self._failures += failed
+
+    def record_success(self, generation: Optional[int] = None) -> None:
+        """
+        Record that a granted call succeeded.
+
+        :param generation: the value try_acquire() returned for the call, None for the current generation
+        """
+        with self._lock:
+            if self._is_stale(generation):
+                return
+            if self._state == CircuitState.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._probe_successes += 1
+                if self._probe_successes >= self._half_open_max_calls:
+                    self._transition(CircuitState.CLOSED)
+            elif self._state == CircuitState.CLOSED:
+                self._record(False)
+
+    def record_failure(self, generation: Optional[int] = None) -> None:
+        """
+        Record that a granted call failed.
+
+        :param generation: the value try_acquire() returned for the call, None for the current generation
+        """
+        with self._lock:
+            if self._is_stale(generation):
+                return
+            if self._state == CircuitState.HALF_OPEN:
+                self._transition(CircuitState.OPEN)
+            elif self._state == CircuitState.CLOSED:
+                self._record(True)
+                if len(self._window) >= self._minimum_calls and \
+                        self._failures / len(self._window) >= self._threshold:
+                    self._transition(CircuitState.OPEN)
+
+    def release(self, generation: Optional[int] = None) -> None:
+        """
+        Give back a granted call without an outcome, for example when it was cancelled.
+
+        :param generation: the value try_acquire() returned for the call, None for the current generation
+        """
+        with self._lock:
+            if self._is_stale(generation):
+                return
+            if self._state == CircuitState.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+
+__all__ = [
+    "CircuitState",
+    "CircuitOpenError",
+    "CircuitBreaker",
+]
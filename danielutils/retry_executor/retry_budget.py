@@ -0,0 +1,79 @@
+import threading
+import time
+from ..logging_.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class RetryBudget:
+    """
+    A token bucket limiting retries to a fraction of first attempts, shared between executors.
+
+    every first attempt deposits 'ratio' tokens and every retry withdraws one whole token,
+    so over time at most 'ratio' retries are made per first attempt. a small reserve refilled
+    at 'min_retries_per_second' lets rarely called operations still retry.
+    when a dependency is overloaded and most calls fail the budget runs dry and retries stop,
+    instead of multiplying the load on it by the number of allowed attempts.
+
+    :param ratio: maximum retries per first attempt
+    :param min_retries_per_second: retries allowed regardless of the ratio
+    :param max_tokens: capacity of the bucket, bounds the burst of retries after a quiet period
+    """
+
+    def __init__(self, ratio: float = 0.1, min_retries_per_second: float = 1.0, max_tokens: float = 10.0) -> None:
+        if ratio < 0:
+            logger.error("Invalid ratio value: %s - must not be negative", ratio)
+            raise ValueError("ratio must not be negative")
+        if min_retries_per_second < 0:
+            logger.error("Invalid min_retries_per_second value: %s - must not be negative", min_retries_per_second)
+            raise ValueError("min_retries_per_second must not be negative")
+        if max_tokens < 1:
+            logger.error("Invalid max_tokens value: %s - must be at least 1", max_tokens)
+            raise ValueError("max_tokens must be at least 1")
+        self._ratio = ratio
+        self._refill_rate = min_retries_per_second
+        self._max_tokens = float(max_tokens)
+        self._tokens = float(max_tokens)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        logger.debug("RetryBudget initialized with ratio=%s, min_retries_per_second=%s, max_tokens=%s",
+                     ratio, min_retries_per_second, max_tokens)
+
+    @property
+    def tokens(self) -> float:
+        """the amount of retries currently available"""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._max_tokens, self._tokens + (now - self._last_refill) * self._refill_rate)
+        self._last_refill = now
+
+    def record_attempt(self) -> None:
+        """
+        Deposit the tokens earned by a first attempt.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._max_tokens, self._tokens + self._ratio)
+
+    def try_acquire_retry(self) -> bool:
+        """
+        Withdraw a token for a retry.
+
+        :return: whether the retry is allowed
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                logger.warning("Retry budget exhausted (%.2f tokens left)", self._tokens)
+                return False
+            self._tokens -= 1
+            return True
+
+
+__all__ = [
+    "RetryBudget",
+]
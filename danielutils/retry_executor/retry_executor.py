@@ -6,6 +6,8 @@ from ..aliases import Supplier, Consumer
 from .backoff_strategies import ConstantBackOffStrategy
 
 from .backoff_strategy import BackOffStrategy
+from .circuit_breaker import CircuitBreaker
+from .retry_budget import RetryBudget
 from ..logging_.utils import get_logger
 
 T = TypeVar("T")
@@ -14,8 +16,19 @@ logger = get_logger(__name__)
 
 
 class RetryExecutor(Generic[T]):
-    def __init__(self, backoff_strategy: BackOffStrategy = ConstantBackOffStrategy(200)) -> None:
+    def __init__(self, backoff_strategy: BackOffStrategy = ConstantBackOffStrategy(200),
+                 retry_budget: Optional[RetryBudget] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None) -> None:
+        """
+        :param backoff_strategy: decides how long to sleep between attempts
+        :param retry_budget: an optional budget, possibly shared with other executors, which every retry draws from
+        :param circuit_breaker: an optional breaker, possibly shared with other executors, which every attempt
+            must pass. while it is open execute() gives up without calling supp and returns None, like for every
+            other reason to give up. AsyncRetryExecutor raises CircuitOpenError instead
+        """
         self._backoff_strategy = backoff_strategy
+        self._retry_budget = retry_budget
+        self._circuit_breaker = circuit_breaker
         logger.info("RetryExecutor initialized with backoff strategy: %s", type(backoff_strategy).__name__)
 
     def __enter__(self):
@@ -26,29 +39,60 @@ class RetryExecutor(Generic[T]):
             logger.warning("RetryExecutor context exited with exception: %s: %s", exc_type.__name__, exc_val)
 
     def execute(self, supp: Supplier[T], max_retries: int = 5,
-                exception_callback: Optional[Consumer[Exception]] = None) -> Optional[T]:
-        logger.info("Starting retry execution with max_retries=%s", max_retries)
-        
+                exception_callback: Optional[Consumer[Exception]] = None,
+                deadline: Optional[float] = None) -> Optional[T]:
+        """
+        Call supp until it succeeds.
+
+        :param supp: the function to call
+        :param max_retries: maximal amount of attempts
+        :param exception_callback: called with the exception of every failed attempt
+        :param deadline: seconds from now after which no further attempt is started,
+            a backoff which would end after the deadline is not slept
+        :return: the result of supp or None if all allowed attempts failed or the circuit breaker is open
+        """
+        logger.info("Starting retry execution with max_retries=%s, deadline=%s", max_retries, deadline)
+        end = time.monotonic() + deadline if deadline is not None else None
+        if self._retry_budget is not None:
+            self._retry_budget.record_attempt()
+
+        breaker = self._circuit_breaker
         for i in range(max_retries):
+            generation = breaker.try_acquire() if breaker is not None else None
+            if breaker is not None and generation is None:
+                logger.error("Circuit breaker is open, giving up after %s attempts", i)
+                return None
             try:
                 result = supp()
-                logger.info("Execution succeeded on attempt %s", i + 1)
-                return result
             except Exception as e:
+                if breaker is not None:
+                    breaker.record_failure(generation)
                 logger.warning("Attempt %s failed with %s: %s", i + 1, type(e).__name__, e)
                 if exception_callback:
                     exception_callback(e)
+            except BaseException:
+                if breaker is not None:
+                    breaker.release(generation)
+                raise
+            else:
+                if breaker is not None:
+                    breaker.record_success(generation)
+                logger.info("Execution succeeded on attempt %s", i + 1)
+                return result
 
             if i != max_retries - 1:
-                self._sleep()
-        
+                backoff_time = self._backoff_strategy.get_backoff() / 1000
+                if end is not None and time.monotonic() + backoff_time >= end:
+                    logger.error("Deadline of %ss reached after %s attempts", deadline, i + 1)
+                    return None
+                if self._retry_budget is not None and not self._retry_budget.try_acquire_retry():
+                    logger.error("Retry budget exhausted after %s attempts", i + 1)
+                    return None
+                time.sleep(backoff_time)
+
         logger.error("All %s attempts failed", max_retries)
         return None
 
-    def _sleep(self) -> None:
-        backoff_time = self._backoff_strategy.get_backoff() / 1000
-        time.sleep(backoff_time)
-
 
 __all__ = [
     "RetryExecutor",
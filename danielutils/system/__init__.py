@@ -1,3 +1,4 @@
 from .independent import *
 from .windows import *
 from .layered_command import *
+from .shell_session import *
@@ -1,11 +1,15 @@
 import logging
-from typing import IO, Optional, cast, Union, Generator, Tuple as Tuple, List as List
+from typing import IO, Dict, Optional, cast, Union, Generator, Tuple as Tuple, List as List
 from pathlib import Path
+import os
+import queue
+import selectors
 import subprocess
+import sys
+import threading
 import time
-from ..decorators import timeout, validate
+from ..decorators import validate
 from ..conversions import str_to_bytes
-from ..generators import join_generators, generator_from_stream
 from ..reflection import get_python_version
 from ..logging_.utils import get_logger
 
@@ -69,93 +73,182 @@ def __acm_write(*args, p: subprocess.Popen, sep=" ", end="\n") -> None:
     p.stdin.flush()
 
 
+class _PipeMultiplexer:
+    """reads several pipes from the calling thread.
+
+    on POSIX the pipes are switched to non-blocking mode and multiplexed with selectors,
+    so no helper threads are used. selectors do not support pipes on Windows,
+    where a daemon thread per pipe feeds a shared queue instead.
+    """
+    _READ_SIZE = 1 << 16
+
+    def __init__(self, *streams: IO[bytes]) -> None:
+        self._ids: Dict[int, int] = {}
+        self._partial: Dict[int, bytes] = {}
+        self._open = 0
+        self._queue: Optional[queue.Queue] = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        if sys.platform == "win32":
+            self._queue = queue.Queue()
+            for stream_id, stream in enumerate(streams):
+                threading.Thread(target=self._pump, args=(stream_id, stream), daemon=True).start()
+        else:
+            self._selector = selectors.DefaultSelector()
+            for stream_id, stream in enumerate(streams):
+                fd = stream.fileno()
+                os.set_blocking(fd, False)
+                self._selector.register(fd, selectors.EVENT_READ)
+                self._ids[fd] = stream_id
+        for stream_id in range(len(streams)):
+            self._partial[stream_id] = b""
+        self._open = len(streams)
+
+    @property
+    def exhausted(self) -> bool:
+        """whether all pipes reached EOF"""
+        return self._open == 0
+
+    def _pump(self, stream_id: int, stream: IO[bytes]) -> None:
+        try:
+            while True:
+                data = stream.read1(self._READ_SIZE)  # type:ignore
+                if not data:
+                    break
+                self._queue.put((stream_id, data))  # type:ignore
+        except (OSError, ValueError):
+            pass
+        self._queue.put((stream_id, b""))  # type:ignore
+
+    def _poll(self, timeout: Optional[float]) -> List[Tuple[int, bytes]]:
+        """wait up to timeout seconds for data and return the chunks read, an empty chunk marks EOF
+        """
+        if self._queue is not None:
+            try:
+                chunks = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                return []
+            while True:
+                try:
+                    chunks.append(self._queue.get_nowait())
+                except queue.Empty:
+                    return chunks
+        chunks = []
+        for key, _ in self._selector.select(timeout):  # type:ignore
+            try:
+                data = os.read(key.fd, self._READ_SIZE)
+            except BlockingIOError:
+                continue
+            if not data:
+                self._selector.unregister(key.fd)  # type:ignore
+            chunks.append((self._ids[key.fd], data))
+        return chunks
+
+    def lines(self, timeout: Optional[float] = None) -> Generator[Tuple[int, bytes], None, None]:
+        """yield complete lines as (stream index, line) until all pipes reach EOF
+        or no line is completed before timeout seconds from the call pass.
+        the last unterminated line of a pipe is yielded at its EOF
+
+        Args:
+            timeout (Optional[float], optional): deadline for this call in seconds, None waits until EOF
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.exhausted:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            chunks = self._poll(remaining)
+            if not chunks and remaining == 0.0:
+                return
+            for stream_id, data in chunks:
+                if not data:
+                    self._open -= 1
+                    rest, self._partial[stream_id] = self._partial[stream_id], b""
+                    if rest:
+                        yield stream_id, rest
+                    continue
+                *complete, self._partial[stream_id] = (self._partial[stream_id] + data).split(b"\n")
+                for line in complete:
+                    yield stream_id, line + b"\n"
+
+    def close(self) -> None:
+        if self._selector is not None:
+            self._selector.close()
+
+
 @validate  # type:ignore
 def acm(command: str, inputs: Optional[List[str]] = None, i_timeout: float = 0.01,
         shell: bool = False, use_write_helper: bool = True, cwd: Optional[str] = None) \
         -> Tuple[int, Optional[List[bytes]], Optional[List[bytes]]]:
     """Advanced command
 
+    After each input the output is read for up to 'i_timeout' seconds, after the last input stdin is closed
+    and the remaining output is read until the program exits. Output is read by the calling thread.
+
     Args:
         command (str): The command to execute\n
         inputs (list[str]): the inputs to give to the program from the command. Defaults to None.\n
         i_timeout (float, optional): An individual timeout for every step of the execution. Defaults to 0.01.\n
         cwd (?, optional): Current working directory. Defaults to None.\n
-        env (?, optional): Environment variables. Defaults to None.\n
         shell (bool, optional): whether to execute the command through shell. Defaults to False.\n
         use_write_helper (bool, optional): whether to parse each input as it
         would have been parse with builtin print() or to use raw text. Defaults to True.
 
     Raises:
-        If @timeout will raise something other than TimeoutError.\n
         If the subprocess input and output handling will raise an exception.
 
     Returns:
         tuple[int, Optional[list[bytes]], Optional[list[bytes]]]: return code, stdout, stderr
+        stderr is merged into stdout so the returned stderr is always empty
     """
 
     if inputs is None:
         inputs = []
 
     p = None
+    multiplexer = None
     try:
-        # with subprocess.Popen(command, stdout=subprocess.PIPE,
-        #                      stdin=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=cwd, shell=shell) as p:
-        # TODO with ... as p:
         p = subprocess.Popen(command, stdout=subprocess.PIPE,
                              stdin=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=cwd, shell=shell)
         p.stdin = cast(IO[bytes], p.stdin)
         p.stdout = cast(IO[bytes], p.stdout)
-        p.stderr = cast(IO[bytes], p.stderr)
-
-        @timeout(i_timeout)  # type:ignore
-        def readlines(s: IO, l: list):
-            l.extend(s.readlines())
-
-        def extend_from_stream(stream: IO[bytes], list_to_extend_to: list):
-            if stream is not None and stream.readable():
-                try:
-                    readlines(stream, list_to_extend_to)
-                    # new_len = len(l)
-                except TimeoutError:
-                    # break
-                    pass
-                except BaseException as e1:
-                    raise e1
+        multiplexer = _PipeMultiplexer(p.stdout)
 
         stdout: List[bytes] = []
         stderr: List[bytes] = []
         for curr_input in inputs:
-            if p.stdin.writable():
+            try:
                 if use_write_helper:
                     __acm_write(curr_input, p=p)
                 else:
                     __acm_write(curr_input, p=p, sep="", end="")
-            extend_from_stream(p.stdout, stdout)
-            extend_from_stream(p.stderr, stderr)
-        # else:
-        #     extend_from_stream(p.stdout, stdout)
-        #     extend_from_stream(p.stderr, stderr)
-        p.stdin.close()
-        p.stdout.close()
-        if p.stderr is not None:
-            p.stderr.close()
+            except BrokenPipeError:
+                logger.warning("Process exited before receiving all inputs")
+                break
+            stdout.extend(line for _, line in multiplexer.lines(i_timeout))
+        try:
+            p.stdin.close()
+        except BrokenPipeError:
+            pass
+        stdout.extend(line for _, line in multiplexer.lines())
         returncode = p.wait()
         return returncode, stdout, stderr
     except BaseException as e2:
         raise type(e2)(f"Maybe use shell=True? original error:\n{e2.args}")
     finally:
+        if multiplexer is not None:
+            multiplexer.close()
         if p is not None:
-            if p.stdin is not None:
-                p.stdin.close()
-            if p.stderr is not None:
-                p.stderr.close()
-            if p.stdout is not None:
-                p.stdout.close()
+            for stream in (p.stdin, p.stdout, p.stderr):
+                if stream is not None:
+                    try:
+                        stream.close()
+                    except BrokenPipeError:
+                        pass
 
 
 def cmrt(*args, shell: bool = True) -> Generator[Tuple[int, bytes], None, None]:
     """Executes a command and yields stdout and stderr in real-time.
 
+    Both streams are multiplexed by the calling thread, no helper threads are started (except on Windows).
+
     Args:
         shell (bool, optional): If True, the command is executed through the shell. Defaults to True.
 
@@ -181,12 +274,11 @@ def cmrt(*args, shell: bool = True) -> Generator[Tuple[int, bytes], None, None]:
     cmd = " ".join(args)
 
     with subprocess.Popen(cmd, shell=shell, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
-        combined = join_generators(  # type:ignore
-            generator_from_stream(process.stdout),  # type:ignore
-            generator_from_stream(process.stderr)   # type:ignore
-        )  # type:ignore
-        for tup in combined:
-            yield tup
+        multiplexer = _PipeMultiplexer(process.stdout, process.stderr)  # type:ignore
+        try:
+            yield from multiplexer.lines()
+        finally:
+            multiplexer.close()
 
 
 __all__ = [
@@ -2,6 +2,7 @@ import logging
 import sys, os
 from typing import Optional, Tuple, List
 from ..context_managers import TemporaryFile
+from .shell_session import ShellSession
 import random
 from ..logging_.utils import get_logger
 
@@ -32,8 +33,17 @@ class LayeredCommand:
             instance_capture_stdout: Optional[bool] = None,
             instance_capture_stderr: Optional[bool] = None,
             instance_raise_on_fail: Optional[bool] = None,
-            instance_verbose: Optional[bool] = None
+            instance_verbose: Optional[bool] = None,
+            session: bool = False
     ):
+        """
+        Args:
+            command (Optional[str], optional): the layer command prefixed to every executed command
+            prev_instance (Optional[LayeredCommand], optional): the enclosing layer. Defaults to the last opened one.
+            session (bool, optional): keep one shell process open while the context is entered.
+                the layers are executed once when entering and commands are sent to the same shell,
+                so shell state persists between them. POSIX only. Defaults to False.
+        """
         self._command = command if command is not None else ""
         self._instance_capture_stdout = instance_capture_stdout
         self._instance_capture_stderr = instance_capture_stderr
@@ -44,6 +54,8 @@ class LayeredCommand:
         LayeredCommand._class_prev_instance = self
         self._executor = os.system
         self._has_entered: bool = False
+        self._use_session = session
+        self._session: Optional[ShellSession] = None
         logger.info("LayeredCommand initialized with command: '%s', prev_instance: %s", self._command, prev_instance is not None)
 
     def __enter__(self):
@@ -53,11 +65,28 @@ class LayeredCommand:
     def __exit__(self, exc_type, exc_val, exc_tb):
         if exc_type is not None:
             logger.warning("LayeredCommand context exited with exception: %s: %s", exc_type.__name__, exc_val)
+        if self._session is not None:
+            self._session.close()
+            self._session = None
         if self.prev is self._cur_class_prev_instance:
             LayeredCommand._class_prev_instance = self.prev
 
     def _open(self) -> None:
         self._has_entered = True
+        if self._use_session:
+            self._session = ShellSession()
+            self._session.open()
+            for layer in self._layers():
+                code, _, stderr = self._session.run(layer)
+                if code != 0:
+                    logger.warning("Layer '%s' failed with exit code %d: %s", layer, code,
+                                   stderr.decode(errors="replace").strip())
+
+    def _layers(self) -> List[str]:
+        layers = self.prev._layers() if self.prev is not None else []
+        if self._command != "":
+            layers.append(self._command)
+        return layers
 
     def _build_command(self, *commands: str) -> str:
         res = ""
@@ -99,6 +128,9 @@ class LayeredCommand:
         raise_on_fail = self._merge_values(command_raise_on_fail, self._instance_raise_on_fail,
                                            self.class_raise_on_fail)
 
+        if self._session is not None:
+            return self._execute_in_session(commands, capture_stdout, capture_stderr, raise_on_fail, command_verbose)
+
         command = self._build_command(*commands)
         logger.info("Executing command: %s", command)
         
@@ -121,6 +153,21 @@ class LayeredCommand:
                 self._error(raise_on_fail and code != 0, command, code, command_verbose)
                 return code, stdout.readlines(), stderr.readlines()
 
+    def _execute_in_session(self, commands: Tuple[str, ...], capture_stdout: bool, capture_stderr: bool,
+                            raise_on_fail: bool, command_verbose: Optional[bool]) -> Tuple[int, List[str], List[str]]:
+        command = "\n".join(commands)
+        logger.info("Executing command in session: %s", command)
+        code, stdout, stderr = self._session.run(command)  # type:ignore
+        self._error(raise_on_fail and code != 0, command, code, command_verbose)
+        out = stdout.decode(errors="replace")
+        err = stderr.decode(errors="replace")
+        if not capture_stdout:
+            sys.stdout.write(out)
+        if not capture_stderr:
+            sys.stderr.write(err)
+        return (code, out.splitlines(keepends=True) if capture_stdout else [],
+                err.splitlines(keepends=True) if capture_stderr else [])
+
     def __call__(self, *args, **kwargs) -> Tuple[int, List[str], List[str]]:
         return self.execute(*args, **kwargs)
 
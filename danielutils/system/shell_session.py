@@ -0,0 +1,228 @@
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+from ..logging_.utils import get_logger
+
+logger = get_logger(__name__)
+
+_READ_SIZE = 1 << 16
+
+
+class _SentinelProtocol:
+    """framing of commands sent to a long lived POSIX shell over stdin.
+
+    every command is evaluated with 'command eval' so that syntax errors do not terminate the shell
+    and state changes (cd, export, source) persist, with stdin redirected from /dev/null so the command
+    can not consume the following lines. afterwards a unique sentinel carrying the exit code is printed
+    to stdout and a second sentinel to stderr, marking the end of the command's output on both streams.
+    """
+
+    def __init__(self) -> None:
+        self._prefix = f"__danielutils_{uuid.uuid4().hex}"
+        self._counter = 0
+        self._token = b""
+
+    def wrap(self, command: str) -> bytes:
+        """build the script to write to the shell's stdin for command, and arm the parser for its sentinels
+        """
+        self._counter += 1
+        token = f"{self._prefix}_{self._counter}"
+        self._token = token.encode()
+        quoted = command.replace("'", "'\\''")
+        return (f"command eval '{quoted}' </dev/null\n"
+                f"printf '\\n%s %d\\n' {token} \"$?\"\n"
+                f"printf '\\n%s\\n' {token} >&2\n").encode()
+
+    @property
+    def max_sentinel_length(self) -> int:
+        """upper bound on the length of a sentinel line including its exit code"""
+        return len(self._token) + 32
+
+    def find_stdout(self, buffer: bytearray, start: int = 0) -> Optional[Tuple[bytes, int]]:
+        """
+        Args:
+            buffer (bytearray): the stdout received so far
+            start (int, optional): index to start searching from. Defaults to 0.
+
+        Returns:
+            Optional[Tuple[bytes, int]]: the command's stdout and exit code once the sentinel was received
+        """
+        marker = b"\n" + self._token + b" "
+        index = buffer.find(marker, start)
+        if index < 0:
+            return None
+        end = buffer.find(b"\n", index + len(marker))
+        if end < 0:
+            return None
+        return bytes(buffer[:index]), int(buffer[index + len(marker):end])
+
+    def find_stderr(self, buffer: bytearray, start: int = 0) -> Optional[bytes]:
+        """
+        Args:
+            buffer (bytearray): the stderr received so far
+            start (int, optional): index to start searching from. Defaults to 0.
+
+        Returns:
+            Optional[bytes]: the command's stderr once the sentinel was received
+        """
+        index = buffer.find(b"\n" + self._token + b"\n", start)
+        if index < 0:
+            return None
+        return bytes(buffer[:index])
+
+
+def _check_platform() -> None:
+    if sys.platform == "win32":
+        raise RuntimeError("shell sessions require a POSIX shell and are not supported on Windows")
+
+
+def _kill_group(pid: int) -> None:
+    """kill the shell together with the commands it is running, the shell leads its own session
+    """
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class ShellSession:
+    """A long lived shell process which executes commands sent over its stdin.
+
+    Shell state such as the working directory, environment variables and an activated virtual
+    environment persists between commands, and no new shell is started per command.
+    The end of each command is detected by unique sentinels carrying its exit code.
+
+    Usage:
+        with ShellSession() as session:
+            session.run("cd /tmp && export X=1")
+            code, stdout, stderr = session.run("echo $X")
+    """
+
+    def __init__(self, shell: str = "/bin/sh", *, cwd: Optional[str] = None,
+                 env: Optional[Dict[str, str]] = None) -> None:
+        """
+        Args:
+            shell (str, optional): path of a POSIX compatible shell. Defaults to "/bin/sh".
+            cwd (Optional[str], optional): initial working directory. Defaults to the current one.
+            env (Optional[Dict[str, str]], optional): environment of the shell. Defaults to the current one.
+        """
+        _check_platform()
+        self._shell = shell
+        self._cwd = cwd
+        self._env = env
+        self._process: Optional[subprocess.Popen] = None
+        self._protocol = _SentinelProtocol()
+
+    @property
+    def is_alive(self) -> bool:
+        """whether the shell process is running"""
+        return self._process is not None and self._process.poll() is None
+
+    def open(self) -> None:
+        """start the shell process, does nothing if it is already running
+        """
+        if self.is_alive:
+            return
+        logger.info("Starting shell session with %s", self._shell)
+        self._process = subprocess.Popen(  # pylint: disable=consider-using-with
+            [self._shell, "-s"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            cwd=self._cwd, env=self._env, start_new_session=True)
+
+    def close(self) -> None:
+        """terminate the shell process
+        """
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        logger.info("Closing shell session %s", process.pid)
+        try:
+            if process.poll() is None:
+                process.stdin.close()  # type:ignore
+                try:
+                    process.wait(1)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+        finally:
+            for stream in (process.stdin, process.stdout, process.stderr):
+                if stream is not None and not stream.closed:
+                    stream.close()
+
+    def __enter__(self) -> "ShellSession":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def run(self, command: str, timeout: Optional[float] = None) -> Tuple[int, bytes, bytes]:
+        """execute command in the session and wait for it to finish
+
+        Args:
+            command (str): the command to execute
+            timeout (Optional[float], optional): seconds to wait for the command. Defaults to None.
+
+        Raises:
+            RuntimeError: if the session is not open or the shell exited while running the command
+            TimeoutError: if the command did not finish in time, the session is closed in that case
+
+        Returns:
+            Tuple[int, bytes, bytes]: return code, stdout, stderr
+        """
+        if not self.is_alive:
+            raise RuntimeError("shell session is not open")
+        process: subprocess.Popen = self._process  # type:ignore
+        logger.debug("Running in shell session %s: %s", process.pid, command)
+        process.stdin.write(self._protocol.wrap(command))  # type:ignore
+        process.stdin.flush()  # type:ignore
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        buffers: Dict[int, bytearray] = {process.stdout.fileno(): bytearray(),  # type:ignore
+                                         process.stderr.fileno(): bytearray()}  # type:ignore
+        stdout_fd = process.stdout.fileno()  # type:ignore
+        stdout_result: Optional[Tuple[bytes, int]] = None
+        stderr_result: Optional[bytes] = None
+        with selectors.DefaultSelector() as selector:
+            for fd in buffers:
+                selector.register(fd, selectors.EVENT_READ)
+            while stdout_result is None or stderr_result is None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning("Command timed out after %ss in shell session, closing it: %s", timeout, command)
+                    self._kill()
+                    raise TimeoutError(f"command '{command}' timed out after {timeout} seconds")
+                for key, _ in selector.select(remaining):
+                    data = os.read(key.fd, _READ_SIZE)
+                    if not data:
+                        self._kill()
+                        raise RuntimeError(f"shell exited while running '{command}'")
+                    buffer = buffers[key.fd]
+                    # only the new data and a possibly split sentinel need to be searched
+                    start = max(0, len(buffer) - self._protocol.max_sentinel_length)
+                    buffer += data
+                    if key.fd == stdout_fd:
+                        stdout_result = self._protocol.find_stdout(buffer, start)
+                        done = stdout_result is not None
+                    else:
+                        stderr_result = self._protocol.find_stderr(buffer, start)
+                        done = stderr_result is not None
+                    if done:
+                        selector.unregister(key.fd)
+        stdout, code = stdout_result
+        logger.debug("Shell session command finished with return code %s", code)
+        return code, stdout, stderr_result
+
+    def _kill(self) -> None:
+        if self._process is not None and self._process.poll() is None:
+            _kill_group(self._process.pid)
+        self.close()
+
+
+__all__ = [
+    "ShellSession",
+]
@@ -0,0 +1,177 @@
+"""
+Batch Tests
+
+These tests cover running many commands through AsyncCommandBatch:
+- Concurrency limit
+- Completion order streaming and input order results
+- Per command timeout
+- Fail fast cancellation
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from typing import List
+
+from danielutils import AsyncCommand, AsyncCommandBatch, CommandExecutionResult, CommandState
+from tests.base_command import BaseCommandTest
+
+
+class TestAsyncCommandBatch(BaseCommandTest):
+    """AsyncCommandBatch tests."""
+
+    def python_command(self, code: str, **kwargs) -> AsyncCommand:
+        cmd = AsyncCommand([sys.executable, "-c", code], **kwargs)
+        self._created_commands.append(cmd)
+        return cmd
+
+    def sleep_command(self, seconds: float) -> AsyncCommand:
+        return self.python_command(f"import time; time.sleep({seconds}); print({seconds})")
+
+    def assert_reaped(self, command: AsyncCommand) -> None:
+        """the command's process has exited and was waited for"""
+        process = command._process  # pylint: disable=protected-access
+        self.assertIsNotNone(process)
+        self.assertIsNotNone(process.returncode)
+
+    def test_run_returns_results_in_input_order(self) -> None:
+        commands = [self.python_command(f"print({i})") for i in range(5)]
+        results = self.run_async(AsyncCommandBatch(commands, max_concurrency=2).run())
+        self.assertEqual([r.stdout.strip() for r in results], [str(i) for i in range(5)])
+        self.assertTrue(all(r.success for r in results))
+
+    def test_as_completed_yields_in_completion_order(self) -> None:
+        commands = [self.sleep_command(0.6), self.sleep_command(0.05)]
+
+        async def run() -> List[CommandExecutionResult]:
+            return [r async for r in AsyncCommandBatch(commands, max_concurrency=2).as_completed()]
+
+        results = self.run_async(run())
+        self.assertEqual([r.command for r in results], [commands[1], commands[0]])
+
+    def test_concurrency_limit(self) -> None:
+        commands = [self.sleep_command(0.3) for _ in range(4)]
+        start = time.monotonic()
+        self.run_async(AsyncCommandBatch(commands, max_concurrency=2).run())
+        # two waves of two commands
+        self.assertGreaterEqual(time.monotonic() - start, 0.55)
+
+    def test_timeout_applies_per_command(self) -> None:
+        commands = [self.sleep_command(5), self.python_command("print('ok')")]
+        start = time.monotonic()
+        results = self.run_async(AsyncCommandBatch(commands, max_concurrency=2, timeout=0.5).run())
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertTrue(results[0].timeout_occurred)
+        self.assertFalse(results[0].success)
+        self.assertTrue(results[1].success)
+
+    def test_fail_fast_kills_running_and_skips_pending(self) -> None:
+        failing = self.python_command("import sys; sys.exit(3)")
+        hanging = self.sleep_command(5)
+        pending = [self.python_command("print('never')") for _ in range(3)]
+        batch = AsyncCommandBatch([failing, hanging, *pending], max_concurrency=2, fail_fast=True)
+        start = time.monotonic()
+        results = self.run_async(batch.run())
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertTrue(batch.failed)
+        self.assertEqual(results[0].return_code, 3)
+        self.assertEqual(results[1].state, CommandState.KILLED)
+        self.assert_reaped(hanging)
+        self.assertEqual(results[2:], [None, None, None])
+        self.assertTrue(all(cmd.state == CommandState.PENDING for cmd in pending))
+
+    def test_without_fail_fast_runs_everything(self) -> None:
+        commands = [self.python_command("import sys; sys.exit(1)"), self.python_command("print('ok')")]
+        batch = AsyncCommandBatch(commands, max_concurrency=1)
+        results = self.run_async(batch.run())
+        self.assertTrue(batch.failed)
+        self.assertFalse(results[0].success)
+        self.assertTrue(results[1].success)
+
+    def test_breaking_out_kills_running_commands(self) -> None:
+        commands = [self.python_command("print('fast')"), self.sleep_command(5)]
+
+        async def run() -> None:
+            agen = AsyncCommandBatch(commands, max_concurrency=2).as_completed()
+            async for _ in agen:
+                break
+            await agen.aclose()
+
+        start = time.monotonic()
+        self.run_async(run())
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertEqual(commands[1].state, CommandState.KILLED)
+        self.assertTrue(commands[1].result.killed)
+        self.assert_reaped(commands[1])
+
+    def test_break_without_aclose_under_asyncio_run(self) -> None:
+        commands = [self.python_command("print('fast')")] + [self.sleep_command(5) for _ in range(3)]
+        batch = AsyncCommandBatch(commands, max_concurrency=2)
+
+        async def main() -> None:
+            async for _ in batch.as_completed():
+                break
+
+        # asyncio.run in a thread, so that a hang at shutdown fails the test instead of blocking it
+        thread = threading.Thread(target=asyncio.run, args=(main(),), daemon=True)
+        start = time.monotonic()
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive(), "asyncio.run did not finish after breaking out of as_completed()")
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertFalse(batch.failed)
+        self.assertEqual(commands[0].state, CommandState.COMPLETED)
+        self.assertEqual(commands[1].state, CommandState.KILLED)
+        self.assert_reaped(commands[1])
+        self.assertTrue(all(command.state == CommandState.PENDING for command in commands[2:]))
+
+    def test_early_break_keeps_failure_settings(self) -> None:
+        batch = AsyncCommandBatch([self.python_command("print(1)"), self.sleep_command(5)], max_concurrency=2)
+
+        async def run() -> None:
+            agen = batch.as_completed()
+            async for _ in agen:
+                break
+            await agen.aclose()
+
+        self.run_async(run())
+        self.assertFalse(batch.failed)
+        self.assertFalse(batch._fail_fast)  # pylint: disable=protected-access
+
+    def test_cancelling_kills_running_commands(self) -> None:
+        commands = [self.sleep_command(5) for _ in range(3)]
+
+        async def run() -> None:
+            task = asyncio.ensure_future(AsyncCommandBatch(commands, max_concurrency=2).run())
+            await asyncio.sleep(0.3)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        start = time.monotonic()
+        self.run_async(run())
+        self.assertLess(time.monotonic() - start, 4)
+        for command in commands[:2]:
+            self.assertEqual(command.state, CommandState.KILLED)
+            self.assert_reaped(command)
+        self.assertEqual(commands[2].state, CommandState.PENDING)
+
+    def test_validation(self) -> None:
+        with self.assertRaises(ValueError):
+            AsyncCommandBatch([], max_concurrency=0)
+        with self.assertRaises(ValueError):
+            AsyncCommandBatch([], timeout=0)
+        cmd = self.python_command("print(1)")
+        self.run_async(cmd.execute())
+        with self.assertRaises(ValueError):
+            AsyncCommandBatch([cmd])
+
+    def test_can_only_run_once(self) -> None:
+        batch = AsyncCommandBatch([self.python_command("print(1)")])
+        self.run_async(batch.run())
+        with self.assertRaises(RuntimeError):
+            self.run_async(batch.run())
+
+    def test_empty_batch(self) -> None:
+        self.assertEqual(self.run_async(AsyncCommandBatch([]).run()), [])
@@ -0,0 +1,126 @@
+"""
+Streaming Tests
+
+These tests cover consuming command output incrementally:
+- Line and chunk streaming from stdout and stderr
+- Tail-only output retention
+- Timeouts and early termination while streaming
+"""
+
+import asyncio
+import sys
+import time
+from typing import List
+
+from danielutils import AsyncCommand, CommandState, CommandOutput
+from tests.base_command import BaseCommandTest
+
+
+class TestStreaming(BaseCommandTest):
+    """Streaming output tests."""
+
+    def python_command(self, code: str, **kwargs) -> AsyncCommand:
+        cmd = AsyncCommand([sys.executable, "-c", code], **kwargs)
+        self._created_commands.append(cmd)
+        return cmd
+
+    def collect(self, cmd: AsyncCommand, **kwargs) -> List[CommandOutput]:
+        async def run() -> List[CommandOutput]:
+            return [output async for output in cmd.stream(**kwargs)]
+
+        return self.run_async(run())
+
+    def test_streams_lines_from_both_streams(self) -> None:
+        cmd = self.python_command(
+            "import sys\n"
+            "for i in range(3):\n"
+            "    print(i, flush=True)\n"
+            "print('err', file=sys.stderr, flush=True)\n"
+            "sys.stdout.write('tail')"
+        )
+        outputs = self.collect(cmd)
+        stdout = [o.text for o in outputs if o.stream == "stdout"]
+        stderr = [o.text for o in outputs if o.stream == "stderr"]
+        self.assertListEqual(["0\n", "1\n", "2\n", "tail"], stdout)
+        self.assertListEqual(["err\n"], stderr)
+        self.assert_command_success(cmd.result)
+        self.assertEqual("0\n1\n2\ntail", cmd.result.stdout)
+        self.assertEqual("err\n", cmd.result.stderr)
+
+    def test_output_arrives_before_exit(self) -> None:
+        cmd = self.python_command("import time\nprint('first', flush=True)\ntime.sleep(1)\nprint('second')")
+
+        async def run() -> float:
+            start = time.monotonic()
+            agen = cmd.stream()
+            try:
+                async for output in agen:
+                    if output.text == "first\n":
+                        return time.monotonic() - start
+                return float("inf")
+            finally:
+                await agen.aclose()
+
+        self.assertLess(self.run_async(run()), 0.9)
+
+    def test_chunks(self) -> None:
+        cmd = self.python_command("print('a' * 10000)")
+        outputs = self.collect(cmd, lines=False)
+        self.assertEqual("a" * 10000, "".join(o.text for o in outputs).strip())
+
+    def test_tail_retention(self) -> None:
+        cmd = self.python_command("for i in range(1000): print(i)", output_tail_lines=2)
+        result = self.run_async(cmd.execute())
+        self.assert_command_success(result)
+        self.assertEqual("998\n999\n", result.stdout)
+        self.assertTrue(result.output_truncated)
+
+    def test_timeout_while_streaming(self) -> None:
+        cmd = self.python_command("import time\nprint('x', flush=True)\ntime.sleep(30)", timeout=0.5)
+        outputs = self.collect(cmd)
+        self.assertListEqual(["x\n"], [o.text for o in outputs])
+        self.assertEqual(CommandState.TIMEOUT, cmd.result.state)
+        self.assertTrue(cmd.result.timeout_occurred)
+
+    def test_breaking_out_kills_process(self) -> None:
+        cmd = self.python_command("import time\nwhile True:\n    print('x', flush=True)\n    time.sleep(0.01)")
+
+        async def run() -> None:
+            agen = cmd.stream()
+            async for _ in agen:
+                break
+            await agen.aclose()
+
+        self.run_async(run())
+        self.assertEqual(CommandState.KILLED, cmd.result.state)
+        self.assertTrue(cmd.result.killed)
+
+    def test_cancelling_kills_and_reaps_process(self) -> None:
+        code = "import time\nwhile True:\n    print('x', flush=True)\n    time.sleep(0.01)"
+        streamed = self.python_command(code)
+        executed = self.python_command(code)
+
+        async def consume() -> None:
+            async for _ in streamed.stream():
+                pass
+
+        async def run() -> None:
+            for coro in (consume(), executed.execute()):
+                task = asyncio.ensure_future(coro)
+                await asyncio.sleep(0.3)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+        self.run_async(run())
+        for cmd in (streamed, executed):
+            self.assertIsNotNone(cmd._process.returncode)  # pylint: disable=protected-access
+            self.assertEqual(CommandState.KILLED, cmd.state)
+            self.assertEqual(CommandState.KILLED, cmd.result.state)
+            self.assertTrue(cmd.result.killed)
+
+    def test_stream_requires_pending_state(self) -> None:
+        cmd = self.python_command("print(1)")
+        self.collect(cmd)
+        with self.assertRaises(RuntimeError):
+            self.collect(cmd)
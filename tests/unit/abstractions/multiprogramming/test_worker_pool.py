@@ -0,0 +1,154 @@
+import multiprocessing
+import os
+import threading
+import time
+import unittest
+
+try:
+    from danielutils.abstractions.multiprogramming import WorkerPool, Worker, AutoscalePolicy  # type:ignore
+except:
+    # python == 3.9.0
+    from ....danielutils.abstractions.multiprogramming import WorkerPool, Worker, AutoscalePolicy  # type:ignore
+
+
+class SleepWorker(Worker):
+    def _work(self, obj):
+        time.sleep(obj)
+        with self.pool.global_variables["lock"]:
+            self.pool.global_variables["threads"].add(threading.get_ident())
+            self.pool.global_variables["done"] += 1
+
+
+class SquareWorker(Worker):
+    def __init__(self, id, pool, results):  # pylint: disable=redefined-builtin
+        super().__init__(id, pool)
+        self.results = results
+
+    def _work(self, obj):
+        if obj < 0:
+            raise ValueError("negative")
+        self.results.put((obj * obj, os.getpid(), self.pool.global_variables["offset"]))
+
+
+def make_pool(num_workers, autoscale=None, **kwargs):
+    state = {"lock": threading.Lock(), "threads": set(), "done": 0}
+    return WorkerPool(num_workers, SleepWorker, {}, state, autoscale=autoscale, **kwargs), state
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_runs_all_jobs(self):
+        pool, state = make_pool(3)
+        for _ in range(10):
+            pool.submit(0.001)
+        pool.start()
+        pool.join()
+        self.assertEqual(state["done"], 10)
+
+
+class TestWorkerPoolAutoscaling(unittest.TestCase):
+    def test_scales_up_under_backlog(self):
+        policy = AutoscalePolicy(min_workers=1, max_workers=4, scale_up_wait_time=0.02, cooldown=0.05)
+        pool, state = make_pool(1, policy)
+        for _ in range(12):
+            pool.submit(0.1)
+        start = time.monotonic()
+        pool.start()
+        pool.join()
+        self.assertEqual(state["done"], 12)
+        self.assertEqual(len(pool.workers), 4)
+        # a single worker would need 1.2 seconds
+        self.assertLess(time.monotonic() - start, 0.9)
+
+    def test_idle_workers_retire(self):
+        policy = AutoscalePolicy(min_workers=1, max_workers=3, scale_up_wait_time=0, cooldown=0, idle_timeout=0.1)
+        pool, state = make_pool(3, policy)
+        pool.submit(0.6)
+        pool.submit(0.01)
+        pool.start()
+        time.sleep(0.4)
+        # the long job keeps the pool running while the other workers idle
+        self.assertEqual(pool.num_workers, 1)
+        pool.join()
+        self.assertEqual(state["done"], 2)
+
+    def test_policy_validation(self):
+        with self.assertRaises(ValueError):
+            AutoscalePolicy(min_workers=3, max_workers=2)
+        with self.assertRaises(ValueError):
+            AutoscalePolicy(idle_timeout=0)
+        self.assertEqual(AutoscalePolicy(min_workers=2, max_workers=4).clamp(10), 4)
+
+
+class TestWorkStealing(unittest.TestCase):
+    def test_runs_all_jobs(self):
+        pool, state = make_pool(4, work_stealing=True, batch_size=8)
+        for _ in range(200):
+            pool.submit(0)
+        pool.start()
+        pool.join()
+        self.assertEqual(state["done"], 200)
+
+    def test_idle_workers_steal_from_a_loaded_one(self):
+        pool, state = make_pool(2, work_stealing=True, batch_size=8)
+        for _ in range(8):
+            pool.submit(0.1)
+        start = time.monotonic()
+        pool.start()
+        pool.join()
+        self.assertEqual(state["done"], 8)
+        self.assertEqual(len(state["threads"]), 2)
+        self.assertGreaterEqual(pool._scheduler.steals, 1)  # pylint: disable=protected-access
+        # one worker alone would need 0.8 seconds for its batch
+        self.assertLess(time.monotonic() - start, 0.7)
+
+    def test_default_batch_size_allows_stealing(self):
+        pool, state = make_pool(2, work_stealing=True)
+        self.assertGreater(pool.batch_size, 1)
+        for _ in range(8):
+            pool.submit(0.05)
+        pool.start()
+        pool.join()
+        self.assertEqual(state["done"], 8)
+        self.assertGreaterEqual(pool._scheduler.steals, 1)  # pylint: disable=protected-access
+        self.assertEqual(make_pool(2)[0].batch_size, 1)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            make_pool(2, AutoscalePolicy(), work_stealing=True)
+        with self.assertRaises(ValueError):
+            make_pool(2, batch_size=0)
+        with self.assertRaises(ValueError):
+            make_pool(2, backend="fiber")
+
+
+class TestProcessBackend(unittest.TestCase):
+    def run_pool(self, jobs, **kwargs):
+        results = multiprocessing.get_context().Queue()
+        pool = WorkerPool(2, SquareWorker, {"results": results}, {"offset": 7}, backend="process", **kwargs)
+        for job in jobs:
+            pool.submit(job)
+        pool.start()
+        pool.join()
+        collected = []
+        while len(collected) < len([job for job in jobs if job >= 0]):
+            collected.append(results.get(timeout=5))
+        return pool, collected
+
+    def test_runs_jobs_in_worker_processes(self):
+        _, collected = self.run_pool(list(range(20)), batch_size=4)
+        self.assertEqual(sorted(square for square, _, _ in collected), [i * i for i in range(20)])
+        self.assertNotIn(os.getpid(), {pid for _, pid, _ in collected})
+        self.assertEqual({offset for _, _, offset in collected}, {7})
+
+    def test_with_work_stealing(self):
+        _, collected = self.run_pool(list(range(30)), batch_size=4, work_stealing=True)
+        self.assertEqual(len(collected), 30)
+
+    def test_failing_job_does_not_stop_the_pool(self):
+        pool, collected = self.run_pool([1, -1, 2, 3])
+        self.assertEqual(sorted(square for square, _, _ in collected), [1, 4, 9])
+        self.assertFalse(any(w.is_alive() for w in pool.workers))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,374 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from danielutils.async_.async_worker_pool import AsyncWorkerPool  # type:ignore
+    from danielutils.async_.worker_pool_metrics import LatencyHistogram  # type:ignore
+    from danielutils.abstractions.multiprogramming import AutoscalePolicy  # type:ignore
+except:
+    # python == 3.9.0
+    from ...danielutils.async_.async_worker_pool import AsyncWorkerPool  # type:ignore
+    from ...danielutils.async_.worker_pool_metrics import LatencyHistogram  # type:ignore
+    from ...danielutils.abstractions.multiprogramming import AutoscalePolicy  # type:ignore
+
+
+class TestAsyncWorkerPoolScheduling(unittest.TestCase):
+    def test_runs_all_tasks(self):
+        results = []
+
+        async def job(x):
+            await asyncio.sleep(0)
+            results.append(x)
+
+        async def main():
+            pool = AsyncWorkerPool("test", num_workers=3)
+            await pool.start()
+            for i in range(20):
+                await pool.submit(job, (i,))
+            await pool.join()
+
+        asyncio.run(main())
+        self.assertEqual(sorted(results), list(range(20)))
+
+    def test_priority_then_fifo(self):
+        order = []
+
+        async def job(x):
+            order.append(x)
+
+        async def main():
+            pool = AsyncWorkerPool("test", num_workers=1)
+            for i in range(3):
+                await pool.submit(job, (f"bulk{i}",), priority=-1)
+            await pool.submit(job, ("normal",))
+            await pool.submit(job, ("interactive",), priority=5)
+            await pool.start()
+            await pool.join()
+
+        asyncio.run(main())
+        self.assertEqual(order, ["interactive", "normal", "bulk0", "bulk1", "bulk2"])
+
+    def test_per_key_concurrency_does_not_block_other_keys(self):
+        running = {"a": 0, "b": 0}
+        peak = {"a": 0, "b": 0}
+        finished = []
+
+        async def job(key):
+            running[key] += 1
+            peak[key] = max(peak[key], running[key])
+            await asyncio.sleep(0.02)
+            running[key] -= 1
+            finished.append(key)
+
+        async def main():
+            pool = AsyncWorkerPool("test", num_workers=4)
+            pool.set_key_limits("a", max_concurrency=1)
+            for _ in range(4):
+                await pool.submit(job, ("a",), key="a")
+            for _ in range(4):
+                await pool.submit(job, ("b",), key="b")
+            await pool.start()
+            await pool.join()
+
+        asyncio.run(main())
+        self.assertEqual(peak["a"], 1)
+        self.assertEqual(peak["b"], 3)
+        # b is not stuck behind the saturated key, a drains serially afterwards
+        self.assertEqual(finished[-2:], ["a", "a"])
+        self.assertEqual(finished.count("b"), 4)
+
+    def test_default_key_concurrency(self):
+        peak = 0
+        running = 0
+
+        async def job():
+            nonlocal peak, running
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        async def main():
+            pool = AsyncWorkerPool("test", num_workers=5, default_key_concurrency=2)
+            for _ in range(6):
+                await pool.submit(job, key="host")
+            await pool.start()
+            await pool.join()
+
+        asyncio.run(main())
+        self.assertEqual(peak, 2)
+
+    def test_rate_limit_per_key(self):
+        times = []
+
+        async def job():
+            times.append(time.monotonic())
+
+        async def main():
+            pool = AsyncWorkerPool("test", num_workers=4)
+            pool.set_key_limits("api", rate=50, burst=2)
+            for _ in range(6):
+                await pool.submit(job, key="api")
+            await pool.start()
+            await pool.join()
+
+        asyncio.run(main())
+        self.assertEqual(len(times), 6)
+        # two immediately, then one every 20ms
+        self.assertGreaterEqual(times[-1] - times[0], 0.07)
+
+    def test_invalid_limits(self):
+        pool = AsyncWorkerPool("test")
+        with self.assertRaises(ValueError):
+            pool.set_key_limits("a", max_concurrency=0)
+        with self.assertRaises(ValueError):
+            pool.set_key_limits(None, max_concurrency=1)
+
+
+class TestAsyncWorkerPoolMetrics(unittest.TestCase):
+    def test_counts_and_timings(self):
+        async def ok(delay):
+            await asyncio.sleep(delay)
+
+        async def fail():
+            raise ValueError("boom")
+
+        async def main():
+            pool = AsyncWorkerPool("test", num_workers=2)
+            for _ in range(4):
+                await pool.submit(ok, (0.05,), name="slow")
+            await pool.submit(fail, name="bad")
+            before = pool.metrics()
+            await pool.start()
+            await pool.join()
+            return before, pool.metrics()
+
+        before, after = asyncio.run(main())
+        self.assertEqual((before.queue_depth, before.submitted, before.completed), (5, 5, 0))
+        self.assertEqual((after.queue_depth, after.running), (0, 0))
+        self.assertEqual((after.succeeded, after.failed), (4, 1))
+        self.assertEqual(after.execution_time.count, 5)
+        self.assertEqual(after.execution_time_by_name["slow"].count, 4)
+        self.assertGreaterEqual(after.execution_time_by_name["slow"].mean, 0.05)
+        # two waves of two slow tasks, the later tasks waited for the earlier ones
+        self.assertGreaterEqual(after.wait_time.max, 0.05)
+        self.assertGreater(after.utilization, 0.5)
+        self.assertLessEqual(after.utilization, 1.0)
+
+    def test_periodic_callback(self):
+        snapshots = []
+
+        async def job():
+            await asyncio.sleep(0.12)
+
+        async def main():
+            pool = AsyncWorkerPool("test", num_workers=1, metrics_callback=snapshots.append, metrics_interval=0.05)
+            await pool.submit(job)
+            await pool.start()
+            await pool.join()
+
+        asyncio.run(main())
+        self.assertGreaterEqual(len(snapshots), 2)
+        self.assertEqual(snapshots[0].running, 1)
+        self.assertEqual(snapshots[-1].succeeded, 1)
+
+    def test_failing_callback_does_not_break_the_pool(self):
+        def callback(_):
+            raise RuntimeError("callback")
+
+        async def job():
+            pass
+
+        async def main():
+            pool = AsyncWorkerPool("test", metrics_callback=callback, metrics_interval=0.01)
+            await pool.submit(job)
+            await pool.start()
+            await pool.join()
+            return pool.metrics()
+
+        self.assertEqual(asyncio.run(main()).succeeded, 1)
+
+    def test_per_task_logging_is_opt_in(self):
+        async def job():
+            pass
+
+        async def main(log_tasks):
+            pool = AsyncWorkerPool("test", num_workers=1, log_tasks=log_tasks)
+            await pool.submit(job, name="job")
+            await pool.start()
+            await pool.join()
+
+        for log_tasks in (False, True):
+            with self.subTest(log_tasks=log_tasks), self.assertLogs(AsyncWorkerPool._logger, "INFO") as logs:
+                asyncio.run(main(log_tasks))
+            task_lines = [line for line in logs.output if "Task 1 'job'" in line]
+            self.assertEqual(len(task_lines), 2 if log_tasks else 0)
+
+
+class TestAsyncWorkerPoolAutoscaling(unittest.TestCase):
+    def test_scales_up_under_backlog_and_back_down(self):
+        policy = AutoscalePolicy(min_workers=1, max_workers=4, scale_up_wait_time=0.02, cooldown=0.05,
+                                 idle_timeout=0.1)
+
+        async def job(delay):
+            await asyncio.sleep(delay)
+
+        async def main():
+            pool = AsyncWorkerPool("test", num_workers=1, autoscale=policy)
+            await pool.start()
+            for _ in range(12):
+                await pool.submit(job, (0.1,))
+            await pool.submit(job, (0.8,))
+            await asyncio.sleep(0.3)
+            peak = pool.metrics().num_workers
+            await asyncio.sleep(0.4)
+            # only the long job is left
+            settled = pool.metrics().num_workers
+            await pool.join()
+            return peak, settled, pool.metrics()
+
+        start = time.monotonic()
+        peak, settled, metrics = asyncio.run(main())
+        self.assertEqual(peak, 4)
+        self.assertEqual(settled, 1)
+        self.assertEqual(metrics.succeeded, 13)
+        self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_does_not_scale_for_tasks_held_back_by_key_limits(self):
+        policy = AutoscalePolicy(min_workers=2, max_workers=6, scale_up_wait_time=0, cooldown=0)
+
+        async def job():
+            await asyncio.sleep(0.05)
+
+        async def main():
+            pool = AsyncWorkerPool("test", num_workers=2, autoscale=policy)
+            pool.set_key_limits("a", max_concurrency=1)
+            for _ in range(5):
+                await pool.submit(job, key="a")
+            await pool.start()
+            await asyncio.sleep(0.15)
+            workers = pool.metrics().num_workers
+            await pool.join()
+            return workers
+
+        self.assertEqual(asyncio.run(main()), 2)
+
+
+def _write_pid(path):
+    with open(path, "w") as f:
+        f.write(str(os.getpid()))
+
+
+class TestAsyncWorkerPoolExecutors(unittest.TestCase):
+    def test_sync_callables_do_not_block_the_event_loop(self):
+        ticks = []
+        threads = []
+
+        def blocking():
+            threads.append(threading.get_ident())
+            time.sleep(0.3)
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def main():
+            pool = AsyncWorkerPool("test", num_workers=2)
+            await pool.submit(blocking)
+            await pool.submit(ticker)
+            await pool.start()
+            await pool.join()
+            return pool.metrics()
+
+        metrics = asyncio.run(main())
+        self.assertEqual(metrics.succeeded, 2)
+        self.assertNotEqual(threads, [threading.get_ident()])
+        # the ticker kept running while the sync function slept
+        self.assertLess(ticks[-1] - ticks[0], 0.25)
+
+    def test_custom_executor_and_async_callable_objects(self):
+        class AsyncCallable:
+            def __init__(self):
+                self.called = False
+
+            async def __call__(self):
+                self.called = True
+
+        used = []
+
+        def sync():
+            used.append(threading.current_thread().name)
+
+        obj = AsyncCallable()
+
+        async def main():
+            with ThreadPoolExecutor(1, thread_name_prefix="custom") as executor:
+                pool = AsyncWorkerPool("test", executor=executor)
+                await pool.submit(sync)
+                await pool.submit(obj)
+                await pool.start()
+                await pool.join()
+
+        asyncio.run(main())
+        self.assertTrue(used[0].startswith("custom"))
+        self.assertTrue(obj.called)
+
+    def test_cpu_bound_tasks_run_in_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, str(i)) for i in range(3)]
+
+            async def main():
+                pool = AsyncWorkerPool("test", num_workers=3)
+                for path in paths:
+                    await pool.submit(_write_pid, (path,), cpu_bound=True)
+                await pool.start()
+                await pool.join()
+                return pool
+
+            pool = asyncio.run(main())
+            pids = set()
+            for path in paths:
+                with open(path) as f:
+                    pids.add(int(f.read()))
+        self.assertEqual(pool.metrics().succeeded, 3)
+        self.assertNotIn(os.getpid(), pids)
+        # the process pool created by the pool was shut down by join()
+        self.assertIsNone(pool._cpu_executor)  # pylint: disable=protected-access
+
+    def test_cpu_bound_coroutine_is_rejected(self):
+        async def job():
+            pass
+
+        async def main():
+            await AsyncWorkerPool("test").submit(job, cpu_bound=True)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(main())
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram((0.01, 0.1, 1.0))
+        for value in (0.005, 0.05, 0.05, 0.5, 3.0):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot.counts, [1, 2, 1, 1])
+        self.assertEqual(snapshot.percentile(50), 0.1)
+        self.assertEqual(snapshot.percentile(80), 1.0)
+        self.assertEqual(snapshot.percentile(100), 3.0)
+        self.assertAlmostEqual(snapshot.mean, 3.605 / 5)
+        self.assertEqual(LatencyHistogram().snapshot().percentile(99), 0.0)
+
+    def test_invalid_bounds(self):
+        with self.assertRaises(ValueError):
+            LatencyHistogram((1.0, 0.5))
+
+
+if __name__ == '__main__':
+    unittest.main()
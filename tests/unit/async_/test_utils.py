@@ -0,0 +1,229 @@
+import asyncio
+import gc
+import threading
+import time
+import unittest
+from typing import AsyncIterator, List
+
+try:
+    from danielutils.async_.utils import return_first, cast_aiter, amap, abatch, amerge, async_enumerate  # type:ignore
+except:
+    # python == 3.9.0
+    from ...danielutils.async_.utils import return_first, cast_aiter, amap, abatch, amerge, \
+        async_enumerate  # type:ignore
+
+
+async def collect(aiterator: AsyncIterator) -> List:
+    return [item async for item in aiterator]
+
+
+async def ticker(values, delay: float) -> AsyncIterator:
+    for value in values:
+        await asyncio.sleep(delay)
+        yield value
+
+
+class TestReturnFirst(unittest.TestCase):
+    def test_returns_index_of_first(self):
+        async def value(x, delay):
+            await asyncio.sleep(delay)
+            return x
+
+        async def main():
+            return await return_first([value("a", 0.2), value("b", 0.01), value("c", 0.2)])
+
+        self.assertEqual(asyncio.run(main()), [(1, "b")])
+
+
+class TestCastAiter(unittest.TestCase):
+    def test_inline(self):
+        self.assertEqual(asyncio.run(collect(cast_aiter(range(5)))), list(range(5)))
+
+    def test_offloaded_iterator_does_not_block_loop(self):
+        def blocking():
+            for i in range(3):
+                time.sleep(0.05)
+                yield threading.current_thread() is threading.main_thread()
+
+        async def main():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticking = asyncio.ensure_future(tick())
+            values = await collect(cast_aiter(blocking(), offload=True))
+            ticking.cancel()
+            return values, ticks
+
+        values, ticks = asyncio.run(main())
+        self.assertEqual(values, [False, False, False])
+        self.assertGreater(ticks, 5)
+
+    def test_offloaded_buffer_is_bounded(self):
+        produced = []
+
+        def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        async def main():
+            agen = cast_aiter(source(), offload=True, buffer_size=4)
+            first = await agen.__anext__()
+            await asyncio.sleep(0.1)
+            await agen.aclose()
+            return first
+
+        self.assertEqual(asyncio.run(main()), 0)
+        # the consumed item and buffer_size items read ahead
+        self.assertLessEqual(len(produced), 5)
+
+    def test_offloaded_exception_propagates(self):
+        def source():
+            yield 1
+            raise KeyError("x")
+
+        with self.assertRaises(KeyError):
+            asyncio.run(collect(cast_aiter(source(), offload=True)))
+
+    def test_offloaded_runtime_error_propagates(self):
+        def source():
+            yield 1
+            next(iter([]))  # a StopIteration inside a generator becomes a RuntimeError
+
+        async def main():
+            values = []
+            with self.assertRaises(RuntimeError):
+                async for value in cast_aiter(source(), offload=True):
+                    values.append(value)
+            return values
+
+        self.assertEqual(asyncio.run(asyncio.wait_for(main(), 5)), [1])
+
+
+class TestAmap(unittest.TestCase):
+    def test_ordered_with_concurrency_limit(self):
+        running = 0
+        peak = 0
+
+        async def work(x):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01 * (5 - x % 5))
+            running -= 1
+            return x * 2
+
+        results = asyncio.run(collect(amap(work, range(20), concurrency=3)))
+        self.assertEqual(results, [x * 2 for x in range(20)])
+        self.assertEqual(peak, 3)
+
+    def test_unordered_yields_in_completion_order(self):
+        async def work(x):
+            await asyncio.sleep(x)
+            return x
+
+        results = asyncio.run(collect(amap(work, [0.1, 0.01, 0.05], concurrency=3, ordered=False)))
+        self.assertEqual(results, [0.01, 0.05, 0.1])
+
+    def test_does_not_consume_whole_source(self):
+        pulled = []
+
+        def endless():
+            i = 0
+            while True:
+                pulled.append(i)
+                yield i
+                i += 1
+
+        async def double(x):
+            return x * 2
+
+        async def main():
+            results = []
+            async for value in amap(double, endless(), concurrency=4):
+                results.append(value)
+                if len(results) == 10:
+                    break
+            return results
+
+        self.assertEqual(asyncio.run(main()), [x * 2 for x in range(10)])
+        self.assertLess(len(pulled), 20)
+
+    def test_exception_cancels_others(self):
+        cancelled = []
+
+        async def work(x):
+            if x == 0:
+                raise ValueError("bad")
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(x)
+                raise
+
+        with self.assertRaises(ValueError):
+            asyncio.run(collect(amap(work, range(3), concurrency=3)))
+        self.assertEqual(sorted(cancelled), [1, 2])
+
+    def test_exceptions_of_unconsumed_calls_are_retrieved(self):
+        async def work(x):
+            if x:
+                raise ValueError(x)
+            return x
+
+        async def main():
+            errors = []
+            asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+            for ordered in (True, False):
+                try:
+                    async for _ in amap(work, range(4), concurrency=4, ordered=ordered):
+                        break
+                except ValueError:
+                    # the calls finish together, completion order may yield a failed one first
+                    pass
+            gc.collect()
+            await asyncio.sleep(0)
+            return errors
+
+        self.assertEqual(asyncio.run(main()), [])
+
+
+class TestAbatch(unittest.TestCase):
+    def test_by_size(self):
+        self.assertEqual(asyncio.run(collect(abatch(range(7), 3))), [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_by_time(self):
+        async def source():
+            for i in range(3):
+                yield i
+            await asyncio.sleep(0.2)
+            yield 3
+
+        self.assertEqual(asyncio.run(collect(abatch(source(), 10, timeout=0.05))), [[0, 1, 2], [3]])
+
+
+class TestAmerge(unittest.TestCase):
+    def test_interleaves_by_arrival(self):
+        async def main():
+            return await collect(amerge(ticker("ab", 0.03), ticker("xyz", 0.02)))
+
+        results = asyncio.run(main())
+        self.assertEqual(sorted(results), ["a", "b", "x", "y", "z"])
+        self.assertEqual(results[0], "x")
+
+    def test_with_sync_and_empty_sources(self):
+        self.assertEqual(sorted(asyncio.run(collect(amerge([1, 2], [], ticker([3], 0))))), [1, 2, 3])
+
+
+class TestAsyncEnumerate(unittest.TestCase):
+    def test_enumerate(self):
+        self.assertEqual(asyncio.run(collect(async_enumerate(ticker("ab", 0), 1))), [(1, "a"), (2, "b")])
+
+
+if __name__ == '__main__':
+    unittest.main()
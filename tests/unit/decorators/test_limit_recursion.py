@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import unittest
+
+try:
+    from danielutils.decorators.limit_recursion import limit_recursion  # type:ignore
+except:
+    # python == 3.9.0
+    from ...danielutils.decorators.limit_recursion import limit_recursion  # type:ignore
+
+
+class TestLimitRecursion(unittest.TestCase):
+    def test_returns_args_when_limited(self):
+        calls = []
+
+        @limit_recursion(4)
+        def f(n: int):
+            calls.append(n)
+            return f(n + 1)
+
+        self.assertEqual(f(0), ((3,), {}))
+        self.assertEqual(calls, [0, 1, 2])
+
+    def test_return_value(self):
+        @limit_recursion(3, return_value="limited")
+        def f(n: int):
+            return f(n + 1)
+
+        self.assertEqual(f(0), "limited")
+
+    def test_depth_is_restored(self):
+        @limit_recursion(10, return_value=-1)
+        def fib(n: int) -> int:
+            return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+        self.assertEqual(fib(5), 5)
+        self.assertEqual(fib(5), 5)
+
+    def test_deep_recursion_is_linear(self):
+        @limit_recursion(200, return_value=1)
+        def count(n: int) -> int:
+            return 1 + count(n + 1)
+
+        self.assertEqual(count(0), 200)
+
+    def test_depth_is_restored_after_exception(self):
+        @limit_recursion(3, return_value="limited")
+        def f(n: int):
+            if n == 1:
+                raise ValueError()
+            return f(n + 1)
+
+        with self.assertRaises(ValueError):
+            f(0)
+        self.assertEqual(f(1 + 1), "limited")
+
+    def test_per_thread(self):
+        barrier = threading.Barrier(2)
+        results = []
+
+        @limit_recursion(3, return_value="limited")
+        def f(n: int):
+            if n == 0:
+                barrier.wait(5)
+            return f(n + 1)
+
+        threads = [threading.Thread(target=lambda: results.append(f(0))) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(results, ["limited", "limited"])
+
+    def test_generator(self):
+        @limit_recursion(3, return_value=iter(["limited"]))
+        def walk(n: int):
+            yield n
+            yield from walk(n + 1)
+
+        self.assertEqual(list(walk(0)), [0, 1, "limited"])
+
+    def test_async(self):
+        @limit_recursion(4, return_value="limited")
+        async def f(n: int):
+            await asyncio.sleep(0)
+            return await f(n + 1)
+
+        async def main():
+            return await asyncio.gather(f(0), f(0))
+
+        self.assertEqual(asyncio.run(main()), ["limited", "limited"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import asyncio
+import time
+import unittest
+
+try:
+    from danielutils.decorators.memo import memo, async_memo  # type:ignore
+except:
+    # python == 3.9.0
+    from ...danielutils.decorators.memo import memo, async_memo  # type:ignore
+
+
+class TestAsyncMemo(unittest.TestCase):
+    def test_concurrent_calls_share_one_computation(self):
+        calls = []
+
+        @async_memo
+        async def fetch(key):
+            calls.append(key)
+            await asyncio.sleep(0.05)
+            return {"key": key}
+
+        async def main():
+            first = await asyncio.gather(*(fetch("a") for _ in range(10)))
+            return first, await fetch("a")
+
+        first, second = asyncio.run(main())
+        self.assertEqual(calls, ["a"])
+        self.assertEqual(first, [{"key": "a"}] * 10)
+        self.assertEqual(second, {"key": "a"})
+        # results are copies by default
+        self.assertIsNot(first[0], first[1])
+
+    def test_lru_eviction(self):
+        calls = []
+
+        @async_memo(maxsize=2, copy=False)
+        async def square(x):
+            calls.append(x)
+            return x * x
+
+        async def main():
+            for x in (1, 2, 1, 3, 1, 2):
+                await square(x)
+
+        asyncio.run(main())
+        # 2 is evicted by 3 since 1 was used more recently
+        self.assertEqual(calls, [1, 2, 3, 2])
+
+    def test_ttl_expiry(self):
+        calls = []
+
+        @async_memo(ttl=0.05)
+        async def now():
+            calls.append(1)
+            return len(calls)
+
+        async def main():
+            a = await now()
+            b = await now()
+            await asyncio.sleep(0.06)
+            return a, b, await now()
+
+        self.assertEqual(asyncio.run(main()), (1, 1, 2))
+
+    def test_exceptions_are_shared_but_not_cached(self):
+        calls = []
+
+        @async_memo
+        async def flaky():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            if len(calls) == 1:
+                raise ValueError("first")
+            return "ok"
+
+        async def main():
+            results = await asyncio.gather(flaky(), flaky(), return_exceptions=True)
+            return results, await flaky()
+
+        results, retry = asyncio.run(main())
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        self.assertEqual(retry, "ok")
+        self.assertEqual(len(calls), 2)
+
+    def test_cancelling_one_awaiter_does_not_cancel_others(self):
+        @async_memo
+        async def slow():
+            await asyncio.sleep(0.05)
+            return 1
+
+        async def main():
+            first = asyncio.ensure_future(slow())
+            second = asyncio.ensure_future(slow())
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(main()), 1)
+
+    def test_rejects_sync_functions(self):
+        with self.assertRaises(TypeError):
+            async_memo(lambda: 1)
+
+    def test_memo_on_coroutine_function(self):
+        calls = []
+
+        @memo
+        async def double(x):
+            calls.append(x)
+            return x * 2
+
+        async def main():
+            return await double(2), await double(2)
+
+        self.assertEqual(asyncio.run(main()), (4, 4))
+        self.assertEqual(calls, [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
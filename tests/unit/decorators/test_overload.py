@@ -0,0 +1,106 @@
+import unittest
+import warnings
+from typing import List, Union
+
+try:
+    from danielutils.decorators.overload import overload, explicit_global_overload  # type:ignore
+    from danielutils.metaclasses.overload_meta import OverloadMeta  # type:ignore
+except:
+    # python == 3.9.0
+    from ...danielutils.decorators.overload import overload, explicit_global_overload  # type:ignore
+    from ...danielutils.metaclasses.overload_meta import OverloadMeta  # type:ignore
+
+
+class TestOverload(unittest.TestCase):
+    def test_dispatch_by_type(self):
+        @overload
+        def describe(x: int) -> str:
+            return "int"
+
+        @describe.overload
+        def _describe_str(x: str) -> str:
+            return "str"
+
+        @describe.overload
+        def _describe_two(x: int, y: Union[int, float]) -> str:
+            return "two"
+
+        for _ in range(3):
+            self.assertEqual(describe(1), "int")
+            self.assertEqual(describe("a"), "str")
+            self.assertEqual(describe(1, 2.5), "two")
+        self.assertIn((int,), describe._dispatch_cache)
+        self.assertIn((str,), describe._dispatch_cache)
+
+    def test_registration_invalidates_cache(self):
+        @overload
+        def f(x: int) -> str:
+            return "int"
+
+        # with no matching overload the first one registered is used
+        self.assertEqual(f("a"), "int")
+
+        @f.overload
+        def _f_str(x: str) -> str:
+            return "str"
+
+        self.assertEqual(f("a"), "str")
+
+    def test_generic_annotations_are_not_cached(self):
+        @overload
+        def f(x: List[int]) -> str:
+            return "ints"
+
+        @f.overload
+        def _f_str(x: List[str]) -> str:
+            return "strs"
+
+        self.assertEqual(f([1, 2]), "ints")
+        self.assertEqual(f(["a"]), "strs")
+        self.assertEqual(f._dispatch_cache, {})
+
+    def test_kwargs(self):
+        @overload
+        def f(x: int) -> str:
+            return "int"
+
+        @f.overload
+        def _f_str(x: str) -> str:
+            return "str"
+
+        self.assertEqual(f(x="a"), "str")
+
+    def test_overload_meta(self):
+        class A(metaclass=OverloadMeta):
+            @OverloadMeta.overload
+            def f(self, x: int) -> str:
+                return "int"
+
+            @f.overload
+            def _f_str(self, x: str) -> str:
+                return "str"
+
+        a = A()
+        self.assertEqual(a.f(1), "int")
+        self.assertEqual(a.f("a"), "str")
+        self.assertEqual(a.f("b"), "str")
+
+    def test_explicit_global_overload(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+
+            @explicit_global_overload(int)
+            def g(x):
+                return "int"
+
+            @explicit_global_overload(str)
+            def g(x):  # pylint: disable=function-redefined
+                return "str"
+
+        for _ in range(2):
+            self.assertEqual(g(1), "int")
+            self.assertEqual(g("a"), "str")
+
+
+if __name__ == '__main__':
+    unittest.main()
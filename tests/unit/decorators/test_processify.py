@@ -0,0 +1,71 @@
+import os
+import unittest
+
+try:
+    from danielutils.decorators.processify import processify, shutdown_processify_pool  # type:ignore
+except:
+    # python == 3.9.0
+    from ...danielutils.decorators.processify import processify, shutdown_processify_pool  # type:ignore
+
+
+@processify
+def square(x: int) -> int:
+    return x * x
+
+
+@processify
+def get_pid() -> int:
+    return os.getpid()
+
+
+@processify
+def fail(message: str) -> None:
+    raise ValueError(message)
+
+
+@processify(shared_memory=True, shared_memory_threshold=16)
+def checksum(data: bytes, extra: int = 0) -> int:
+    return sum(data) + extra
+
+
+@processify
+def nested(x: int) -> int:
+    return square(x).result() + 1
+
+
+class TestProcessify(unittest.TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_processify_pool()
+
+    def test_returns_result(self):
+        self.assertEqual(square(7).result(timeout=30), 49)
+
+    def test_runs_in_another_process(self):
+        self.assertNotEqual(get_pid().result(timeout=30), os.getpid())
+
+    def test_pool_is_reused(self):
+        pids = {get_pid().result(timeout=30) for _ in range(20)}
+        self.assertLessEqual(len(pids), os.cpu_count() or 1)
+
+    def test_propagates_exception(self):
+        with self.assertRaises(ValueError):
+            fail("boom").result(timeout=30)
+
+    def test_shared_memory_arguments(self):
+        data = bytes(range(256)) * 64
+        self.assertEqual(checksum(data, extra=1).result(timeout=30), sum(data) + 1)
+        self.assertEqual(checksum(b"tiny").result(timeout=30), sum(b"tiny"))
+
+    def test_nested_call_runs_in_place(self):
+        self.assertEqual(nested(3).result(timeout=30), 10)
+
+    def test_rejects_local_functions(self):
+        with self.assertRaises(ValueError):
+            @processify
+            def local() -> None:
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
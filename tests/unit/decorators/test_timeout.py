@@ -0,0 +1,146 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+try:
+    from danielutils.decorators.timeout import timeout  # type:ignore
+except:
+    # python == 3.9.0
+    from ...danielutils.decorators.timeout import timeout  # type:ignore
+
+
+@timeout(0.2, mode="process")
+def spin_forever() -> None:
+    while True:
+        pass
+
+
+@timeout(5, mode="process")
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+@timeout(5, mode="process")
+def exit_in_child() -> None:
+    os._exit(3)  # pylint: disable=protected-access
+
+
+def busy_loop(seconds: float) -> int:
+    end = time.monotonic() + seconds
+    i = 0
+    while time.monotonic() < end:
+        i += 1
+    return i
+
+
+class TestTimeout(unittest.TestCase):
+    def test_returns_value(self):
+        for mode in ("auto", "watchdog"):
+            self.assertEqual(timeout(1, mode=mode)(lambda x: x * 2)(21), 42)
+
+    def test_raises_timeout(self):
+        for mode in ("auto", "watchdog"):
+            with self.assertRaises(TimeoutError):
+                timeout(0.1, mode=mode)(busy_loop)(5)
+
+    def test_timeout_is_not_swallowed_by_broad_except(self):
+        @timeout(0.1, mode="watchdog")
+        def swallow() -> None:
+            try:
+                busy_loop(5)
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass
+
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            swallow()
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_silent(self):
+        self.assertIsNone(timeout(0.1, silent=True, mode="watchdog")(busy_loop)(5))
+
+    def test_propagates_exception(self):
+        def fail() -> None:
+            raise KeyError("x")
+
+        with self.assertRaises(KeyError):
+            timeout(1, mode="watchdog")(fail)()
+
+    def test_watchdog_from_thread(self):
+        results = []
+
+        def target() -> None:
+            try:
+                timeout(0.1)(busy_loop)(5)
+            except TimeoutError:
+                results.append("timeout")
+
+        threads = [threading.Thread(target=target) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(results, ["timeout"] * 4)
+
+    def test_no_thread_per_call(self):
+        f = timeout(1, mode="watchdog")(lambda: threading.active_count())
+        f()
+        before = threading.active_count()
+        for _ in range(50):
+            f()
+        self.assertEqual(threading.active_count(), before)
+
+    def test_late_deadline_does_not_leak(self):
+        # deadlines which pass right as the function returns must neither escape nor stay pending
+        for duration in (0.001, 0.002, 0.005):
+            f = timeout(duration, mode="watchdog")(busy_loop)
+            for _ in range(20):
+                try:
+                    f(duration)
+                except TimeoutError:
+                    pass
+        try:
+            busy_loop(0.2)
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            self.fail(f"a stale timeout interrupt escaped: {e!r}")
+
+        calls = []
+
+        def profile(frame, event, arg):  # pylint: disable=unused-argument
+            calls.append(event)
+
+        done = threading.Event()
+
+        def profiled() -> None:
+            sys.setprofile(profile)
+            try:
+                busy_loop(0.01)
+            finally:
+                sys.setprofile(None)
+                done.set()
+
+        thread = threading.Thread(target=profiled, daemon=True)
+        thread.start()
+        thread.join(5)
+        self.assertTrue(done.is_set(), "a sys.setprofile callback hung after a stale timeout")
+        self.assertIn("call", calls)
+
+    def test_process_died_without_result(self):
+        with self.assertRaises(RuntimeError) as cm:
+            exit_in_child()
+        self.assertIn("exited with code 3", str(cm.exception))
+
+    def test_process_mode(self):
+        self.assertEqual(add(1, 2), 3)
+        with self.assertRaises(TimeoutError):
+            spin_forever()
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            timeout(1, mode="nope")
+
+
+if __name__ == '__main__':
+    unittest.main()
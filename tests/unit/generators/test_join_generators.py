@@ -1,3 +1,5 @@
+import asyncio
+import threading
 import unittest
 from typing import Generator
 import time
@@ -5,16 +7,20 @@ import time
 import pytest
 
 try:
-    from danielutils.generators.join_generators import join_generators, join_generators_busy_waiting  # type:ignore
+    from danielutils.generators.join_generators import join_generators, join_generators_busy_waiting, \
+        ajoin_generators  # type:ignore
 except:
     # python == 3.9.0
-    from ...danielutils.generators.join_generators import join_generators, join_generators_busy_waiting  # type:ignore
+    from ...danielutils.generators.join_generators import join_generators, join_generators_busy_waiting, \
+        ajoin_generators  # type:ignore
 
 pytestmark = pytest.mark.xdist_group("join_generators")
 
 EXPECTED = [(0, 0), (0, 1), (0, 2), (0, 3), (1, 0), (0, 4), (0, 5), (1, 1), (0, 6),
             (1, 2), (0, 7), (1, 3), (0, 8), (1, 4), (1, 5), (0, 9), (1, 6), (1, 7), (1, 8),
             (1, 9)]
+# (0, 9) and (1, 5) are both due 2.25 seconds after the start, either may come first
+EXPECTED_TIE = EXPECTED[:14] + [EXPECTED[15], EXPECTED[14]] + EXPECTED[16:]
 
 
 class TestJoinGenerators(unittest.TestCase):
@@ -43,7 +49,7 @@ class TestJoinGenerators(unittest.TestCase):
         for v in join_generators_busy_waiting(gen1(), gen2()):
             res.append(v)
 
-        self.assertListEqual(EXPECTED, res)
+        self.assertIn(res, [EXPECTED, EXPECTED_TIE])
 
     @unittest.skip("TODO: fix join_generators semaphore interleaving under parallel CI load")
     def test_simple_case2(self):
@@ -66,3 +72,148 @@ class TestJoinGenerators(unittest.TestCase):
             res.append(v)
 
         self.assertListEqual(EXPECTED, res)
+
+
+class TestJoinGeneratorsBehaviour(unittest.TestCase):
+    def test_yields_everything_with_source_index(self):
+        res = list(join_generators(iter(range(100)), iter("abc"), iter([])))
+        self.assertEqual([v for i, v in res if i == 0], list(range(100)))
+        self.assertEqual([v for i, v in res if i == 1], list("abc"))
+
+    def test_buffer_limits_read_ahead(self):
+        produced = []
+
+        def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        joined = join_generators(source(), buffer_size=4)
+        next(joined)
+        time.sleep(0.1)
+        # 4 buffered values plus one held by the producer waiting for a slot
+        self.assertLessEqual(len(produced), 6)
+        joined.close()
+
+    def test_exception_propagates_and_stops_other_sources(self):
+        stopped = threading.Event()
+
+        def failing():
+            yield 1
+            raise ValueError("boom")
+
+        def endless():
+            try:
+                while True:
+                    yield 0
+            finally:
+                stopped.set()
+
+        with self.assertRaises(ValueError):
+            for _ in join_generators(failing(), endless(), buffer_size=2):
+                pass
+        self.assertTrue(stopped.wait(2))
+
+    def test_early_termination_closes_sources(self):
+        stopped = threading.Event()
+
+        def endless():
+            try:
+                while True:
+                    yield 0
+            finally:
+                stopped.set()
+
+        for _ in join_generators(endless()):
+            break
+        self.assertTrue(stopped.wait(2))
+
+    def test_threads_are_reused(self):
+        list(join_generators(iter(range(3))))
+        time.sleep(0.05)
+        threads = threading.active_count()
+        for _ in range(5):
+            list(join_generators(iter(range(3)), iter(range(3))))
+        self.assertLessEqual(threading.active_count(), threads + 2)
+
+
+class TestAsyncJoinGenerators(unittest.TestCase):
+    def test_merges_async_and_sync_sources(self):
+        async def source(n, delay):
+            for i in range(n):
+                await asyncio.sleep(delay)
+                yield i
+
+        async def main():
+            return [item async for item in ajoin_generators(source(3, 0.03), source(2, 0.01), ["x"])]
+
+        res = asyncio.run(main())
+        self.assertEqual(sorted(res, key=str), sorted([(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (2, "x")], key=str))
+        self.assertLess(res.index((1, 1)), res.index((0, 2)))
+
+    def test_blocking_sync_source_does_not_stall_the_loop(self):
+        def blocking():
+            time.sleep(0.5)
+            yield "slow"
+
+        async def ticks():
+            for i in range(5):
+                await asyncio.sleep(0.01)
+                yield i
+
+        async def main():
+            start = time.monotonic()
+            arrivals = {}
+            async for index, value in ajoin_generators(blocking(), ticks()):
+                arrivals[(index, value)] = time.monotonic() - start
+            return arrivals
+
+        arrivals = asyncio.run(main())
+        self.assertLess(arrivals[(1, 4)], 0.3)
+        self.assertGreaterEqual(arrivals[(0, "slow")], 0.5)
+
+    def test_early_termination_closes_sync_sources(self):
+        stopped = threading.Event()
+
+        def endless():
+            try:
+                while True:
+                    yield 0
+            finally:
+                stopped.set()
+
+        async def main():
+            joined = ajoin_generators(endless())
+            async for _ in joined:
+                break
+            await joined.aclose()
+
+        asyncio.run(main())
+        self.assertTrue(stopped.wait(2))
+
+    def test_exception_and_early_termination(self):
+        closed = []
+
+        async def endless():
+            try:
+                while True:
+                    yield 0
+                    await asyncio.sleep(0)
+            finally:
+                closed.append(True)
+
+        async def failing():
+            yield 1
+            raise ValueError("boom")
+
+        async def main():
+            with self.assertRaises(ValueError):
+                async for _ in ajoin_generators(endless(), failing(), buffer_size=2):
+                    pass
+            joined = ajoin_generators(endless())
+            async for _ in joined:
+                break
+            await joined.aclose()
+
+        asyncio.run(main())
+        self.assertEqual(closed, [True, True])
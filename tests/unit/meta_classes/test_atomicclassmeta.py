@@ -1,10 +1,12 @@
+import threading
 import time
+import unittest
 try:
-    from danielutils.metaclasses.atomic_class_meta import AtomicClassMeta  # type:ignore
+    from danielutils.metaclasses.atomic_class_meta import AtomicClassMeta, read_only  # type:ignore
     from danielutils import threadify  # type:ignore
 except:
     # python == 3.9.0
-    from ...danielutils.metaclasses.atomic_class_meta import AtomicClassMeta  # type:ignore
+    from ...danielutils.metaclasses.atomic_class_meta import AtomicClassMeta, read_only  # type:ignore
     from ...danielutils import threadify  # type:ignore
 
 
@@ -39,6 +41,123 @@ def main() -> None:
         thread_main2(i)
 
 
+class Counter(metaclass=AtomicClassMeta):
+    def __init__(self) -> None:
+        self.value = 0
+
+    def increment(self) -> None:
+        value = self.value
+        time.sleep(0)
+        self.value = value + 1
+
+    def add(self, n: int) -> None:
+        for _ in range(n):
+            self.increment()
+
+    @staticmethod
+    def name() -> str:
+        return "counter"
+
+    @classmethod
+    def create(cls) -> "Counter":
+        return cls()
+
+
+class Slow(metaclass=AtomicClassMeta):
+    def work(self) -> None:
+        time.sleep(0.2)
+
+
+class Store(metaclass=AtomicClassMeta, lock_mode="rw"):
+    def __init__(self) -> None:
+        self.data: dict = {}
+
+    @read_only
+    def get(self, key: str, delay: float = 0) -> object:
+        time.sleep(delay)
+        return self.data.get(key)
+
+    def set(self, key: str, value: object) -> None:
+        self.data[key] = value
+
+
+class TestAtomicClassMeta(unittest.TestCase):
+    def run_threads(self, target, n: int) -> float:
+        threads = [threading.Thread(target=target) for _ in range(n)]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+        return time.monotonic() - start
+
+    def test_methods_of_an_instance_are_atomic(self):
+        c = Counter()
+        self.run_threads(lambda: c.add(200), 4)
+        self.assertEqual(c.value, 800)
+
+    def test_lock_is_reentrant(self):
+        c = Counter()
+        c.add(3)
+        self.assertEqual(c.value, 3)
+
+    def test_instances_do_not_block_each_other(self):
+        instances = [Slow() for _ in range(4)]
+        it = iter(instances)
+        lock = threading.Lock()
+
+        def target() -> None:
+            with lock:
+                s = next(it)
+            s.work()
+
+        self.assertLess(self.run_threads(target, 4), 0.6)
+
+    def test_same_instance_is_serialized(self):
+        s = Slow()
+        self.assertGreaterEqual(self.run_threads(s.work, 3), 0.55)
+
+    def test_static_and_class_methods(self):
+        self.assertEqual(Counter.name(), "counter")
+        self.assertEqual(Counter().name(), "counter")
+        self.assertIsInstance(Counter.create(), Counter)
+
+    def test_readers_run_concurrently(self):
+        store = Store()
+        store.set("a", 1)
+        self.assertEqual(store.get("a"), 1)
+        self.assertLess(self.run_threads(lambda: store.get("a", 0.2), 4), 0.6)
+
+    def test_writer_excludes_readers(self):
+        store = Store()
+        results = []
+
+        def reader() -> None:
+            results.append(store.get("a", 0.1))
+
+        def writer() -> None:
+            store.set("a", 1)
+
+        t = threading.Thread(target=reader)
+        t.start()
+        time.sleep(0.02)
+        writer()
+        t.join()
+        self.assertEqual(results, [None])
+        self.assertEqual(store.get("a"), 1)
+
+    def test_invalid_lock_mode(self):
+        with self.assertRaises(ValueError):
+            class Bad(metaclass=AtomicClassMeta, lock_mode="nope"):  # pylint: disable=unused-variable
+                pass
+
+    def test_function_mode(self):
+        class Legacy(metaclass=AtomicClassMeta, lock_mode="function"):
+            def f(self) -> int:
+                return 1
+
+        self.assertEqual(Legacy().f(), 1)
+
+
 if __name__ == "__main__":
     main()
-# TODO make this into a test
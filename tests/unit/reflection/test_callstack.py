@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    from danielutils.reflection.interpreter import callstack
+    from danielutils.reflection.interpreter.callstack import get_current_frame, get_prev_frame, \
+        get_prev_line_of_code, get_source_line
+except ImportError:
+    from ...danielutils.reflection.interpreter import callstack
+    from ...danielutils.reflection.interpreter.callstack import get_current_frame, get_prev_frame, \
+        get_prev_line_of_code, get_source_line
+
+
+def inner(n):
+    return get_prev_frame(n)
+
+
+def outer(n):
+    return inner(n)
+
+
+def line_of(n):
+    line = get_prev_line_of_code(n)
+    return line
+
+
+def calls_line_of(n):
+    return line_of(n)  # the calling line
+
+
+class TestCallstack(unittest.TestCase):
+    def test_frames(self):
+        self.assertEqual(get_current_frame().f_code.co_name, "test_frames")
+        self.assertEqual(outer(0).f_code.co_name, "get_prev_frame")
+        self.assertEqual(outer(1).f_code.co_name, "inner")
+        self.assertEqual(outer(2).f_code.co_name, "outer")
+        self.assertIsNone(get_prev_frame(10 ** 6))
+
+    def test_prev_line_of_code(self):
+        self.assertEqual(calls_line_of(0).strip(), "line = get_prev_line_of_code(n)")
+        self.assertEqual(calls_line_of(1).strip(), "return line_of(n)  # the calling line")
+        self.assertIsNone(get_prev_line_of_code(10 ** 6))
+
+    def test_source_line_is_cached_and_invalidated(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "module.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("a = 1\nb = 2\n")
+            self.assertEqual(get_source_line(path, 2), "b = 2\n")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("a = 1\nbb = 22\n")
+            with mock.patch.object(callstack, "SOURCE_CHECK_INTERVAL", 60), \
+                    mock.patch("builtins.open", side_effect=AssertionError("read from disk")):
+                # trusted until the next check
+                self.assertEqual(get_source_line(path, 2), "b = 2\n")
+            with mock.patch.object(callstack, "SOURCE_CHECK_INTERVAL", 0):
+                self.assertEqual(get_source_line(path, 2), "bb = 22\n")
+            self.assertIsNone(get_source_line(path, 3))
+        self.assertIsNone(get_source_line(os.path.join(folder, "missing.py"), 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
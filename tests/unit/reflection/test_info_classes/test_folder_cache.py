@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+
+from danielutils.reflection.info_classes.folder_cache import FolderAnalysisCache
+from danielutils.reflection.info_classes.folder_info import FolderAnalyzer
+
+from .test_folder_info import write, without_access_times, PYTHON_SOURCE
+
+
+class TestFolderAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "project")
+        self.cache_path = os.path.join(self._tmp.name, "cache.json")
+        write(os.path.join(self.root, "main.py"), PYTHON_SOURCE)
+        write(os.path.join(self.root, "README.md"), "hello")
+        write(os.path.join(self.root, "a", "mod.py"), PYTHON_SOURCE)
+        write(os.path.join(self.root, "b", "other.py"), PYTHON_SOURCE * 2)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def analyze(self, **kwargs) -> tuple:
+        cache = FolderAnalysisCache(self.cache_path, **kwargs)
+        info = FolderAnalyzer({"__pycache__"}, max_workers=1, cache=cache).analyze_folder(self.root)
+        return info, cache
+
+    def test_results_match_an_uncached_analysis(self):
+        uncached = without_access_times(
+            FolderAnalyzer({"__pycache__"}, max_workers=1).analyze_folder(self.root).to_dict())
+        first, _ = self.analyze()
+        second, cache = self.analyze()
+        self.assertEqual((cache.hits, cache.misses), (3, 0))
+        for info in (first, second):
+            self.assertEqual(without_access_times(info.to_dict()), uncached)
+
+    def test_only_changed_folders_are_rolled_up(self):
+        self.analyze()
+        path = os.path.join(self.root, "a", "mod.py")
+        write(path, PYTHON_SOURCE * 3)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        info, cache = self.analyze()
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(info.total_lines, 6 * 6)
+        with open(self.cache_path, encoding="utf-8") as f:
+            folders = json.load(f)["folders"]
+        self.assertEqual(folders[os.path.join(info.path, "a")]["total_lines"], 18)
+        self.assertEqual(folders[info.path]["total_lines"], 36)
+
+    def test_hash_contents_survives_touch(self):
+        self.analyze(hash_contents=True)
+        path = os.path.join(self.root, "main.py")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        _, cache = self.analyze(hash_contents=True)
+        self.assertEqual((cache.hits, cache.misses), (3, 0))
+
+    def test_deleted_entries_are_pruned(self):
+        self.analyze()
+        os.remove(os.path.join(self.root, "b", "other.py"))
+        os.rmdir(os.path.join(self.root, "b"))
+        info, _ = self.analyze()
+        with open(self.cache_path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertNotIn(os.path.join(info.path, "b"), data["folders"])
+        self.assertEqual(len(data["files"]), 2)
+
+    def test_corrupt_cache_file_is_ignored(self):
+        write(self.cache_path, "{not json")
+        info, cache = self.analyze()
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        self.assertEqual(info.python_files, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
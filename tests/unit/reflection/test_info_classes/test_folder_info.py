@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from danielutils.reflection.info_classes.folder_info import FolderAnalyzer, analyze_folder
+
+
+def write(path: str, content: str = "") -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def without_access_times(folder: dict) -> dict:
+    # reading the files updates their access times
+    folder.pop("accessed_time")
+    for file in folder["files"]:
+        file.pop("accessed_time")
+    for subfolder in folder["subfolders"]:
+        without_access_times(subfolder)
+    return folder
+
+
+PYTHON_SOURCE = "import os\n\n# comment\nclass A:\n    def f(self):\n        pass\n"
+
+
+class TestFolderAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        write(os.path.join(self.root, "main.py"), PYTHON_SOURCE)
+        write(os.path.join(self.root, "README.md"), "hello")
+        write(os.path.join(self.root, "debug.log"), "x")
+        write(os.path.join(self.root, "pkg", "mod.py"), PYTHON_SOURCE)
+        write(os.path.join(self.root, "pkg", "deep", "data.txt"), "1234")
+        write(os.path.join(self.root, "__pycache__", "main.cpython-311.pyc"), "")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_analyze_folder(self):
+        info = analyze_folder(self.root, blacklist={"__pycache__", "*.log"})
+        info.compute_statistics()
+        self.assertEqual(info.path, str(Path(self.root).absolute()))
+        self.assertEqual(info.total_files, 4)
+        self.assertEqual(info.python_files, 2)
+        self.assertEqual(info.total_lines, 12)
+        self.assertEqual(info.excluded_files, 1)
+        self.assertEqual(info.excluded_folders, 1)
+        self.assertEqual(sorted(f.name for f in info.get_python_files()), ["main.py", "mod.py"])
+        main = next(f for f in info.files if f.name == "main.py")
+        self.assertEqual((main.classes, main.functions, main.comment_lines), (1, 1, 1))
+        self.assertEqual(main.path, os.path.join(self.root, "main.py"))
+        self.assertIsNotNone(main.modified_time)
+
+    def test_max_depth(self):
+        info = FolderAnalyzer(blacklist={"__pycache__"}).analyze_folder(self.root, max_depth=0)
+        pkg = info.subfolders[0]
+        self.assertEqual((pkg.name, pkg.files, pkg.subfolders), ("pkg", [], []))
+
+    def test_blacklist_patterns(self):
+        analyzer = FolderAnalyzer(blacklist={"*.pyc", "lib", "build/", "._*"})
+        self.assertTrue(analyzer.is_blacklisted(Path("x/foo.pyc")))
+        self.assertTrue(analyzer.is_blacklisted(Path("a/lib/x.py")))
+        # non glob patterns match anywhere in the path
+        self.assertTrue(analyzer.is_blacklisted("x/calibrate.py"))
+        self.assertTrue(analyzer.is_blacklisted("a/build"))
+        self.assertTrue(analyzer.is_blacklisted("._hidden"))
+        self.assertFalse(analyzer.is_blacklisted("a/build.py"))
+        self.assertFalse(analyzer.is_blacklisted("src/main.py"))
+        analyzer.blacklist = {"*.py"}
+        self.assertTrue(analyzer.is_blacklisted("src/main.py"))
+
+    def test_process_pool_gives_the_same_result(self):
+        for i in range(40):
+            write(os.path.join(self.root, "many", f"m{i}.py"), PYTHON_SOURCE * (i + 1))
+        serial = without_access_times(FolderAnalyzer({"__pycache__"}, max_workers=1).analyze_folder(self.root).to_dict())
+        parallel = without_access_times(FolderAnalyzer({"__pycache__"}, max_workers=2).analyze_folder(self.root).to_dict())
+        self.assertEqual(serial, parallel)
+        self.assertEqual(serial["python_files"], 42)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            FolderAnalyzer(max_workers=0)
+        with self.assertRaises(ValueError):
+            analyze_folder(os.path.join(self.root, "missing"))
+
+
+if __name__ == '__main__':
+    unittest.main()
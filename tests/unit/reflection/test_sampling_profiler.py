@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+
+try:
+    from danielutils.reflection.interpreter.sampling_profiler import SamplingProfiler
+except ImportError:
+    from ...danielutils.reflection.interpreter.sampling_profiler import SamplingProfiler
+
+
+def spin(seconds: float) -> int:
+    end = time.monotonic() + seconds
+    i = 0
+    while time.monotonic() < end:
+        i += 1
+    return i
+
+
+def hot(seconds: float) -> int:
+    return spin(seconds)
+
+
+def sleeper(event: threading.Event) -> None:
+    event.wait()
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_call_tree_and_top(self):
+        with SamplingProfiler(interval=0.002, threads=[threading.current_thread()]) as profiler:
+            hot(0.3)
+        self.assertFalse(profiler.is_running)
+        self.assertGreater(profiler.samples, 10)
+        top = profiler.top(1)[0]
+        self.assertEqual(top.name, "spin")
+        self.assertGreater(top.self_count, profiler.samples // 2)
+        by_total = {stats.name: stats for stats in profiler.top(50, by="total")}
+        self.assertGreaterEqual(by_total["hot"].total_count, top.self_count)
+        self.assertEqual(by_total["hot"].self_count, 0)
+
+        root = profiler.call_tree()
+        self.assertEqual(root.total_count, profiler.samples)
+
+        def find(node, name):
+            if node.code is not None and node.code.co_name == name:
+                return node
+            for child in node.children.values():
+                found = find(child, name)
+                if found is not None:
+                    return found
+            return None
+
+        hot_node = find(root, "hot")
+        self.assertEqual(list(c.code.co_name for c in hot_node.children.values()), ["spin"])
+        self.assertEqual(hot_node.total_count, sum(c.total_count for c in hot_node.children.values()))
+
+    def test_collapsed(self):
+        with SamplingProfiler(interval=0.002, threads=[threading.get_ident()]) as profiler:
+            hot(0.1)
+        lines = profiler.collapsed().splitlines()
+        self.assertEqual(sum(int(line.rsplit(" ", 1)[1]) for line in lines), profiler.samples)
+        self.assertTrue(any("hot (test_sampling_profiler.py:" in line and ";spin (" in line for line in lines))
+
+    def test_thread_selection(self):
+        event = threading.Event()
+        thread = threading.Thread(target=sleeper, args=(event,))
+        thread.start()
+        try:
+            with SamplingProfiler(interval=0.002, threads=[thread], max_depth=2) as profiler:
+                hot(0.05)
+        finally:
+            event.set()
+            thread.join()
+        self.assertGreater(profiler.samples, 0)
+        names = {stats.name for stats in profiler.top(50, by="total")}
+        self.assertNotIn("hot", names)
+        self.assertIn("Event.wait", names)
+        self.assertTrue(all(line.count(";") <= 1 for line in profiler.collapsed().splitlines()))
+
+    def test_reset_and_invalid_arguments(self):
+        profiler = SamplingProfiler(interval=0.002)
+        profiler.start()
+        with self.assertRaises(RuntimeError):
+            profiler.start()
+        profiler.stop()
+        profiler.reset()
+        self.assertEqual((profiler.samples, profiler.collapsed(), profiler.top()), (0, "", []))
+        with self.assertRaises(ValueError):
+            SamplingProfiler(interval=0)
+        with self.assertRaises(ValueError):
+            SamplingProfiler(max_depth=0)
+        with self.assertRaises(ValueError):
+            profiler.top(by="calls")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import io
+import unittest
+
+try:
+    from danielutils.reflection.interpreter.tracer import Tracer, ConsoleTracer, AggregatingTracer, HAS_MONITORING
+except ImportError:
+    from ...danielutils.reflection.interpreter.tracer import Tracer, ConsoleTracer, AggregatingTracer, \
+        HAS_MONITORING
+
+CALL, RETURN = Tracer.EventType.CALL, Tracer.EventType.RETURN
+C_CALL = Tracer.EventType.C_CALL
+
+
+def leaf(x):
+    return len([x])
+
+
+def middle(x):
+    return leaf(x) + leaf(x)
+
+
+def outer(n):
+    return sum(middle(i) for i in range(n))
+
+
+def numbers(n):
+    yield from range(n)
+
+
+BACKENDS = ["setprofile"] + (["monitoring"] if HAS_MONITORING else [])
+
+
+class TestTracer(unittest.TestCase):
+    def test_counts(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                with AggregatingTracer(backend=backend) as tracer:
+                    outer(3)
+                self.assertEqual(tracer.counts[(CALL, "middle")], 3)
+                self.assertEqual(tracer.counts[(RETURN, "middle")], 3)
+                self.assertEqual(tracer.counts[(CALL, "leaf")], 6)
+                self.assertEqual(tracer.counts[(C_CALL, "len")], 0)
+
+    def test_generators_and_c_calls(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                with AggregatingTracer(backend=backend, skip_c_call=False) as tracer:
+                    list(numbers(2))
+                    leaf(1)
+                # every resume is a call and every yield a return, like sys.setprofile reports them
+                self.assertEqual(tracer.counts[(CALL, "numbers")], 3)
+                self.assertEqual(tracer.counts[(RETURN, "numbers")], 3)
+                self.assertEqual(tracer.counts[(C_CALL, "len")], 1)
+
+    def test_exclude(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                with AggregatingTracer(backend=backend, exclude={"middle"}) as tracer:
+                    outer(2)
+                    leaf(1)
+                self.assertEqual(tracer.counts[(CALL, "middle")], 0)
+                self.assertEqual(tracer.counts[(CALL, "leaf")], 1)
+                self.assertEqual(tracer.counts[(CALL, "outer")], 1)
+
+    def test_code_filter(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                with AggregatingTracer(backend=backend, code=[leaf]) as tracer:
+                    outer(2)
+                self.assertEqual(set(tracer.counts), {(CALL, "leaf"), (RETURN, "leaf")})
+                self.assertEqual(tracer.counts[(CALL, "leaf")], 4)
+
+    def test_buffered_console_tracer(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                out = io.StringIO()
+                with ConsoleTracer(backend=backend, code=[middle], skip_return=True, buffer_size=2, file=out):
+                    middle(1)
+                    middle(2)
+                    middle(3)
+                    # the third event waits for the next batch
+                    self.assertEqual(out.getvalue().count("middle"), 2)
+                self.assertEqual(out.getvalue().count("EventType.CALL middle"), 3)
+
+    def test_unbuffered_console_tracer(self):
+        out = io.StringIO()
+        with ConsoleTracer(backend=BACKENDS[-1], code=[leaf], file=out):
+            leaf(1)
+            self.assertIn("EventType.RETURN leaf 1", out.getvalue())
+
+    @unittest.skipUnless(HAS_MONITORING, "requires sys.monitoring")
+    def test_monitoring_releases_the_tool_id(self):
+        import sys
+        with AggregatingTracer() as tracer:
+            self.assertEqual(tracer.backend, "monitoring")
+            self.assertEqual(sys.monitoring.get_tool(sys.monitoring.PROFILER_ID), "danielutils.Tracer")
+        self.assertIsNone(sys.monitoring.get_tool(sys.monitoring.PROFILER_ID))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            AggregatingTracer(backend="ptrace")
+        with self.assertRaises(ValueError):
+            AggregatingTracer(buffer_size=-1)
+        with self.assertRaises(TypeError):
+            AggregatingTracer(code=[len])
+        if not HAS_MONITORING:
+            with self.assertRaises(ValueError):
+                AggregatingTracer(backend="monitoring")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+import unittest
+
+try:
+    from danielutils.retry_executor import RetryExecutor, NoBackOffStrategy, CircuitBreaker, CircuitState, \
+        CircuitOpenError  # type:ignore
+    from danielutils.async_ import AsyncRetryExecutor, ConstantTimeStrategy  # type:ignore
+except:
+    # python == 3.9.0
+    from ...danielutils.retry_executor import RetryExecutor, NoBackOffStrategy, CircuitBreaker, CircuitState, \
+        CircuitOpenError  # type:ignore
+    from ...danielutils.async_ import AsyncRetryExecutor, ConstantTimeStrategy  # type:ignore
+
+
+def fail():
+    raise ValueError("down")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_at_failure_rate_after_minimum_calls(self):
+        breaker = CircuitBreaker(failure_rate_threshold=0.5, window_size=4, minimum_calls=4)
+        for outcome in (True, False, True):
+            self.assertTrue(breaker.try_acquire())
+            breaker.record_failure() if outcome else breaker.record_success()
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        # the window [S, F, S, F] has reached the threshold
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        self.assertFalse(breaker.try_acquire())
+
+    def test_sliding_window_forgets_old_failures(self):
+        breaker = CircuitBreaker(failure_rate_threshold=0.75, window_size=4, minimum_calls=4)
+        breaker.record_failure()
+        breaker.record_failure()
+        for _ in range(4):
+            breaker.record_success()
+        self.assertEqual(breaker.failure_rate, 0.0)
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+    def test_half_open_probes(self):
+        breaker = CircuitBreaker(window_size=1, minimum_calls=1, open_duration=0.05, half_open_max_calls=2)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+        self.assertTrue(breaker.try_acquire())
+        self.assertTrue(breaker.try_acquire())
+        self.assertFalse(breaker.try_acquire())
+        breaker.record_success()
+        self.assertFalse(breaker.try_acquire())
+        breaker.release()
+        self.assertTrue(breaker.try_acquire())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+    def test_probe_failure_reopens(self):
+        breaker = CircuitBreaker(window_size=1, minimum_calls=1, open_duration=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        self.assertTrue(breaker.try_acquire())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+
+    def test_outcomes_of_earlier_generations_are_ignored(self):
+        breaker = CircuitBreaker(window_size=2, minimum_calls=2, open_duration=0.05)
+        slow = breaker.try_acquire()
+        for _ in range(2):
+            breaker.record_failure(breaker.try_acquire())
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        time.sleep(0.06)
+        probe = breaker.try_acquire()
+        self.assertIsNotNone(probe)
+        self.assertNotEqual(probe, slow)
+        # the call granted before the breaker opened must not decide the probe's outcome
+        breaker.record_failure(slow)
+        self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+        breaker.record_success(probe)
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        breaker.release(probe)
+        breaker.record_failure(slow)
+        self.assertEqual(breaker.failure_rate, 0.0)
+
+    def test_thread_safety(self):
+        breaker = CircuitBreaker(failure_rate_threshold=1.0, window_size=1000, minimum_calls=1000)
+
+        def work():
+            for _ in range(500):
+                if breaker.try_acquire():
+                    breaker.record_success()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(breaker.failure_rate, 0.0)
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+
+class TestExecutorsWithCircuitBreaker(unittest.TestCase):
+    def test_retry_executor_fails_fast_when_open(self):
+        breaker = CircuitBreaker(window_size=2, minimum_calls=2, open_duration=60)
+        executor = RetryExecutor(NoBackOffStrategy(), circuit_breaker=breaker)
+        calls = []
+
+        def supp():
+            calls.append(1)
+            fail()
+
+        self.assertIsNone(executor.execute(supp, max_retries=5))
+        self.assertEqual(len(calls), 2)
+        self.assertIsNone(executor.execute(supp, max_retries=5))
+        self.assertEqual(len(calls), 2)
+
+    def test_async_retry_executor_raises_when_open(self):
+        breaker = CircuitBreaker(window_size=1, minimum_calls=1, open_duration=60)
+        executor = AsyncRetryExecutor(ConstantTimeStrategy(1), ConstantTimeStrategy(0), circuit_breaker=breaker)
+
+        async def func():
+            fail()
+
+        with self.assertRaises(ValueError):
+            asyncio.run(executor.execute(func))
+        with self.assertRaises(CircuitOpenError):
+            asyncio.run(executor.execute(func))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import time
+import unittest
+
+try:
+    from danielutils.async_ import AsyncRetryExecutor, ConstantTimeStrategy  # type:ignore
+except:
+    # python == 3.9.0
+    from ...danielutils.async_ import AsyncRetryExecutor, ConstantTimeStrategy  # type:ignore
+
+
+class SlowFirstCall:
+    def __init__(self, slow: float = 2.0, fast: float = 0.02) -> None:
+        self.slow = slow
+        self.fast = fast
+        self.started = 0
+        self.cancelled = 0
+        self.__name__ = type(self).__name__
+
+    async def __call__(self) -> int:
+        index = self.started
+        self.started += 1
+        try:
+            await asyncio.sleep(self.slow if index == 0 else self.fast)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return index
+
+
+def executor(**kwargs) -> AsyncRetryExecutor:
+    return AsyncRetryExecutor(ConstantTimeStrategy(5), ConstantTimeStrategy(0), **kwargs)
+
+
+class TestHedging(unittest.TestCase):
+    def test_hedge_wins_and_loser_is_cancelled(self):
+        func = SlowFirstCall()
+        start = time.monotonic()
+        self.assertEqual(asyncio.run(executor(hedge_delay=0.05).execute(func)), 1)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(func.started, 2)
+        self.assertEqual(func.cancelled, 1)
+
+    def test_no_hedge_when_attempt_is_fast(self):
+        func = SlowFirstCall(slow=0.01)
+        self.assertEqual(asyncio.run(executor(hedge_delay=0.5).execute(func)), 0)
+        self.assertEqual(func.started, 1)
+
+    def test_max_hedges_per_attempt(self):
+        func = SlowFirstCall(slow=0.3, fast=0.3)
+        self.assertEqual(asyncio.run(executor(hedge_delay=0.02, max_hedges=2).execute(func)), 0)
+        self.assertEqual(func.started, 3)
+
+    def test_outstanding_hedges_are_capped(self):
+        funcs = [SlowFirstCall(slow=0.3, fast=0.3) for _ in range(5)]
+        shared = executor(hedge_delay=0.02, max_outstanding_hedges=2)
+
+        async def main():
+            return await asyncio.gather(*(shared.execute(f) for f in funcs))
+
+        asyncio.run(main())
+        self.assertEqual(sum(f.started for f in funcs), 5 + 2)
+        self.assertEqual(shared._outstanding_hedges, 0)
+
+    def test_percentile_delay_from_observed_latencies(self):
+        shared = executor(hedge_percentile=90)
+        fast = SlowFirstCall(slow=0.01)
+
+        async def main():
+            for _ in range(10):
+                fast.started = 0
+                await shared.execute(fast)
+            slow = SlowFirstCall()
+            start = time.monotonic()
+            result = await shared.execute(slow)
+            return result, time.monotonic() - start
+
+        result, duration = asyncio.run(main())
+        self.assertEqual(result, 1)
+        self.assertLess(duration, 1)
+
+    def test_failure_of_all_calls_propagates(self):
+        async def fail():
+            await asyncio.sleep(0.05)
+            raise KeyError("x")
+
+        with self.assertRaises(KeyError):
+            asyncio.run(executor(hedge_delay=0.01).execute(fail))
+
+    def test_timeout_applies_to_hedged_attempt(self):
+        async def hang():
+            await asyncio.sleep(5)
+
+        shared = AsyncRetryExecutor(ConstantTimeStrategy(0.2), ConstantTimeStrategy(0), hedge_delay=0.05)
+        start = time.monotonic()
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(shared.execute(hang))
+        self.assertLess(time.monotonic() - start, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
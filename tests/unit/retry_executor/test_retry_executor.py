@@ -0,0 +1,152 @@
+import asyncio
+import time
+import unittest
+
+try:
+    from danielutils.retry_executor import RetryExecutor, RetryBudget, ConstantBackOffStrategy, \
+        FullJitterBackOffStrategy, DecorrelatedJitterBackOffStrategy, NoBackOffStrategy  # type:ignore
+    from danielutils.async_ import AsyncRetryExecutor, ConstantTimeStrategy, FullJitterTimeStrategy, \
+        DecorrelatedJitterTimeStrategy  # type:ignore
+except:
+    # python == 3.9.0
+    from ...danielutils.retry_executor import RetryExecutor, RetryBudget, ConstantBackOffStrategy, \
+        FullJitterBackOffStrategy, DecorrelatedJitterBackOffStrategy, NoBackOffStrategy  # type:ignore
+    from ...danielutils.async_ import AsyncRetryExecutor, ConstantTimeStrategy, FullJitterTimeStrategy, \
+        DecorrelatedJitterTimeStrategy  # type:ignore
+
+
+class Flaky:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self) -> str:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ValueError(f"failure {self.calls}")
+        return "ok"
+
+
+class TransientAsyncRetryExecutor(AsyncRetryExecutor):
+    def is_transient(self, e: Exception) -> bool:
+        return isinstance(e, ValueError)
+
+
+class TestJitter(unittest.TestCase):
+    def test_full_jitter_is_bounded_by_wrapped_strategy(self):
+        strategy = FullJitterBackOffStrategy(ConstantBackOffStrategy(100))
+        values = [strategy.get_backoff() for _ in range(200)]
+        self.assertTrue(all(0 <= v <= 100 for v in values))
+        self.assertGreater(len(set(values)), 1)
+
+    def test_decorrelated_jitter_stays_between_base_and_cap(self):
+        strategy = DecorrelatedJitterBackOffStrategy(10, 500)
+        values = [strategy.get_backoff() for _ in range(200)]
+        self.assertTrue(all(10 <= v <= 500 for v in values))
+        self.assertEqual(max(values), 500)
+        with self.assertRaises(ValueError):
+            DecorrelatedJitterBackOffStrategy(10, 5)
+        with self.assertRaises(ValueError):
+            DecorrelatedJitterBackOffStrategy(0, 5)
+
+    def test_time_strategies(self):
+        full = FullJitterTimeStrategy(ConstantTimeStrategy(2))
+        self.assertTrue(all(0 <= full() <= 2 for _ in range(100)))
+        decorrelated = DecorrelatedJitterTimeStrategy(1, 4)
+        self.assertTrue(all(1 <= decorrelated() <= 4 for _ in range(100)))
+        decorrelated.reset()
+        self.assertEqual(decorrelated.current_timeout, 1)
+        with self.assertRaises(ValueError):
+            DecorrelatedJitterTimeStrategy(0, 4)
+
+
+class TestRetryBudget(unittest.TestCase):
+    def test_retries_limited_to_ratio_of_attempts(self):
+        budget = RetryBudget(ratio=0.5, min_retries_per_second=0, max_tokens=1)
+        self.assertTrue(budget.try_acquire_retry())
+        self.assertFalse(budget.try_acquire_retry())
+        budget.record_attempt()
+        self.assertFalse(budget.try_acquire_retry())
+        budget.record_attempt()
+        self.assertTrue(budget.try_acquire_retry())
+
+    def test_reserve_refills_over_time(self):
+        budget = RetryBudget(ratio=0, min_retries_per_second=20, max_tokens=1)
+        self.assertTrue(budget.try_acquire_retry())
+        self.assertFalse(budget.try_acquire_retry())
+        time.sleep(0.1)
+        self.assertTrue(budget.try_acquire_retry())
+
+    def test_shared_budget_stops_retry_storm(self):
+        budget = RetryBudget(ratio=0.25, min_retries_per_second=0, max_tokens=2)
+        executor = RetryExecutor(NoBackOffStrategy(), retry_budget=budget)
+        calls = 0
+        for _ in range(10):
+            flaky = Flaky(100)
+            executor.execute(flaky, max_retries=5)
+            calls += flaky.calls
+        # 10 first attempts, 2 initial tokens and 2 earned tokens
+        self.assertEqual(calls, 14)
+
+
+class TestRetryExecutor(unittest.TestCase):
+    def test_succeeds_after_failures(self):
+        flaky = Flaky(2)
+        self.assertEqual(RetryExecutor(NoBackOffStrategy()).execute(flaky), "ok")
+        self.assertEqual(flaky.calls, 3)
+
+    def test_deadline_stops_before_oversleeping(self):
+        flaky = Flaky(100)
+        start = time.monotonic()
+        self.assertIsNone(RetryExecutor(ConstantBackOffStrategy(100)).execute(flaky, max_retries=100, deadline=0.35))
+        self.assertLess(time.monotonic() - start, 0.35)
+        self.assertEqual(flaky.calls, 4)
+
+
+class TestAsyncRetryExecutor(unittest.TestCase):
+    def test_deadline_cuts_attempts(self):
+        async def slow():
+            await asyncio.sleep(5)
+
+        executor = TransientAsyncRetryExecutor(ConstantTimeStrategy(10), ConstantTimeStrategy(0))
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            asyncio.run(executor.execute(slow, deadline=0.2))
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_deadline_raises_builtin_timeout_error(self):
+        async def slow():
+            await asyncio.sleep(5)
+
+        executor = AsyncRetryExecutor(ConstantTimeStrategy(10), ConstantTimeStrategy(0))
+        with self.assertRaises(TimeoutError) as cm:
+            asyncio.run(executor.execute(slow, deadline=0.2))
+        self.assertIs(type(cm.exception), TimeoutError)
+        self.assertIn("Deadline of 0.2s", str(cm.exception))
+
+    def test_budget_exhausted(self):
+        budget = RetryBudget(ratio=0, min_retries_per_second=0, max_tokens=1)
+        flaky = Flaky(100)
+
+        async def func():
+            return flaky()
+
+        executor = TransientAsyncRetryExecutor(ConstantTimeStrategy(1), ConstantTimeStrategy(0), retry_budget=budget)
+        with self.assertRaises(RuntimeError):
+            asyncio.run(executor.execute(func, max_tries=5))
+        self.assertEqual(flaky.calls, 2)
+
+    def test_delays_before_every_retry(self):
+        flaky = Flaky(2)
+
+        async def func():
+            return flaky()
+
+        executor = TransientAsyncRetryExecutor(ConstantTimeStrategy(1), ConstantTimeStrategy(0.1))
+        start = time.monotonic()
+        self.assertEqual(asyncio.run(executor.execute(func, max_tries=3)), "ok")
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
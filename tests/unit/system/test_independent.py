@@ -0,0 +1,52 @@
+import sys
+import threading
+import time
+import unittest
+
+try:
+    from danielutils.system.independent import acm, cmrt  # type:ignore
+except:
+    # python == 3.9.0
+    from ...danielutils.system.independent import acm, cmrt  # type:ignore
+
+requires_posix = unittest.skipIf(sys.platform == "win32", "requires a POSIX shell")
+
+ECHO_TWICE = f'"{sys.executable}" -c "x = input(); print(x * 2); y = input(); print(y)"'
+
+
+@requires_posix
+class TestCmrt(unittest.TestCase):
+    def test_yields_lines_from_both_streams(self):
+        result = list(cmrt("echo a; echo b >&2; printf c"))
+        self.assertEqual(sorted(result), [(0, b"a\n"), (0, b"c"), (1, b"b\n")])
+
+    def test_yields_in_real_time_without_helper_threads(self):
+        threads = threading.active_count()
+        start = time.monotonic()
+        timings = []
+        for _, line in cmrt("for i in 1 2; do echo $i; sleep 0.3; done"):
+            timings.append(time.monotonic() - start)
+            self.assertEqual(threading.active_count(), threads)
+        self.assertEqual(len(timings), 2)
+        self.assertLess(timings[0], 0.25)
+
+
+@requires_posix
+class TestAcm(unittest.TestCase):
+    def test_interactive_inputs(self):
+        code, stdout, stderr = acm(ECHO_TWICE, ["ab", "cd"], i_timeout=0.5, shell=True)
+        self.assertEqual(code, 0)
+        self.assertEqual(stdout, [b"abab\n", b"cd\n"])
+        self.assertEqual(stderr, [])
+
+    def test_output_after_last_input_is_kept(self):
+        code, stdout, _ = acm("cat", ["a", "b"], i_timeout=0.01)
+        self.assertEqual(code, 0)
+        self.assertEqual(stdout, [b"a\n", b"b\n"])
+
+    def test_without_inputs(self):
+        self.assertEqual(acm("echo hi", shell=True), (0, [b"hi\n"], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
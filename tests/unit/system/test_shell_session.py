@@ -0,0 +1,128 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+try:
+    from danielutils.system.shell_session import ShellSession  # type:ignore
+    from danielutils.system.layered_command import LayeredCommand  # type:ignore
+    from danielutils.async_.async_shell_session import AsyncShellSession  # type:ignore
+    from danielutils.async_.async_layered_command import AsyncLayeredCommand  # type:ignore
+except:
+    # python == 3.9.0
+    from ...danielutils.system.shell_session import ShellSession  # type:ignore
+    from ...danielutils.system.layered_command import LayeredCommand  # type:ignore
+    from ...danielutils.async_.async_shell_session import AsyncShellSession  # type:ignore
+    from ...danielutils.async_.async_layered_command import AsyncLayeredCommand  # type:ignore
+
+requires_posix = unittest.skipIf(sys.platform == "win32", "requires a POSIX shell")
+
+
+@requires_posix
+class TestShellSession(unittest.TestCase):
+    def test_state_persists_between_commands(self):
+        directory = os.path.realpath(tempfile.gettempdir())
+        with ShellSession() as session:
+            self.assertEqual(session.run(f"cd {directory}; export DANIELUTILS_X=5")[0], 0)
+            code, stdout, stderr = session.run("pwd; echo $DANIELUTILS_X")
+        self.assertEqual(code, 0)
+        self.assertEqual(stdout.decode().splitlines(), [directory, "5"])
+        self.assertEqual(stderr, b"")
+
+    def test_exit_code_and_streams(self):
+        with ShellSession() as session:
+            self.assertEqual(session.run("echo out; echo err >&2; exit_code() { return 3; }; exit_code"),
+                             (3, b"out\n", b"err\n"))
+            # output without a trailing newline is kept as is
+            self.assertEqual(session.run("printf 'no newline'"), (0, b"no newline", b""))
+
+    def test_quotes_and_syntax_errors_do_not_break_the_session(self):
+        with ShellSession() as session:
+            self.assertEqual(session.run("echo 'single' \"double\"")[1], b"single double\n")
+            code, _, stderr = session.run("echo \"unterminated")
+            self.assertNotEqual(code, 0)
+            self.assertNotEqual(stderr, b"")
+            self.assertEqual(session.run("echo alive")[1], b"alive\n")
+
+    def test_commands_do_not_consume_the_session_input(self):
+        with ShellSession() as session:
+            self.assertEqual(session.run("read line; echo \"[$line]\"")[1], b"[]\n")
+            self.assertEqual(session.run("echo next")[1], b"next\n")
+
+    def test_large_output(self):
+        with ShellSession() as session:
+            _, stdout, _ = session.run("i=0; while [ $i -lt 20000 ]; do echo line$i; i=$((i+1)); done")
+        lines = stdout.decode().splitlines()
+        self.assertEqual(len(lines), 20000)
+        self.assertEqual(lines[-1], "line19999")
+
+    def test_timeout_closes_session(self):
+        session = ShellSession()
+        session.open()
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            session.run("sleep 5", timeout=0.2)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertFalse(session.is_alive)
+        with self.assertRaises(RuntimeError):
+            session.run("echo 1")
+
+    def test_shell_exit_raises(self):
+        with ShellSession() as session:
+            with self.assertRaises(RuntimeError):
+                session.run("exit 0")
+            self.assertFalse(session.is_alive)
+
+
+@requires_posix
+class TestAsyncShellSession(unittest.TestCase):
+    def test_state_persists_and_runs_are_serialized(self):
+        async def main():
+            async with AsyncShellSession() as session:
+                await session.run("export DANIELUTILS_X=7")
+                return await asyncio.gather(*(session.run(f"echo ${{DANIELUTILS_X}}{i}") for i in range(5)))
+
+        results = asyncio.run(main())
+        self.assertEqual([r[1] for r in results], [f"7{i}\n".encode() for i in range(5)])
+
+    def test_timeout_closes_session(self):
+        async def main():
+            async with AsyncShellSession() as session:
+                with self.assertRaises(TimeoutError):
+                    await session.run("sleep 5", timeout=0.2)
+                self.assertFalse(session.is_alive)
+
+        asyncio.run(main())
+
+
+@requires_posix
+class TestLayeredCommandSession(unittest.TestCase):
+    def test_layers_run_once_and_state_persists(self):
+        with tempfile.TemporaryDirectory() as directory:
+            counter = os.path.join(directory, "layers")
+            with LayeredCommand(f"echo x >> {counter}", session=True, prev_instance=None) as layer:
+                code, stdout, _ = layer("export DANIELUTILS_Y=1")
+                self.assertEqual(code, 0)
+                code, stdout, _ = layer("echo $DANIELUTILS_Y", "echo second")
+                self.assertEqual(stdout, ["1\n", "second\n"])
+            with open(counter) as f:
+                self.assertEqual(f.read(), "x\n")
+
+    def test_async_layers_run_once_and_state_persists(self):
+        async def main():
+            async with AsyncLayeredCommand("export DANIELUTILS_Z=3", session=True) as layer:
+                await layer("DANIELUTILS_Z=$((DANIELUTILS_Z+1))")
+                return await layer("echo $DANIELUTILS_Z")
+
+        self.assertEqual(asyncio.run(main()), (0, ["4"], []))
+
+    def test_async_session_requires_async_with(self):
+        with self.assertRaises(RuntimeError):
+            with AsyncLayeredCommand("true", session=True):
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()